@@ -0,0 +1,163 @@
+"""
+Thumbnails and web-sized copies of uploaded images.
+
+Uploads are streamed to a temporary file (see FILE_UPLOAD_HANDLERS) and moved
+into MEDIA_ROOT, so a request never holds a whole file in memory. Once the
+row's transaction commits, queue_variants() hands the file to a process pool
+that writes one WebP per ATTACHMENT_VARIANTS entry under `variants/`, next to
+the original's path. Variants are rotated by the EXIF orientation and saved
+without the EXIF block, so location data from phone cameras is not served
+with them. The original is kept as uploaded.
+
+variant_urls() gives serializers the variants that exist; one that has not
+been rendered yet is simply left out. `manage.py render_attachment_variants`
+renders whatever is missing, e.g. for files uploaded before this existed.
+
+Kept free of model imports so pool workers can unpickle render_variants()
+without setting up the app registry.
+"""
+import logging
+import multiprocessing
+import os
+import posixpath
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+# Variant name -> longest edge in pixels
+ATTACHMENT_VARIANTS = getattr(settings, 'ATTACHMENT_VARIANTS', {'thumb': 320, 'web': 1600})
+ATTACHMENT_VARIANT_QUALITY = getattr(settings, 'ATTACHMENT_VARIANT_QUALITY', 80)
+# 0 renders in the calling thread, for development and tests
+ATTACHMENT_WORKERS = getattr(settings, 'ATTACHMENT_WORKERS', None)
+if ATTACHMENT_WORKERS is None:
+    ATTACHMENT_WORKERS = min(2, os.cpu_count() or 1)
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp', '.gif', '.bmp')
+
+
+def is_image(name):
+    return bool(name) and name.lower().endswith(IMAGE_EXTENSIONS)
+
+
+def variant_name(name, variant):
+    """'complaints/Worker.jpg' -> 'variants/complaints/Worker.jpg.thumb.webp'"""
+    return posixpath.join('variants', f'{name}.{variant}.webp')
+
+
+def render_variants(source, targets, quality=ATTACHMENT_VARIANT_QUALITY):
+    """
+    Write a WebP for each (path, longest edge) in `targets` from the image at
+    `source`, largest first so each is scaled from the previous one.
+    """
+    from PIL import Image, ImageOps
+
+    targets = sorted(targets, key=lambda target: target[1], reverse=True)
+    with Image.open(source) as image:
+        # Let JPEG decode at a reduced scale instead of at full size
+        image.draft('RGB', (targets[0][1], targets[0][1]))
+        image = ImageOps.exif_transpose(image)
+        image = image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+        for path, edge in targets:
+            image.thumbnail((edge, edge), Image.LANCZOS)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            partial = f'{path}.partial'
+            # No exif= argument, so none is written
+            image.save(partial, 'WEBP', quality=quality, method=4)
+            os.replace(partial, path)
+    return [path for path, _ in targets]
+
+
+def variant_targets(storage, name):
+    return [(storage.path(variant_name(name, variant)), edge) for variant, edge in ATTACHMENT_VARIANTS.items()]
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # spawn rather than fork: forking a threaded web server can deadlock
+                context = multiprocessing.get_context('spawn')
+                _pool = ProcessPoolExecutor(max_workers=ATTACHMENT_WORKERS, mp_context=context)
+    return _pool
+
+
+def _reset_pool(pool):
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+
+
+def _finished(name, exc, on_done):
+    if exc is not None:
+        logger.warning('Rendering variants of %s failed: %s', name, exc)
+    elif on_done is not None:
+        on_done()
+
+
+def _submit(storage, name, on_done):
+    source, targets = storage.path(name), variant_targets(storage, name)
+    if all(os.path.exists(path) for path, _ in targets):
+        # Content-addressed names: the same image was uploaded before
+        _finished(name, None, on_done)
+        return
+    if not ATTACHMENT_WORKERS:
+        try:
+            render_variants(source, targets)
+        except Exception as exc:
+            _finished(name, exc, on_done)
+        else:
+            _finished(name, None, on_done)
+        return
+    for _ in range(2):
+        pool = get_pool()
+        try:
+            future = pool.submit(render_variants, source, targets)
+        except BrokenProcessPool as exc:
+            # A worker died (e.g. killed for memory); start a fresh pool once
+            _reset_pool(pool)
+            error = exc
+            continue
+        future.add_done_callback(lambda future: _finished(name, future.exception(), on_done))
+        return
+    _finished(name, error, on_done)
+
+
+def queue_variants(file, on_done=None):
+    """
+    Render variants of an image FieldFile after the current transaction
+    commits. `on_done` is called once they exist, e.g. to drop a cached
+    payload that was built without them.
+    """
+    if not file or not is_image(file.name):
+        return
+    storage, name = file.storage, file.name
+    transaction.on_commit(lambda: _submit(storage, name, on_done))
+
+
+def variant_urls(file, request=None):
+    """{variant: url} for the rendered variants of a FieldFile, or None."""
+    if not file or not is_image(file.name):
+        return None
+    urls = {}
+    for variant in ATTACHMENT_VARIANTS:
+        name = variant_name(file.name, variant)
+        if file.storage.exists(name):
+            url = file.storage.url(name)
+            urls[variant] = request.build_absolute_uri(url) if request is not None else url
+    return urls or None
+
+
+def file_name(value):
+    """The stored name behind a file field's raw attribute value."""
+    return getattr(value, 'name', value) or ''
@@ -0,0 +1,147 @@
+"""
+DATABASES for settings.py, chosen from the environment.
+
+SQLite (the default) can be tuned for a web server that writes from
+several threads or processes at once:
+
+- journal_mode=WAL lets readers carry on while one writer commits, instead
+  of the rollback journal locking the whole file for every write.
+- synchronous=NORMAL fsyncs at checkpoints rather than on every commit. WAL
+  keeps that safe against corruption; a power cut can lose the last few
+  commits, not the database.
+- busy_timeout makes a writer wait for the lock rather than fail at once
+  with "database is locked".
+- mmap_size lets reads come straight from the page cache.
+- Transactions BEGIN IMMEDIATE, so a transaction that reads and then
+  writes takes the write lock up front. Under the default DEFERRED mode,
+  two such transactions can deadlock on the upgrade, and SQLite fails one
+  of them without waiting out busy_timeout.
+
+journal_mode is stored in the database file, and WAL leaves -wal and -shm
+files next to it, so the checked-in development database stays in rollback
+journal mode (and synchronous=FULL, which that mode needs to be safe)
+unless DJANGO_DB_ENGINE=sqlite is set explicitly. Deployments set it.
+
+Set DJANGO_DB_ENGINE=postgresql (and DJANGO_DB_NAME, _USER, _PASSWORD,
+_HOST, _PORT), or a postgres:// DATABASE_URL, to use Postgres instead.
+DJANGO_DB_POOL=1 turns on psycopg's connection pool (needs psycopg[pool]).
+The pool replaces persistent connections, and Django refuses both at once.
+DJANGO_DB_PGBOUNCER=1 disables server-side cursors, for PgBouncer in
+transaction mode.
+
+DJANGO_DB_REPLICAS lists read replicas (SQLite files or postgres:// URLs),
+added as `replica1`, `replica2`, ... for Backendd.replicas to read from.
+
+Without the pool, connections persist for DJANGO_DB_CONN_MAX_AGE seconds
+(default 60) and are health-checked before reuse. Under ASGI every request
+runs in a fresh thread, so persistent connections are never reused there.
+Set DJANGO_DB_CONN_MAX_AGE=0 and use the pool instead.
+"""
+import os
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from django.core.exceptions import ImproperlyConfigured
+
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 20000,  # milliseconds
+    'mmap_size': 256 * 1024 * 1024,
+}
+# The development database, when DJANGO_DB_ENGINE is not set
+DEV_SQLITE_PRAGMAS = {
+    pragma: value for pragma, value in SQLITE_PRAGMAS.items() if pragma not in ('journal_mode', 'synchronous')
+}
+
+
+def _flag(env, name):
+    return env.get(name, '').lower() in ('1', 'true', 'yes', 'on')
+
+
+def _conn_max_age(env):
+    value = env.get('DJANGO_DB_CONN_MAX_AGE', '60')
+    # An empty value means unlimited, like CONN_MAX_AGE = None
+    return int(value) if value else None
+
+
+def sqlite_database(name, env=os.environ, pragmas=SQLITE_PRAGMAS):
+    pragmas = {**pragmas}
+    if env.get('DJANGO_SQLITE_MMAP_SIZE'):
+        pragmas['mmap_size'] = int(env['DJANGO_SQLITE_MMAP_SIZE'])
+    return {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': name,
+        'CONN_MAX_AGE': _conn_max_age(env),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'init_command': ';'.join(f'PRAGMA {pragma}={value}' for pragma, value in pragmas.items()),
+            'transaction_mode': 'IMMEDIATE',
+        },
+    }
+
+
+def postgres_database(env=os.environ):
+    url = env.get('DATABASE_URL')
+    if url:
+        parts = urlsplit(url)
+        config = {
+            'NAME': unquote(parts.path.lstrip('/')),
+            'USER': unquote(parts.username or ''),
+            'PASSWORD': unquote(parts.password or ''),
+            'HOST': parts.hostname or '',
+            'PORT': str(parts.port or ''),
+            # e.g. ?sslmode=require
+            'OPTIONS': dict(parse_qsl(parts.query)),
+        }
+    else:
+        config = {
+            'NAME': env.get('DJANGO_DB_NAME', 'complaints'),
+            'USER': env.get('DJANGO_DB_USER', ''),
+            'PASSWORD': env.get('DJANGO_DB_PASSWORD', ''),
+            'HOST': env.get('DJANGO_DB_HOST', ''),
+            'PORT': env.get('DJANGO_DB_PORT', ''),
+            'OPTIONS': {},
+        }
+    config.update({
+        'ENGINE': 'django.db.backends.postgresql',
+        'CONN_MAX_AGE': _conn_max_age(env),
+        'CONN_HEALTH_CHECKS': True,
+        'DISABLE_SERVER_SIDE_CURSORS': _flag(env, 'DJANGO_DB_PGBOUNCER'),
+    })
+    if _flag(env, 'DJANGO_DB_POOL'):
+        config['CONN_MAX_AGE'] = 0
+        config['OPTIONS']['pool'] = {
+            'min_size': int(env.get('DJANGO_DB_POOL_MIN_SIZE', 2)),
+            'max_size': int(env.get('DJANGO_DB_POOL_MAX_SIZE', 10)),
+            'timeout': int(env.get('DJANGO_DB_POOL_TIMEOUT', 10)),
+        }
+    return config
+
+
+def replica_databases(env=os.environ):
+    """
+    {'replica1': {...}, ...} for DJANGO_DB_REPLICAS, a comma-separated list of
+    SQLite files or postgres:// URLs. Under test they mirror `default`.
+    """
+    replicas = {}
+    locations = [location.strip() for location in env.get('DJANGO_DB_REPLICAS', '').split(',') if location.strip()]
+    for number, location in enumerate(locations, 1):
+        if location.startswith(('postgres:', 'postgresql:')):
+            config = postgres_database({**env, 'DATABASE_URL': location})
+        else:
+            config = sqlite_database(location, env)
+        config['TEST'] = {'MIRROR': 'default'}
+        replicas[f'replica{number}'] = config
+    return replicas
+
+
+def database_config(sqlite_path, env=os.environ):
+    """The `default` database for this environment."""
+    url = env.get('DATABASE_URL', '')
+    engine = env.get('DJANGO_DB_ENGINE', 'postgresql' if url.startswith(('postgres:', 'postgresql:')) else 'sqlite')
+    if engine in ('postgres', 'postgresql'):
+        return postgres_database(env)
+    if engine != 'sqlite':
+        raise ImproperlyConfigured(f"DJANGO_DB_ENGINE must be 'sqlite' or 'postgresql', not {engine!r}")
+    pragmas = SQLITE_PRAGMAS if env.get('DJANGO_DB_ENGINE') else DEV_SQLITE_PRAGMAS
+    return sqlite_database(env.get('DJANGO_DB_NAME') or sqlite_path, env, pragmas)
@@ -0,0 +1,136 @@
+"""
+Publish/subscribe for real-time complaint updates.
+
+Publishers call publish() from ordinary synchronous code (signal receivers,
+views); the event is handed to the broker once the surrounding transaction
+commits, so subscribers never see rows that were rolled back. Each
+Subscription is drained by an async server-sent events view.
+
+The broker is chosen by the EVENT_BROKER setting. InProcessBroker fans events
+out to subscribers in the same process only, which is enough for a single
+ASGI worker. Deployments with several workers need a broker backed by a shared
+transport (Redis pub/sub, Postgres LISTEN/NOTIFY) implementing the same two
+methods.
+"""
+import asyncio
+import itertools
+import json
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+EVENT_BROKER = getattr(settings, 'EVENT_BROKER', 'Backendd.events.InProcessBroker')
+# Events a slow subscriber may fall behind by before it is told to resync
+EVENT_QUEUE_SIZE = getattr(settings, 'EVENT_QUEUE_SIZE', 100)
+
+
+class Subscription:
+    """
+    Queue of the events published to a set of channels. If the consumer falls
+    more than EVENT_QUEUE_SIZE events behind, the backlog is dropped and a
+    single 'resync' event tells the client to refetch.
+    """
+
+    def __init__(self, broker, channels, loop):
+        self.broker = broker
+        self.channels = frozenset(channels)
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=EVENT_QUEUE_SIZE)
+        self.closed = False
+
+    def deliver(self, event):
+        """Thread-safe: hand `event` to the subscriber's event loop."""
+        if self.closed:
+            return
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # The consumer's loop has shut down without closing the subscription
+            self.close()
+
+    def _put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({'type': 'resync'})
+
+    async def get(self, timeout=None):
+        """Next event, or None if `timeout` seconds pass without one."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.broker.unsubscribe(self)
+
+
+class InProcessBroker:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = defaultdict(set)
+
+    def publish(self, channels, event):
+        with self._lock:
+            targets = set().union(*(self._subscriptions.get(channel, ()) for channel in channels))
+        for subscription in targets:
+            subscription.deliver(event)
+
+    def subscribe(self, channels):
+        """Must be called from the event loop that will consume the subscription."""
+        subscription = Subscription(self, channels, asyncio.get_running_loop())
+        with self._lock:
+            for channel in subscription.channels:
+                self._subscriptions[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                subscribers = self._subscriptions.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscriptions[channel]
+
+
+_broker = None
+_broker_lock = threading.Lock()
+_event_ids = itertools.count(1)
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = import_string(EVENT_BROKER)()
+    return _broker
+
+
+def publish(channels, event_type, data):
+    """Publish to every channel in `channels` after the current transaction commits."""
+    channels = [channel for channel in channels if channel]
+    if not channels:
+        return
+    event = {'id': next(_event_ids), 'type': event_type, 'data': data}
+    transaction.on_commit(lambda: get_broker().publish(channels, event))
+
+
+def format_sse(event):
+    """Encode an event in the text/event-stream wire format."""
+    lines = []
+    if 'id' in event:
+        lines.append(f"id: {event['id']}")
+    lines.append(f"event: {event['type']}")
+    lines.append('data: ' + json.dumps(event.get('data', {}), cls=DjangoJSONEncoder, separators=(',', ':')))
+    return '\n'.join(lines) + '\n\n'
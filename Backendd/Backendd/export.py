@@ -0,0 +1,141 @@
+"""
+Constant-memory CSV/JSONL exports.
+
+Rows are read with QuerySet.iterator(chunk_size=...), which uses a
+server-side cursor on PostgreSQL and fetchmany() on SQLite, and are encoded
+into chunks of roughly EXPORT_FLUSH_BYTES as they arrive, so neither the
+queryset nor the response body is ever held in memory.
+"""
+import csv
+import io
+import json
+from datetime import datetime, time, timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+EXPORT_CHUNK_SIZE = getattr(settings, 'EXPORT_CHUNK_SIZE', 2000)
+EXPORT_FLUSH_BYTES = 64 * 1024
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'jsonl': ('application/x-ndjson', 'jsonl'),
+}
+
+
+def parse_bound(value, end=False):
+    """
+    An aware datetime from an ISO 8601 date or datetime. A bare date used as
+    an upper bound means the end of that day. Raises ValueError if invalid.
+    """
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(value)
+        moment = datetime.combine(day + timedelta(days=1) if end else day, time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def export_lines(queryset, columns, output):
+    """
+    Encode `queryset` as CSV or JSON Lines. `columns` is a sequence of
+    (header, lookup) pairs; the lookups are fetched with values_list(), so
+    related columns are joined into the same query.
+    """
+    headers = [header for header, _ in columns]
+    rows = queryset.values_list(*(lookup for _, lookup in columns)).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    buffer = io.StringIO()
+    if output == 'csv':
+        writer = csv.writer(buffer)
+        writer.writerow(headers)
+        write = writer.writerow
+    else:
+        encoder = DjangoJSONEncoder(separators=(',', ':'))
+
+        def write(row):
+            buffer.write(encoder.encode(dict(zip(headers, row))))
+            buffer.write('\n')
+
+    for row in rows:
+        write(row)
+        if buffer.tell() >= EXPORT_FLUSH_BYTES:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+async def _iterate_async(iterator):
+    # Each chunk is produced on the thread that owns the request's database
+    # connection, so the open cursor stays valid between chunks
+    step = sync_to_async(next)
+    while (chunk := await step(iterator, None)) is not None:
+        yield chunk
+
+
+def export_response(request, lines, filename, output):
+    """
+    Stream `lines` as a download. Under ASGI the generator is driven chunk by
+    chunk from the event loop; Django would otherwise buffer a synchronous
+    iterator in full before sending it.
+    """
+    content_type, extension = EXPORT_FORMATS[output]
+    # DRF wraps the HttpRequest
+    if isinstance(getattr(request, '_request', request), ASGIRequest):
+        lines = _iterate_async(lines)
+    response = StreamingHttpResponse(lines, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{extension}"'
+    return response
+
+
+def filter_created(queryset, created_after=None, created_before=None):
+    """Restrict to created_after <= created_at < created_before, oldest first. Raises ValueError."""
+    if created_after:
+        queryset = queryset.filter(created_at__gte=parse_bound(created_after))
+    if created_before:
+        queryset = queryset.filter(created_at__lt=parse_bound(created_before, end=True))
+    return queryset.order_by('created_at', 'pk')
+
+
+class ExportMixin:
+    """
+    Adds `GET <list>/export/?output=csv|jsonl&created_after=&created_before=`
+    to a viewset. The viewset's filters apply; `export_columns` lists the
+    (header, lookup) pairs to write.
+    """
+    export_columns = ()
+    export_filename = 'export'
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        output = request.query_params.get('output', 'csv')
+        if output not in EXPORT_FORMATS:
+            return Response(
+                {"error": f"output must be one of {', '.join(EXPORT_FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            queryset = filter_created(
+                self.filter_queryset(self.get_queryset()),
+                request.query_params.get('created_after'),
+                request.query_params.get('created_before'),
+            )
+        except ValueError:
+            return Response(
+                {"error": "created_after and created_before must be ISO 8601 dates or datetimes"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        lines = export_lines(queryset, self.export_columns, output)
+        filename = f"{self.export_filename}-{timezone.localdate():%Y%m%d}"
+        return export_response(request, lines, filename, output)
@@ -0,0 +1,282 @@
+"""
+Request instrumentation: latency, database and response size histograms per
+view, a duplicate-query (N+1) detector, a Prometheus text endpoint and
+opt-in cProfile dumps.
+
+MetricsMiddleware works under WSGI and ASGI. Queries are recorded by an
+execute wrapper installed on every database connection as it opens; the
+wrapper reports to the request found in a context variable, and asgiref
+copies context into the threads that sync views, sync_to_async() and the
+login pool run on, so their queries are attributed to the right request.
+
+Metrics live in process memory. Each worker process serves its own /metrics,
+so scrape every worker (or sum them in the scraper), as with any client
+library without a shared store.
+"""
+import cProfile
+import contextvars
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+METRICS_LATENCY_BUCKETS = getattr(
+    settings, 'METRICS_LATENCY_BUCKETS', (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+METRICS_QUERY_BUCKETS = getattr(settings, 'METRICS_QUERY_BUCKETS', (0, 1, 2, 5, 10, 20, 50, 100))
+METRICS_SIZE_BUCKETS = getattr(
+    settings, 'METRICS_SIZE_BUCKETS', (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+)
+# A statement repeated this often in one request is reported as an N+1
+METRICS_DUPLICATE_QUERY_THRESHOLD = getattr(settings, 'METRICS_DUPLICATE_QUERY_THRESHOLD', 5)
+# Clients allowed to read /metrics; None allows everyone
+METRICS_ALLOWED_IPS = getattr(settings, 'METRICS_ALLOWED_IPS', ('127.0.0.1', '::1'))
+# `X-Profile: 1` from METRICS_ALLOWED_IPS dumps a cProfile of the request here; None disables it
+METRICS_PROFILE_DIR = getattr(settings, 'METRICS_PROFILE_DIR', None)
+# Adds Server-Timing and X-Query-Count headers to every response
+METRICS_DEBUG_HEADERS = getattr(settings, 'METRICS_DEBUG_HEADERS', settings.DEBUG)
+
+
+class Histogram:
+
+    def __init__(self, name, help_text, labels, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        # label values -> [per-bucket counts..., sum, count]
+        self.series = defaultdict(lambda: [0] * len(self.buckets) + [0, 0])
+
+    def observe(self, label_values, value):
+        row = self.series[label_values]
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                row[index] += 1
+        row[-2] += value
+        row[-1] += 1
+
+    def render(self):
+        yield f'# HELP {self.name} {self.help_text}'
+        yield f'# TYPE {self.name} histogram'
+        for label_values, row in sorted(self.series.items()):
+            labels = _format_labels(self.labels, label_values)
+            for bound, count in zip(self.buckets, row):
+                yield f'{self.name}_bucket{{{labels},le="{_format_number(bound)}"}} {count}'
+            yield f'{self.name}_bucket{{{labels},le="+Inf"}} {row[-1]}'
+            yield f'{self.name}_sum{{{labels}}} {_format_number(row[-2])}'
+            yield f'{self.name}_count{{{labels}}} {row[-1]}'
+
+
+class CounterMetric:
+
+    def __init__(self, name, help_text, labels):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.series = Counter()
+
+    def inc(self, label_values, amount=1):
+        self.series[label_values] += amount
+
+    def render(self):
+        yield f'# HELP {self.name} {self.help_text}'
+        yield f'# TYPE {self.name} counter'
+        for label_values, value in sorted(self.series.items()):
+            yield f'{self.name}{{{_format_labels(self.labels, label_values)}}} {value}'
+
+
+def _format_number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _format_labels(names, values):
+    def escape(value):
+        return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+    return ','.join(f'{name}="{escape(value)}"' for name, value in zip(names, values))
+
+
+_lock = threading.Lock()
+REQUESTS = CounterMetric('django_http_requests_total', 'Requests by view, method and status.',
+                         ('view', 'method', 'status'))
+LATENCY = Histogram('django_http_request_duration_seconds', 'Time to produce the response.',
+                    ('view', 'method'), METRICS_LATENCY_BUCKETS)
+QUERIES = Histogram('django_http_request_queries', 'Database queries per request.',
+                    ('view',), METRICS_QUERY_BUCKETS)
+QUERY_TIME = Histogram('django_http_request_query_seconds', 'Time spent in the database per request.',
+                       ('view',), METRICS_LATENCY_BUCKETS)
+RESPONSE_SIZE = Histogram('django_http_response_size_bytes', 'Response body size; streams are not counted.',
+                          ('view',), METRICS_SIZE_BUCKETS)
+DUPLICATES = CounterMetric('django_http_duplicate_query_requests_total',
+                           'Requests repeating one statement at least METRICS_DUPLICATE_QUERY_THRESHOLD times.',
+                           ('view',))
+METRICS = (REQUESTS, LATENCY, QUERIES, QUERY_TIME, RESPONSE_SIZE, DUPLICATES)
+
+
+def reset_metrics():
+    with _lock:
+        for metric in METRICS:
+            metric.series.clear()
+
+
+# `IN (%s, %s, ...)` lists of any length count as the same statement
+_PLACEHOLDER_LIST = re.compile(r'\((?:%s|\?)(?:,\s*(?:%s|\?))*\)')
+
+
+def normalize_sql(sql):
+    return _PLACEHOLDER_LIST.sub('(...)', sql)
+
+
+class RequestStats:
+
+    def __init__(self):
+        self.queries = 0
+        self.query_time = 0.0
+        self.statements = Counter()
+        self.lock = threading.Lock()
+
+    def record(self, sql, duration):
+        statement = normalize_sql(sql)
+        with self.lock:
+            self.queries += 1
+            self.query_time += duration
+            self.statements[statement] += 1
+
+    def duplicates(self):
+        """(statement, count) pairs repeated at least the N+1 threshold, most repeated first."""
+        return [(sql, n) for sql, n in self.statements.most_common() if n >= METRICS_DUPLICATE_QUERY_THRESHOLD]
+
+
+_current = contextvars.ContextVar('request_stats', default=None)
+
+
+def _record_query(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.record(sql, time.perf_counter() - start)
+
+
+def _install(sender=None, connection=None, **kwargs):
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+def install_query_recorder():
+    """Record queries on this thread's open connections and every connection opened from now on."""
+    connection_created.connect(_install, dispatch_uid='Backendd.metrics')
+    for connection in connections.all(initialized_only=True):
+        _install(connection=connection)
+
+
+def view_label(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return '<unresolved>'
+    return match.view_name or match.route
+
+
+class MetricsMiddleware:
+    """
+    Records every request into the metrics above. Send `X-Profile: 1` from
+    one of METRICS_ALLOWED_IPS, with METRICS_PROFILE_DIR set, to write a
+    .prof file for that request (sync views under WSGI only); its name in
+    that directory comes back in X-Profile-File.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+        install_query_recorder()
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        try:
+            if METRICS_PROFILE_DIR and request.headers.get('X-Profile') == '1' and client_allowed(request):
+                profiler = cProfile.Profile()
+                response = profiler.runcall(self.get_response, request)
+                response['X-Profile-File'] = self.dump_profile(request, profiler)
+            else:
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, stats, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, stats, time.perf_counter() - start)
+
+    def finish(self, request, response, stats, elapsed):
+        view = view_label(request)
+        duplicates = stats.duplicates()
+        with _lock:
+            REQUESTS.inc((view, request.method, response.status_code))
+            LATENCY.observe((view, request.method), elapsed)
+            QUERIES.observe((view,), stats.queries)
+            QUERY_TIME.observe((view,), stats.query_time)
+            if not response.streaming:
+                RESPONSE_SIZE.observe((view,), len(response.content))
+            if duplicates:
+                DUPLICATES.inc((view,))
+        if duplicates:
+            sql, count = duplicates[0]
+            logger.warning('Possible N+1 in %s %s (%s): %d queries, %d x %s',
+                           request.method, request.path, view, stats.queries, count, sql)
+        if METRICS_DEBUG_HEADERS:
+            response['X-Query-Count'] = str(stats.queries)
+            response['Server-Timing'] = (
+                f'total;dur={elapsed * 1000:.1f}, db;dur={stats.query_time * 1000:.1f};desc="{stats.queries} queries"'
+            )
+            if duplicates:
+                response['X-Duplicate-Queries'] = str(duplicates[0][1])
+        return response
+
+    def dump_profile(self, request, profiler):
+        os.makedirs(METRICS_PROFILE_DIR, exist_ok=True)
+        slug = re.sub(r'[^A-Za-z0-9]+', '-', request.path).strip('-') or 'root'
+        path = os.path.join(
+            METRICS_PROFILE_DIR, f'{timezone.now():%Y%m%d-%H%M%S-%f}-{request.method}-{slug}.prof'
+        )
+        profiler.dump_stats(path)
+        return os.path.basename(path)
+
+
+def client_allowed(request):
+    return METRICS_ALLOWED_IPS is None or request.META.get('REMOTE_ADDR') in METRICS_ALLOWED_IPS
+
+
+def metrics_view(request):
+    """Prometheus text exposition of this process's metrics."""
+    if not client_allowed(request):
+        return HttpResponseForbidden()
+    with _lock:
+        lines = [line for metric in METRICS for line in metric.render()]
+    return HttpResponse('\n'.join(lines) + '\n', content_type='text/plain; version=0.0.4; charset=utf-8')
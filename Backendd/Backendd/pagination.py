@@ -0,0 +1,115 @@
+import base64
+import json
+from collections import OrderedDict
+from datetime import date, datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(PageNumberPagination):
+    """
+    Page-number pagination with an opt-in keyset mode for infinite scroll.
+
+    Requests behave exactly like PageNumberPagination unless they pass
+    `?pagination=cursor` or a `?cursor=` token. In keyset mode rows are ordered
+    by the view's `keyset_fields` (default newest first on created_at, id),
+    each page is fetched with a `WHERE (created_at, id) < cursor` seek instead
+    of OFFSET, and the COUNT(*) is skipped unless `?count=true` is passed. The
+    cost of a page therefore does not depend on how far the client scrolled.
+    """
+    cursor_query_param = 'cursor'
+    mode_query_param = 'pagination'
+    count_query_param = 'count'
+    default_keyset_fields = ('-created_at', '-id')
+    invalid_cursor_message = 'Invalid cursor'
+
+    keyset = False
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = (
+            request.query_params.get(self.mode_query_param) == 'cursor'
+            or self.cursor_query_param in request.query_params
+        )
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.fields = tuple(getattr(view, 'keyset_fields', self.default_keyset_fields))
+        self.page_size = self.get_page_size(request)
+        self.total = None
+        if request.query_params.get(self.count_query_param) in ('1', 'true'):
+            self.total = queryset.count()
+
+        queryset = queryset.order_by(*self.fields)
+        token = request.query_params.get(self.cursor_query_param)
+        if token:
+            queryset = queryset.filter(self.seek(queryset.model, self.decode_cursor(token)))
+
+        rows = list(queryset[:self.page_size + 1])
+        self.next_values = None
+        if len(rows) > self.page_size:
+            rows = rows[:self.page_size]
+            last = rows[-1]
+            self.next_values = [getattr(last, field.lstrip('-')) for field in self.fields]
+        return rows
+
+    def seek(self, model, values):
+        """
+        Rows strictly after `values` in the keyset ordering, expanded as
+        (a > x) OR (a = x AND b > y) with the comparison flipped for
+        descending fields.
+        """
+        if len(values) != len(self.fields):
+            raise NotFound(self.invalid_cursor_message)
+        condition = Q()
+        equal = {}
+        for field, raw in zip(self.fields, values):
+            name = field.lstrip('-')
+            try:
+                value = model._meta.get_field(name).to_python(raw)
+            except Exception:
+                raise NotFound(self.invalid_cursor_message)
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        return condition
+
+    def encode_cursor(self, values):
+        # isoformat() keeps microseconds, which DjangoJSONEncoder would truncate
+        values = [v.isoformat() if isinstance(v, (date, datetime)) else v for v in values]
+        data = json.dumps(values, separators=(',', ':'))
+        return base64.urlsafe_b64encode(data.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, token):
+        try:
+            padded = token + '=' * (-len(token) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list):
+            raise NotFound(self.invalid_cursor_message)
+        return values
+
+    def get_next_link(self):
+        if not self.keyset:
+            return super().get_next_link()
+        if self.next_values is None:
+            return None
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_values))
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        payload = OrderedDict()
+        if self.total is not None:
+            payload['count'] = self.total
+        payload['next'] = self.get_next_link()
+        payload['previous'] = None
+        payload['results'] = data
+        return Response(payload)
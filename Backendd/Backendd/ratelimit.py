@@ -0,0 +1,203 @@
+"""
+Rate limits for the endpoints that are expensive or abusable without a
+token: login, password reset, sign-up and complaint creation.
+
+Each policy in RATE_LIMITS is a list of (key, rate) rules, e.g.
+('ip', '30/m') or ('field:username', '10/15m'). A rule's key is one of
+
+- 'ip': the client address, read like DRF's throttles. X-Forwarded-For
+  is only trusted as far as REST_FRAMEWORK['NUM_PROXIES'] reverse proxies.
+- 'user': the authenticated user; skipped for anonymous requests.
+- 'field:<name>': a field of the request body, case-folded and hashed, so
+  one roll number or email is limited however many addresses it comes from.
+  Skipped when the field is missing.
+
+A request is allowed only if every rule of its policy is under its rate,
+and only allowed requests are counted.
+
+Counting uses a sliding window counter: one integer per key per fixed
+window, with the previous window's count weighted by how much of it still
+overlaps the sliding window. A check is one get_many and, if allowed, one
+add and incr per rule, whatever the rate. (DRF's SimpleRateThrottle keeps a
+list of request timestamps per key, which grows with the rate.)
+
+Counters live in the RATE_LIMIT_CACHE_ALIAS cache. Like the other caches,
+that has to be a shared backend when several processes serve the API, or
+each process allows the full rate. Concurrent requests can overshoot a
+limit by at most the number in flight, since a check and its increment are
+not one atomic step.
+
+Limits are checked before anything else runs: `rate_limited` wraps plain
+views (login, in front of the hashing pool) and PolicyThrottle runs in a DRF
+view's initial(), before the handler looks anything up.
+"""
+import contextlib
+import contextvars
+import functools
+import hashlib
+import json
+import math
+import re
+import time
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.http import JsonResponse
+from rest_framework.throttling import BaseThrottle
+
+RATE_LIMITS = getattr(settings, 'RATE_LIMITS', {})
+RATE_LIMIT_CACHE_ALIAS = getattr(settings, 'RATE_LIMIT_CACHE_ALIAS', 'default')
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+_RATE = re.compile(r'^(\d+)/(\d*)([smhd])[a-z]*$')
+
+_paused = contextvars.ContextVar('rate_limits_paused', default=False)
+
+
+def parse_rate(rate):
+    """'10/15m' -> (10, 900). The unit may be spelled out: '30/min', '5/hour'."""
+    match = _RATE.match(rate)
+    if match is None:
+        raise ValueError(f"Rate must look like '10/m' or '5/15min', not {rate!r}")
+    count, multiplier, unit = match.groups()
+    return int(count), int(multiplier or 1) * PERIODS[unit]
+
+
+@contextlib.contextmanager
+def paused():
+    """Let every request through, e.g. for a load test run in-process."""
+    token = _paused.set(True)
+    try:
+        yield
+    finally:
+        _paused.reset(token)
+
+
+_ident = BaseThrottle()
+
+
+def _body_field(request, name):
+    data = getattr(request, 'data', None)
+    if data is None:
+        # A plain HttpRequest; the login view reads the same body afterwards
+        if request.content_type == 'application/json':
+            try:
+                data = json.loads(request.body or b'{}')
+            except ValueError:
+                return None
+        elif request.content_type == 'application/x-www-form-urlencoded':
+            data = request.POST
+        else:
+            # Parsing an upload here would leave nothing for the view to read
+            return None
+    value = data.get(name) if hasattr(data, 'get') else None
+    return value if isinstance(value, str) and value.strip() else None
+
+
+def rule_ident(request, key):
+    """The value a rule counts requests by, or None if it does not apply."""
+    if key == 'ip':
+        return _ident.get_ident(request)
+    if key == 'user':
+        user = getattr(request, 'user', None)
+        return str(user.pk) if user is not None and user.is_authenticated else None
+    if key.startswith('field:'):
+        value = _body_field(request, key[len('field:'):])
+        if value is None:
+            return None
+        return hashlib.sha256(value.strip().casefold().encode()).hexdigest()[:32]
+    raise ValueError(f'Unknown rate limit key {key!r}')
+
+
+def check(policy, request, now=None):
+    """
+    Count `request` against `policy` and return 0 if it may proceed, or else
+    how many seconds to wait before retrying.
+    """
+    if _paused.get() or not RATE_LIMITS.get(policy):
+        return 0
+    now = time.time() if now is None else now
+    cache = caches[RATE_LIMIT_CACHE_ALIAS]
+
+    windows = []
+    for key, rate in RATE_LIMITS[policy]:
+        ident = rule_ident(request, key)
+        if ident is None:
+            continue
+        limit, period = parse_rate(rate)
+        window = int(now // period)
+        prefix = f'ratelimit:{policy}:{key}:{ident}:{period}'
+        windows.append((limit, period, window, f'{prefix}:{window}', f'{prefix}:{window - 1}'))
+
+    counts = cache.get_many([key for *_, current, previous in windows for key in (current, previous)])
+    wait = 0
+    for limit, period, window, current, previous in windows:
+        used = counts.get(current, 0)
+        earlier = counts.get(previous, 0)
+        # Share of the previous window still inside the sliding window
+        overlap = 1 - (now - window * period) / period
+        if used + earlier * overlap < limit:
+            continue
+        if used >= limit:
+            # Nothing frees up until this window ends
+            retry = (window + 1) * period - now
+        else:
+            # Wait for the previous window's weight to drop below what is left
+            retry = (overlap - (limit - used) / earlier) * period
+        wait = max(wait, retry, 1)
+    if wait:
+        return math.ceil(wait)
+
+    for limit, period, window, current, previous in windows:
+        cache.add(current, 0, 2 * period)
+        try:
+            cache.incr(current)
+        except ValueError:
+            # Expired between the add and the incr
+            cache.add(current, 1, 2 * period)
+    return 0
+
+
+def throttled_response(wait):
+    response = JsonResponse({'detail': f'Request was throttled. Expected available in {wait} seconds.'}, status=429)
+    response['Retry-After'] = str(wait)
+    return response
+
+
+def rate_limited(policy):
+    """Decorate a plain (sync or async) view to answer 429 once `policy` is exceeded."""
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @functools.wraps(view)
+            async def wrapper(request, *args, **kwargs):
+                wait = await sync_to_async(check, thread_sensitive=False)(policy, request)
+                if wait:
+                    return throttled_response(wait)
+                return await view(request, *args, **kwargs)
+        else:
+            @functools.wraps(view)
+            def wrapper(request, *args, **kwargs):
+                wait = check(policy, request)
+                if wait:
+                    return throttled_response(wait)
+                return view(request, *args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+class PolicyThrottle(BaseThrottle):
+    """
+    Apply the view's `rate_limits`, a map from action (or, for an APIView,
+    lower-case method) to a RATE_LIMITS policy.
+    """
+
+    def allow_request(self, request, view):
+        action = getattr(view, 'action', None) or request.method.lower()
+        policy = getattr(view, 'rate_limits', {}).get(action)
+        self.retry_after = check(policy, request) if policy else 0
+        return not self.retry_after
+
+    def wait(self):
+        return self.retry_after
@@ -0,0 +1,133 @@
+"""
+Read replicas for list, dashboard and statistics traffic.
+
+Views that use ReplicaReadMixin read `accounts` and `ssdash` models from one
+of REPLICA_DATABASES (chosen once per request) when the request is a safe
+method. Everything else, including every write, goes to `default`.
+
+A replica can lag behind `default`, so:
+
+- once a request writes, its own later reads go to `default` too.
+- after a user's request writes anything, that user reads from `default`
+  for REPLICA_STICKY_SECONDS. The pin is kept in the default cache, so
+  several processes need a shared cache backend to honour it, as with the
+  other caches.
+- delta sync (`changes/`) always reads `default`, because a lagging replica
+  could move a client's watermark past rows it has not seen yet.
+
+With no replicas configured the router and mixin do nothing. To try it
+locally, point DJANGO_DB_REPLICAS at a second SQLite file and run
+`manage.py refresh_replicas` to copy the primary into it. The copy then
+stands in for a replica that lags until the next refresh.
+"""
+import contextvars
+import random
+import sqlite3
+from contextlib import closing
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+
+REPLICA_DATABASES = list(getattr(settings, 'REPLICA_DATABASES', ()))
+REPLICA_APPS = frozenset(getattr(settings, 'REPLICA_APPS', ('accounts', 'ssdash')))
+REPLICA_STICKY_SECONDS = getattr(settings, 'REPLICA_STICKY_SECONDS', 10)
+
+
+class RoutingState:
+    """Where the current request may read from, and whether it has written."""
+
+    def __init__(self):
+        self.use_replica = False
+        self.alias = None
+        self.wrote = False
+        self.user_id = None
+
+
+_state = contextvars.ContextVar('replica_routing', default=None)
+
+
+def _pin_key(user_id):
+    return f'replica-pin:{user_id}'
+
+
+def pin_to_primary(user_id):
+    cache.set(_pin_key(user_id), True, REPLICA_STICKY_SECONDS)
+
+
+def is_pinned(user_id):
+    return cache.get(_pin_key(user_id)) is not None
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or not state.use_replica or model._meta.app_label not in REPLICA_APPS:
+            return None
+        if state.alias is None:
+            state.alias = random.choice(REPLICA_DATABASES)
+        return state.alias
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            # Read our own writes for the rest of this request
+            state.wrote = True
+            state.use_replica = False
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive the schema from the primary
+        if db in REPLICA_DATABASES:
+            return False
+        return None
+
+
+class ReplicaReadMixin:
+    """
+    Serve safe requests to this view from a replica, unless the user wrote
+    in the last REPLICA_STICKY_SECONDS. Actions in `primary_actions` always
+    read the primary.
+    """
+    primary_actions = ('changes',)
+
+    def dispatch(self, request, *args, **kwargs):
+        state = RoutingState()
+        token = _state.set(state)
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            _state.reset(token)
+            if state.wrote and state.user_id is not None:
+                pin_to_primary(state.user_id)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        state = _state.get()
+        if state is None:
+            return
+        state.user_id = request.user.pk if request.user.is_authenticated else None
+        state.use_replica = (
+            bool(REPLICA_DATABASES)
+            and request.method in SAFE_METHODS
+            and getattr(self, 'action', None) not in self.primary_actions
+            and not (state.user_id is not None and is_pinned(state.user_id))
+        )
+
+
+def refresh_sqlite_replica(alias):
+    """Overwrite a SQLite replica with a consistent copy of the primary."""
+    target = connections[alias].settings_dict
+    if connections[DEFAULT_DB_ALIAS].vendor != 'sqlite' or connections[alias].vendor != 'sqlite':
+        raise ValueError(f'{alias} and the primary must both be SQLite to refresh by copy')
+    connections[alias].close()
+    source = connections[DEFAULT_DB_ALIAS]
+    source.ensure_connection()
+    with closing(sqlite3.connect(target['NAME'])) as replica:
+        source.connection.backup(replica)
@@ -2,6 +2,8 @@ import os
 from pathlib import Path
 from datetime import timedelta
 
+from .database import database_config, replica_databases
+
 # Build paths inside the project
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -32,6 +34,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Outermost, so its timings include the other middleware
+    'Backendd.metrics.MetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -67,13 +71,107 @@ TEMPLATES = [
 WSGI_APPLICATION = 'Backendd.wsgi.application'
 
 # Database
+# SQLite with persistent connections unless DJANGO_DB_ENGINE=postgresql or a
+# postgres:// DATABASE_URL is set. DJANGO_DB_ENGINE=sqlite adds WAL; see
+# Backendd/database.py for the knobs.
 DATABASES = {
+    'default': database_config(BASE_DIR / 'db.sqlite3'),
+    **replica_databases(),
+}
+# Safe requests to the accounts and ssdash views read from a replica when
+# DJANGO_DB_REPLICAS configures any (Backendd/replicas.py)
+DATABASE_ROUTERS = ['Backendd.replicas.ReplicaRouter']
+REPLICA_DATABASES = [alias for alias in DATABASES if alias != 'default']
+REPLICA_STICKY_SECONDS = 10  # a user reads the primary for this long after writing
+
+# Cache
+# Local memory by default; point DJANGO_CACHE_BACKEND/LOCATION at a shared
+# backend (e.g. django.core.cache.backends.redis.RedisCache) when running
+# several processes so cache invalidations are seen by all of them.
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        'BACKEND': os.environ.get('DJANGO_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('DJANGO_CACHE_LOCATION', ''),
+    },
+    # Authenticated user objects; in-process unless DJANGO_AUTH_CACHE_BACKEND is set
+    'auth': {
+        'BACKEND': os.environ.get('DJANGO_AUTH_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('DJANGO_AUTH_CACHE_LOCATION', 'auth-users'),
+        'TIMEOUT': 60,
+    },
 }
 
+# Serialized /accounts/api/current_user/ payloads
+PROFILE_CACHE_ALIAS = 'default'
+PROFILE_CACHE_TIMEOUT = 300  # seconds
+
+# User objects loaded by JWT/session authentication
+AUTH_USER_CACHE_ALIAS = 'auth'
+AUTH_USER_CACHE_TIMEOUT = 60  # seconds
+
+# Worker dispatch
+AUTO_DISPATCH_COMPLAINTS = False  # Assign new complaints to the least-loaded worker on creation
+DISPATCH_INDEX_TTL = 60  # seconds between rebuilds of the in-memory worker index
+
+# Real-time complaint events (/accounts/api/events/, served under ASGI)
+EVENT_BROKER = 'Backendd.events.InProcessBroker'  # Single-process fan-out; swap for a shared broker with several workers
+EVENT_QUEUE_SIZE = 100  # events a slow client may lag before it is told to resync
+EVENT_STREAM_HEARTBEAT = 15  # seconds between keep-alive comments
+
+# Delta sync (<complaints>/changes/?updated_since=)
+DELTA_SYNC_PAGE_SIZE = 500
+DELTA_SYNC_OVERLAP = 5  # seconds caught-up watermarks trail the clock
+DELTA_SYNC_TOMBSTONE_DAYS = 30  # tombstone retention; run prune_complaint_tombstones daily
+
+# Bulk student import (users/import/, manage.py import_students)
+ONBOARDING_HASH_WORKERS = None  # password hashing processes; None uses every CPU
+
+# Request metrics (Backendd.metrics), served in Prometheus text format at /metrics
+METRICS_ALLOWED_IPS = ['127.0.0.1', '::1']  # None serves everyone
+METRICS_DUPLICATE_QUERY_THRESHOLD = 5  # repeats of one statement flagged as N+1
+
+# Rate limits (Backendd/ratelimit.py): policy -> (key, rate) rules, all of
+# which must pass. Keys are 'ip', 'user' or 'field:<request body field>'.
+RATE_LIMITS = {
+    'login': [('ip', '30/m'), ('field:username', '10/15m')],
+    'password_reset': [('ip', '10/h'), ('field:email_or_roll', '3/h')],
+    'password_reset_confirm': [('ip', '10/h')],
+    'signup': [('ip', '20/h')],
+    'complaint_create': [('user', '30/h'), ('ip', '300/h')],
+}
+RATE_LIMIT_CACHE_ALIAS = 'default'  # shared backend needed for limits across processes
+# Requests from METRICS_ALLOWED_IPS sent with `X-Profile: 1` write a cProfile
+# dump here. Off unless DJANGO_METRICS_PROFILE_DIR names a directory.
+METRICS_PROFILE_DIR = os.environ.get('DJANGO_METRICS_PROFILE_DIR') or None
+
+# Password hashing. New passwords use the DJANGO_PASSWORD_HASHER profile; every
+# listed hasher can still verify, and logins on an older algorithm or cost are
+# rehashed to the current one. scrypt verifies roughly 10x faster than the
+# default PBKDF2 cost; argon2 needs the argon2-cffi package.
+PASSWORD_HASHER_PROFILES = {
+    'pbkdf2': 'accounts.hashers.PBKDF2PasswordHasher',
+    'scrypt': 'accounts.hashers.ScryptPasswordHasher',
+    'argon2': 'accounts.hashers.Argon2PasswordHasher',
+}
+PASSWORD_HASHER = os.environ.get('DJANGO_PASSWORD_HASHER', 'pbkdf2')
+PASSWORD_HASHERS = [PASSWORD_HASHER_PROFILES[PASSWORD_HASHER]] + [
+    hasher for name, hasher in PASSWORD_HASHER_PROFILES.items() if name != PASSWORD_HASHER
+] + [
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+]
+PASSWORD_PBKDF2_ITERATIONS = int(os.environ.get('DJANGO_PBKDF2_ITERATIONS', 1_000_000))
+PASSWORD_SCRYPT_WORK_FACTOR = int(os.environ.get('DJANGO_SCRYPT_WORK_FACTOR', 2 ** 14))
+
+# Login requests hash on a bounded thread pool (hashlib releases the GIL), so
+# an ASGI worker's event loop and its other sync views are never blocked
+LOGIN_HASH_WORKERS = None  # None uses every CPU
+LOGIN_MAX_PENDING = None  # logins queued beyond the pool before answering 503; None is 8 per thread
+
+# Token logins buffer last_login and write it in batches (accounts.logins)
+LAST_LOGIN_FLUSH_INTERVAL = 30  # longest a stamp waits in memory, in seconds; 0 writes on every login
+LAST_LOGIN_BATCH_SIZE = 500
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -95,6 +193,14 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 # Media files
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Stream every upload to a temporary file in chunks; saving then moves it into
+# MEDIA_ROOT rather than copying it out of memory
+FILE_UPLOAD_HANDLERS = ['django.core.files.uploadhandler.TemporaryFileUploadHandler']
+
+# Image attachment variants, rendered by a process pool (Backendd.attachments)
+ATTACHMENT_VARIANTS = {'thumb': 320, 'web': 1600}  # longest edge in pixels
+ATTACHMENT_VARIANT_QUALITY = 80
+ATTACHMENT_WORKERS = None  # None uses up to 2 processes; 0 renders inline
 
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -105,7 +211,7 @@ AUTH_USER_MODEL = 'accounts.CustomUser'
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.CachedJWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
@@ -116,6 +222,14 @@ REST_FRAMEWORK = {
         'rest_framework.filters.SearchFilter',
         'rest_framework.filters.OrderingFilter',
     ],
+    'DEFAULT_THROTTLE_CLASSES': [
+        # Applies the view's `rate_limits`; a no-op for other views
+        'Backendd.ratelimit.PolicyThrottle',
+    ],
+    # Reverse proxies in front of the app whose X-Forwarded-For entries are
+    # trusted. Unset, DRF takes the whole client-supplied header as the
+    # address, and per-IP rate limits can be dodged by varying it.
+    'NUM_PROXIES': int(os.environ.get('DJANGO_NUM_PROXIES', 0)),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
 }
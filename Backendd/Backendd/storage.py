@@ -0,0 +1,161 @@
+"""
+Content-addressed storage for uploaded attachments and profile photos.
+
+Each file is hashed (SHA-256) while it is streamed to a temporary file next
+to the blobs, then stored once as `blobs/<2 hex>/<digest><ext>`. Uploading
+bytes that are already stored just returns the existing name, so repeated
+uploads of the same photo share one file. Upload filenames are not kept.
+
+Several rows may point at one blob, so the storage never deletes on its own.
+accounts.models.StoredBlob counts references, and `manage.py prune_blobs`
+removes blobs nobody has referenced for a grace period. Reusing a blob
+touches its mtime, and delete_if_stale() gives up on a blob touched since
+the cutoff, so a prune cannot delete a blob an upload just reused.
+
+A blob's name is its content, so serve_blob() sends blobs with an ETag and a
+year-long immutable Cache-Control. Their variants (Backendd.attachments) are
+derived from a blob but change if the variant settings do, so they get an
+ETag and a one-day max-age.
+"""
+import hashlib
+import os
+import posixpath
+import re
+import tempfile
+
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.utils.http import parse_etags
+
+BLOB_PREFIX = 'blobs'
+BLOB_NAME = re.compile(r'^blobs/([0-9a-f]{2})/(\1[0-9a-f]{62})(\.[a-z0-9]{1,10})?$')
+VARIANT_NAME = re.compile(r'^variants/(blobs/.+)\.([a-z]+)\.webp$')
+
+BLOB_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+VARIANT_CACHE_CONTROL = 'public, max-age=86400'
+
+_HASH_CHUNK_SIZE = 64 * 1024
+
+
+def blob_digest(name):
+    """The SHA-256 hex digest a blob name was derived from, or None for other names."""
+    match = BLOB_NAME.match(name or '')
+    return match.group(2) if match else None
+
+
+def blob_name(digest, extension=''):
+    return posixpath.join(BLOB_PREFIX, digest[:2], digest + extension)
+
+
+class ContentAddressedStorage(FileSystemStorage):
+
+    def get_available_name(self, name, max_length=None):
+        # _save() picks the final name from the content
+        return name
+
+    def _save(self, name, content):
+        extension = os.path.splitext(name)[1].lower()
+        if not re.fullmatch(r'(\.[a-z0-9]{1,10})?', extension):
+            extension = ''
+        directory = self.path(BLOB_PREFIX)
+        os.makedirs(directory, exist_ok=True)
+        digest = hashlib.sha256()
+
+        if hasattr(content, 'temporary_file_path'):
+            # Already on disk (TemporaryFileUploadHandler): hash it, then move it
+            source = content.temporary_file_path()
+            with open(source, 'rb') as data:
+                while chunk := data.read(_HASH_CHUNK_SIZE):
+                    digest.update(chunk)
+            move = file_move_safe
+        else:
+            descriptor, source = tempfile.mkstemp(dir=directory, prefix='.upload-')
+            try:
+                with os.fdopen(descriptor, 'wb') as out:
+                    for chunk in content.chunks():
+                        digest.update(chunk)
+                        out.write(chunk)
+            except BaseException:
+                os.unlink(source)
+                raise
+            move = os.replace
+
+        name = blob_name(digest.hexdigest(), extension)
+        path = self.path(name)
+        try:
+            # Mark the blob as in use for a concurrent prune
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        else:
+            if move is os.replace:
+                os.unlink(source)
+            return name
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        move(source, path)
+        os.chmod(path, self.file_permissions_mode or 0o644)
+        return name
+
+    def delete_if_stale(self, name, oldest):
+        """
+        Delete blob `name` unless it was stored or reused after the timestamp
+        `oldest`. Returns the bytes freed, or None if the blob was kept.
+        """
+        path = self.path(name)
+        doomed = os.path.join(os.path.dirname(path), f'.prune-{os.path.basename(path)}')
+        try:
+            if os.stat(path).st_mtime >= oldest:
+                return None
+            # Take the name away first: an upload reusing the blob from here
+            # on finds nothing and stores it again
+            os.replace(path, doomed)
+        except FileNotFoundError:
+            return 0
+        stat = os.stat(doomed)
+        if stat.st_mtime >= oldest:
+            # Reused between the check and the rename; put it back unless
+            # an upload has already stored it again
+            try:
+                os.link(doomed, path)
+            except FileExistsError:
+                pass
+            os.unlink(doomed)
+            return None
+        os.unlink(doomed)
+        return stat.st_size
+
+
+_storage = None
+
+
+def blob_storage():
+    """Storage for file fields; a callable so migrations do not pin its location."""
+    global _storage
+    if _storage is None:
+        _storage = ContentAddressedStorage()
+    return _storage
+
+
+def serve_blob(request, path):
+    """Serve a blob or one of its variants with validators for caching forever."""
+    variant = VARIANT_NAME.match(path)
+    name = variant.group(1) if variant else path
+    digest = blob_digest(name)
+    if digest is None:
+        raise Http404
+    if variant:
+        etag, cache_control = f'"{digest}.{variant.group(2)}"', VARIANT_CACHE_CONTROL
+    else:
+        etag, cache_control = f'"{digest}"', BLOB_CACHE_CONTROL
+
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+        response = HttpResponseNotModified()
+    else:
+        try:
+            response = FileResponse(blob_storage().open(path, 'rb'))
+        except FileNotFoundError:
+            raise Http404
+    response['ETag'] = etag
+    response['Cache-Control'] = cache_control
+    return response
@@ -1,5 +1,7 @@
+import re
+
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib.auth import views as auth_views
@@ -7,6 +9,9 @@ from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,
 )
+from accounts.views import ComplaintStatisticsView, HostelStatisticsView, DashboardStatsView
+from .metrics import metrics_view
+from .storage import serve_blob
 
 
 
@@ -14,9 +19,18 @@ from rest_framework_simplejwt.views import (
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics', metrics_view, name='metrics'),
+
+    # Paths the warden and hostel staff dashboards already call
+    path('warden/api/complaint-statistics/', ComplaintStatisticsView.as_view()),
+    path('warden/api/hostel-statistics/', HostelStatisticsView.as_view()),
+    path('api/dashboard-stats', DashboardStatsView.as_view()),
 
     path('api/', include('ssdash.urls')),
        path('accounts/', include('accounts.urls')),  # Include the URLs from the ssdash app
+
+    # Content-addressed uploads, with immutable caching headers
+    re_path(r'^%s(?P<path>(?:variants/)?blobs/.+)$' % re.escape(settings.MEDIA_URL.lstrip('/')), serve_blob),
 ]
 
 # Add static URL mapping for development
@@ -4,7 +4,7 @@ from django.contrib.auth.admin import UserAdmin
 from django.contrib.auth.forms import UserCreationForm
 from .models import (CustomUser, Hostel, Room, 
                     StudentProfile, WorkerProfile,
-                    ComplaintType, Complaint)
+                    ComplaintType, Complaint, OutboundEmail)
 
 class ComplaintTypeAdmin(admin.ModelAdmin):
     list_display = ('name', 'description')
@@ -117,10 +117,17 @@ class ComplaintAdmin(admin.ModelAdmin):
                 )
         return super().formfield_for_foreignkey(db_field, request, **kwargs)
 
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ('id', 'subject', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('subject',)
+    readonly_fields = ('created_at', 'sent_at', 'last_error')
+
 admin.site.register(CustomUser, CustomUserAdmin)
 admin.site.register(Hostel, HostelAdmin)
 admin.site.register(Room, RoomAdmin)
 admin.site.register(StudentProfile)
 admin.site.register(ComplaintType, ComplaintTypeAdmin)
 admin.site.register(WorkerProfile)
-admin.site.register(Complaint, ComplaintAdmin)
\ No newline at end of file
+admin.site.register(Complaint, ComplaintAdmin)
+admin.site.register(OutboundEmail, OutboundEmailAdmin)
\ No newline at end of file
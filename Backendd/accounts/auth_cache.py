@@ -0,0 +1,36 @@
+"""
+Short-lived cache of authenticated user objects, so steady-state API requests
+do not load the CustomUser row on every call.
+
+Uses the AUTH_USER_CACHE_ALIAS cache (an in-process locmem cache by default,
+which hands out a fresh unpickled copy on every read). Entries are deleted by
+the CustomUser post_save/post_delete receivers and by CustomUserQuerySet.update
+in accounts.models. Only the process that made the change sees the deletion
+unless the alias points at a shared backend; elsewhere the short timeout
+bounds how long a deactivated user or an old password stays accepted.
+"""
+from django.conf import settings
+from django.core.cache import caches
+
+AUTH_USER_CACHE_ALIAS = getattr(settings, 'AUTH_USER_CACHE_ALIAS', 'default')
+AUTH_USER_CACHE_TIMEOUT = getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 60)
+
+
+def user_cache_key(user_id):
+    return f'accounts:auth-user:{user_id}'
+
+
+def get_cached_user(user_id):
+    return caches[AUTH_USER_CACHE_ALIAS].get(user_cache_key(user_id))
+
+
+def cache_user(user):
+    caches[AUTH_USER_CACHE_ALIAS].set(user_cache_key(user.pk), user, AUTH_USER_CACHE_TIMEOUT)
+
+
+def invalidate_user(user_id):
+    caches[AUTH_USER_CACHE_ALIAS].delete(user_cache_key(user_id))
+
+
+def invalidate_users(user_ids):
+    caches[AUTH_USER_CACHE_ALIAS].delete_many([user_cache_key(user_id) for user_id in user_ids])
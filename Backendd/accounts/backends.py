@@ -1,6 +1,8 @@
 from django.contrib.auth import get_user_model
 from django.db.models import Q
 
+from .auth_cache import cache_user, get_cached_user
+
 User = get_user_model()
 
 class MultiFieldAuthBackend:
@@ -24,7 +26,12 @@ class MultiFieldAuthBackend:
             return None
 
     def get_user(self, user_id):
+        user = get_cached_user(user_id)
+        if user is not None:
+            return user
         try:
-            return User.objects.get(pk=user_id)
+            user = User.objects.get(pk=user_id)
         except User.DoesNotExist:
-            return None
\ No newline at end of file
+            return None
+        cache_user(user)
+        return user
\ No newline at end of file
@@ -0,0 +1,181 @@
+"""
+Synthetic data for the API benchmarks.
+
+seed_benchmark_data() fills both apps with a repeatable data set: hostels
+with wardens and rooms, students housed in those rooms, workers covering a
+few complaint types each, and complaints in `accounts` and `ssdash` spread
+over the last few months in a pending/assigned/resolved mix. The same seed
+always produces the same rows, so two benchmark runs differ only in the code
+under test.
+
+Every row is tagged with BENCH_PREFIX (usernames, hostel and complaint type
+names, ssdash places) so clear_benchmark_data() can remove the set again
+without touching real data. Rows are written with bulk_create, so the
+counters and rollups that post_save receivers would keep are rebuilt
+afterwards.
+"""
+import random
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from ssdash.models import Complaint as DashComplaint
+
+from .dispatch import reset_index
+from .models import (
+    Complaint, ComplaintType, CustomUser, Hostel, Room, StudentProfile, UserProfile, WorkerProfile,
+    rebuild_complaint_rollups, reconcile_occupancy
+)
+
+BENCH_PREFIX = 'bench-'
+BENCH_PASSWORD = 'bench-Password-2024'
+
+WORDS = (
+    'leak tap shower flush drain pipe basin geyser fan light switch socket bulb tube '
+    'door hinge lock window cupboard bed table chair filter cooler purifier clog '
+    'smell water broken loose noisy dripping sparking flickering jammed cracked'
+).split()
+COMPLAINT_TYPES = ('Plumbing', 'Electrical', 'Carpentry', 'Water Filter', 'Cleaning', 'Internet')
+DEPARTMENTS = ('CSE', 'ECE', 'CSE (Cyber Security)', 'CSE (Data Science)')
+ROLL_GROUPS = ('bcs', 'bec', 'bcy', 'bcd')
+# (accounts status, ssdash status, share of complaints)
+STATUS_MIX = (('resolved', 'Resolved', 0.5), ('assigned', 'In Progress', 0.2), ('pending', 'Pending', 0.3))
+
+BATCH_SIZE = 2000
+
+
+def _sentence(rng, words):
+    return ' '.join(rng.choices(WORDS, k=words))
+
+
+def _spread_over_days(model, pks, days, now):
+    """Give rows oldest-first creation times, one UPDATE per day, so ids follow created_at."""
+    per_day = max(1, -(-len(pks) // days))
+    for offset, start in enumerate(range(0, len(pks), per_day)):
+        moment = now - timedelta(days=days - offset, hours=offset % 24)
+        chunk = pks[start:start + per_day]
+        model.objects.filter(pk__gte=chunk[0], pk__lte=chunk[-1]).update(created_at=moment, updated_at=moment)
+
+
+def seed_benchmark_data(hostels=4, rooms_per_hostel=100, students=2000, workers=60, complaints=20000,
+                        days=90, seed=0):
+    """Replace any previous benchmark rows with a fresh set. Returns the row counts written."""
+    rng = random.Random(seed)
+    now = timezone.now()
+    password = make_password(BENCH_PASSWORD)
+    clear_benchmark_data()
+
+    with transaction.atomic():
+        types = ComplaintType.objects.bulk_create(
+            ComplaintType(name=f'{BENCH_PREFIX}{name}') for name in COMPLAINT_TYPES
+        )
+        wardens = CustomUser.objects.bulk_create(
+            CustomUser(username=f'{BENCH_PREFIX}warden-{i}', email=f'{BENCH_PREFIX}warden-{i}@iiitkottayam.ac.in',
+                       user_type='warden', is_staff=True, password=password)
+            for i in range(hostels)
+        )
+        hostel_rows = Hostel.objects.bulk_create(
+            Hostel(name=f'{BENCH_PREFIX}Hostel {i + 1}', location=rng.choice(('North', 'South', 'East', 'West')),
+                   capacity=rooms_per_hostel * 3, warden=warden)
+            for i, warden in enumerate(wardens)
+        )
+        # 25 rooms a floor: 101-125, 201-225, ...
+        rooms = Room.objects.bulk_create((
+            Room(hostel=hostel, room_number=f'{i // 25 + 1}{i % 25 + 1:02d}', capacity=rng.choice((2, 2, 3)))
+            for hostel in hostel_rows
+            for i in range(rooms_per_hostel)
+        ), batch_size=BATCH_SIZE)
+
+        # Fill rooms in order; students beyond the total capacity are not housed
+        beds = [room for room in rooms for _ in range(room.capacity)]
+        student_rows = CustomUser.objects.bulk_create((
+            CustomUser(
+                username=f'{BENCH_PREFIX}student-{i}', email=f'{BENCH_PREFIX}student-{i}@iiitkottayam.ac.in',
+                roll_number=f'{BENCH_PREFIX}{2021 + i % 4}{ROLL_GROUPS[i // 4 % 4]}{i // 16:04d}',
+                user_type='student', password=password,
+                hostel_id=beds[i].hostel_id if i < len(beds) else None,
+            )
+            for i in range(students)
+        ), batch_size=BATCH_SIZE)
+        StudentProfile.objects.bulk_create((
+            StudentProfile(user=user, room=beds[i] if i < len(beds) else None,
+                           year_of_study=1 + i % 4, department=rng.choice(DEPARTMENTS))
+            for i, user in enumerate(student_rows)
+        ), batch_size=BATCH_SIZE)
+
+        worker_rows = CustomUser.objects.bulk_create((
+            CustomUser(username=f'{BENCH_PREFIX}worker-{i}', email=f'{BENCH_PREFIX}worker-{i}@iiitkottayam.ac.in',
+                       user_type='worker', password=password)
+            for i in range(workers)
+        ), batch_size=BATCH_SIZE)
+        profiles = WorkerProfile.objects.bulk_create((
+            WorkerProfile(user=user, worker_type=rng.choice(('cleaning', 'itsupport')),
+                          shift=rng.choice(('Morning', 'Evening', 'Night')))
+            for user in worker_rows
+        ), batch_size=BATCH_SIZE)
+        Through = WorkerProfile.complaint_types.through
+        handles = {complaint_type.pk: [] for complaint_type in types}
+        links = []
+        for profile in profiles:
+            for complaint_type in rng.sample(types, k=min(2, len(types))):
+                links.append(Through(workerprofile_id=profile.pk, complainttype_id=complaint_type.pk))
+                handles[complaint_type.pk].append(profile.user_id)
+        Through.objects.bulk_create(links, batch_size=BATCH_SIZE)
+
+        UserProfile.objects.bulk_create((
+            UserProfile(user=user, roll_number=user.roll_number or '')
+            for user in wardens + student_rows + worker_rows
+        ), batch_size=BATCH_SIZE)
+
+        weights = [share for _, _, share in STATUS_MIX]
+        filed = []
+        for _ in range(complaints):
+            complaint_type = rng.choice(types)
+            status = rng.choices(STATUS_MIX, weights)[0][0]
+            worker = None
+            if status != 'pending' and handles[complaint_type.pk]:
+                worker = rng.choice(handles[complaint_type.pk])
+            student = rng.choice(student_rows)
+            filed.append(Complaint(
+                student=student, complaint_type=complaint_type, description=_sentence(rng, 20),
+                status=status if worker else 'pending', assigned_worker_id=worker,
+                rollup_hostel_id=student.hostel_id,
+            ))
+        filed = Complaint.objects.bulk_create(filed, batch_size=BATCH_SIZE)
+        _spread_over_days(Complaint, [complaint.pk for complaint in filed], days, now)
+
+        room_numbers = [room.room_number for room in rooms]
+        places = [hostel.name for hostel in hostel_rows]
+        categories = [value for value, _ in DashComplaint.CATEGORY_CHOICES]
+        dash = DashComplaint.objects.bulk_create((
+            DashComplaint(
+                complaint_name=_sentence(rng, 3), description=_sentence(rng, 25),
+                room_number=rng.choice(room_numbers), complaint_category=rng.choice(categories),
+                place=rng.choice(places), status=rng.choices(STATUS_MIX, weights)[0][1],
+            )
+            for _ in range(complaints)
+        ), batch_size=BATCH_SIZE)
+        _spread_over_days(DashComplaint, [complaint.pk for complaint in dash], days, now)
+
+    reconcile_occupancy()
+    rebuild_complaint_rollups()
+    reset_index()
+    return {
+        'hostels': len(hostel_rows), 'rooms': len(rooms), 'students': len(student_rows),
+        'workers': len(worker_rows), 'wardens': len(wardens),
+        'complaints': len(filed), 'ssdash_complaints': len(dash),
+    }
+
+
+def clear_benchmark_data():
+    """Delete every row seed_benchmark_data() or a benchmark run created."""
+    with transaction.atomic():
+        DashComplaint.objects.filter(place__startswith=BENCH_PREFIX).delete()
+        CustomUser.objects.filter(username__startswith=BENCH_PREFIX).delete()
+        Hostel.objects.filter(name__startswith=BENCH_PREFIX).delete()
+        ComplaintType.objects.filter(name__startswith=BENCH_PREFIX).delete()
+    reconcile_occupancy()
+    rebuild_complaint_rollups()
+    reset_index()
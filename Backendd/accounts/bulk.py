@@ -0,0 +1,109 @@
+"""
+Set-based status changes for many complaints at once.
+
+Each call locks and reads the requested rows in one query, validates them
+item by item, then applies one UPDATE per chunk of ids. The per-row save()
+side effects (rollup buckets, dispatch loads, delta sync tombstones and
+events) are applied once for the whole batch instead.
+"""
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .dispatch import UPDATE_CHUNK_SIZE, record_load_change
+from .events import publish_bulk_change
+from .models import Complaint, ComplaintTombstone, move_complaints_in_rollups
+
+BULK_MAX_ITEMS = getattr(settings, 'BULK_MAX_ITEMS', 1000)
+
+
+class BulkError(ValueError):
+    """The request as a whole is invalid; nothing was changed."""
+
+
+def parse_ids(raw):
+    if not isinstance(raw, list) or not raw:
+        raise BulkError('ids must be a non-empty list')
+    if len(raw) > BULK_MAX_ITEMS:
+        raise BulkError(f'At most {BULK_MAX_ITEMS} ids per request')
+    try:
+        ids = [int(value) for value in raw]
+    except (TypeError, ValueError):
+        raise BulkError('ids must be integers')
+    # Keep the caller's order, drop repeats
+    return list(dict.fromkeys(ids))
+
+
+def bulk_update_complaints(ids, new_status, worker=None):
+    """
+    Move the complaints in `ids` to `new_status` (assigning `worker` when
+    given). Returns one {'id', 'result'} dict per id where result is
+    'updated', 'unchanged', 'not_found' or, for assignment,
+    'worker_cannot_handle'.
+    """
+    worker_types = set()
+    if worker is not None:
+        worker_types = set(worker.worker_profile.complaint_types.values_list('id', flat=True))
+
+    with transaction.atomic():
+        rows = {
+            row[0]: row for row in
+            Complaint.objects.select_for_update().filter(id__in=ids).values_list(
+                'id', 'status', 'assigned_worker_id', 'complaint_type_id', 'created_at',
+                'student_id', 'student__hostel_id', 'rollup_hostel_id'
+            )
+        }
+        results = []
+        changed = []
+        for complaint_id in ids:
+            row = rows.get(complaint_id)
+            if row is None:
+                result = 'not_found'
+            elif worker is not None and row[3] not in worker_types:
+                result = 'worker_cannot_handle'
+            elif row[1] == new_status and (worker is None or row[2] == worker.pk):
+                result = 'unchanged'
+            else:
+                result = 'updated'
+                changed.append(row)
+            results.append({'id': complaint_id, 'result': result})
+
+        if changed:
+            _apply(changed, new_status, worker)
+    return results
+
+
+def _apply(rows, new_status, worker):
+    values = {'status': new_status, 'updated_at': timezone.now()}
+    if worker is not None:
+        values['assigned_worker_id'] = worker.pk
+    ids = [row[0] for row in rows]
+    for start in range(0, len(ids), UPDATE_CHUNK_SIZE):
+        Complaint.objects.filter(id__in=ids[start:start + UPDATE_CHUNK_SIZE]).update(**values)
+
+    moves = defaultdict(list)
+    load_changes = Counter()
+    tombstones = []
+    changes = []
+    for (complaint_id, old_status, old_worker, complaint_type_id, created_at,
+         student_id, hostel_id, rollup_hostel_id) in rows:
+        if old_status != new_status:
+            moves[old_status].append((created_at, rollup_hostel_id, complaint_type_id))
+        if old_status == 'assigned':
+            load_changes[old_worker] -= 1
+        new_worker = worker.pk if worker is not None else old_worker
+        if new_status == 'assigned':
+            load_changes[new_worker] += 1
+        changes.append((complaint_id, student_id, hostel_id, old_worker, new_worker))
+        if old_worker and old_worker != new_worker:
+            tombstones.append(ComplaintTombstone(complaint_id=complaint_id, worker_id=old_worker, deleted=False))
+
+    for old_status, moved in moves.items():
+        move_complaints_in_rollups(moved, old_status, new_status)
+    ComplaintTombstone.objects.bulk_create(tombstones)
+    for worker_id, delta in load_changes.items():
+        if delta:
+            transaction.on_commit(lambda worker_id=worker_id, delta=delta: record_load_change(worker_id, delta))
+    publish_bulk_change(changes, new_status)
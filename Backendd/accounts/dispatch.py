@@ -0,0 +1,187 @@
+"""
+Load-balanced worker assignment.
+
+WorkerIndex keeps, per ComplaintType, a min-heap of (open complaints, worker id)
+for the available workers who handle that type. Picking the least-loaded
+worker and recording the new load are O(log n); entries made stale by a load
+change are discarded lazily when they reach the top of a heap.
+
+The process-wide index is rebuilt from the database when it is older than
+DISPATCH_INDEX_TTL seconds, when a WorkerProfile changes, and at the start
+of every batch run, so drift from other processes or manual assignments is
+bounded. The database remains the source of truth.
+"""
+import heapq
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .events import publish_bulk_change
+from .models import Complaint, WorkerProfile, move_complaints_in_rollups
+
+DISPATCH_INDEX_TTL = getattr(settings, 'DISPATCH_INDEX_TTL', 60)
+# Keep UPDATE ... WHERE id IN (...) under SQLite's bound parameter limit
+UPDATE_CHUNK_SIZE = 500
+
+
+class WorkerIndex:
+
+    def __init__(self, worker_types, loads):
+        """`worker_types` maps worker id to complaint type ids, `loads` worker id to open complaints."""
+        self.worker_types = {worker: set(types) for worker, types in worker_types.items()}
+        self.loads = {worker: loads.get(worker, 0) for worker in self.worker_types}
+        self.heaps = defaultdict(list)
+        for worker, types in self.worker_types.items():
+            for complaint_type in types:
+                self.heaps[complaint_type].append((self.loads[worker], worker))
+        for heap in self.heaps.values():
+            heapq.heapify(heap)
+
+    @classmethod
+    def from_database(cls):
+        worker_types = defaultdict(set)
+        rows = WorkerProfile.objects.filter(
+            is_available=True, user__is_active=True, user__user_type='worker'
+        ).values_list('user_id', 'complaint_types')
+        for worker, complaint_type in rows:
+            if complaint_type is not None:
+                worker_types[worker].add(complaint_type)
+        loads = dict(
+            Complaint.objects.filter(status='assigned', assigned_worker__in=list(worker_types))
+            .order_by().values_list('assigned_worker').annotate(open=Count('id'))
+        )
+        return cls(worker_types, loads)
+
+    def pick(self, complaint_type_id):
+        """Least-loaded worker for the type, charged one complaint; None if nobody qualifies."""
+        heap = self.heaps.get(complaint_type_id)
+        while heap:
+            load, worker = heap[0]
+            if self.loads.get(worker) == load:
+                self.adjust(worker, 1)
+                return worker
+            heapq.heappop(heap)
+        return None
+
+    def adjust(self, worker, delta):
+        """Record that `worker` gained (or with a negative delta, lost) open complaints."""
+        if worker not in self.loads:
+            return
+        load = max(self.loads[worker] + delta, 0)
+        self.loads[worker] = load
+        for complaint_type in self.worker_types[worker]:
+            heapq.heappush(self.heaps[complaint_type], (load, worker))
+
+
+_lock = threading.Lock()
+_index = None
+_built_at = 0.0
+
+
+def _current_index():
+    global _index, _built_at
+    if _index is None or time.monotonic() - _built_at > DISPATCH_INDEX_TTL:
+        _index = WorkerIndex.from_database()
+        _built_at = time.monotonic()
+    return _index
+
+
+def reset_index():
+    global _index
+    with _lock:
+        _index = None
+
+
+def record_load_change(worker_id, delta):
+    """Keep the index in step with assignments and resolutions made elsewhere."""
+    if worker_id is None:
+        return
+    with _lock:
+        if _index is not None:
+            _index.adjust(worker_id, delta)
+
+
+def dispatch_complaint(complaint):
+    """
+    Assign a pending complaint to the least-loaded qualified worker. Returns
+    the worker id, or None if nobody qualifies or the complaint is no longer
+    pending.
+    """
+    with transaction.atomic():
+        # Charge a worker only if no concurrent request assigned it first
+        if not Complaint.objects.select_for_update().filter(pk=complaint.pk, status='pending').exists():
+            return None
+        with _lock:
+            worker_id = _current_index().pick(complaint.complaint_type_id)
+        if worker_id is None:
+            return None
+        complaint.assigned_worker_id = worker_id
+        complaint.status = 'assigned'
+        # updated_at is the delta sync watermark
+        complaint.save(update_fields=['assigned_worker', 'status', 'updated_at'])
+    return worker_id
+
+
+def dispatch_pending(limit=None):
+    """
+    Drain the pending backlog in one transaction: pick workers in memory, then
+    issue one UPDATE per worker (chunked) and one set of rollup adjustments.
+    Returns (assigned, unassigned) counts.
+    """
+    global _index, _built_at
+    with transaction.atomic():
+        pending = (
+            Complaint.objects.select_for_update()
+            .filter(status='pending')
+            .order_by('created_at', 'id')
+            .values_list(
+                'id', 'complaint_type_id', 'created_at', 'student_id', 'student__hostel_id', 'rollup_hostel_id'
+            )
+        )
+        if limit:
+            pending = pending[:limit]
+        pending = list(pending)
+
+        with _lock:
+            # Reconcile before a large run so the picks start from true loads
+            _index = index = WorkerIndex.from_database()
+            _built_at = time.monotonic()
+            by_worker = defaultdict(list)
+            moved = []
+            changes = []
+            for complaint_id, complaint_type_id, created_at, student_id, hostel_id, rollup_hostel_id in pending:
+                worker_id = index.pick(complaint_type_id)
+                if worker_id is not None:
+                    by_worker[worker_id].append(complaint_id)
+                    changes.append((complaint_id, student_id, hostel_id, None, worker_id))
+                    moved.append((created_at, rollup_hostel_id, complaint_type_id))
+
+        now = timezone.now()
+        for worker_id, ids in by_worker.items():
+            for start in range(0, len(ids), UPDATE_CHUNK_SIZE):
+                Complaint.objects.filter(id__in=ids[start:start + UPDATE_CHUNK_SIZE], status='pending').update(
+                    assigned_worker_id=worker_id, status='assigned', updated_at=now
+                )
+        # The UPDATEs bypass the per-row rollup and event signals
+        move_complaints_in_rollups(moved, 'pending', 'assigned')
+        publish_bulk_change(changes, 'assigned')
+
+    return len(moved), len(pending) - len(moved)
+
+
+@receiver(post_save, sender=WorkerProfile)
+@receiver(post_delete, sender=WorkerProfile)
+def worker_profile_changed(sender, **kwargs):
+    reset_index()
+
+
+@receiver(m2m_changed, sender=WorkerProfile.complaint_types.through)
+def worker_types_changed(sender, **kwargs):
+    reset_index()
@@ -0,0 +1,177 @@
+"""
+Complaint change events and the server-sent events stream that carries them.
+
+Channels mirror ComplaintViewSet.get_queryset: students follow
+`student:<id>`, workers `worker:<id>`, and everyone else the `complaints`
+firehose or, with ?hostel=<id>, a single `hostel:<id>`. Every user also
+receives the ssdash complaint feed.
+"""
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework.exceptions import AuthenticationFailed
+
+from Backendd.events import format_sse, get_broker, publish
+
+from .authentication import CachedJWTAuthentication
+from .models import Complaint
+
+# Seconds between keep-alive comments, so proxies do not drop idle streams
+EVENT_STREAM_HEARTBEAT = getattr(settings, 'EVENT_STREAM_HEARTBEAT', 15)
+# Reconnect delay suggested to EventSource clients, in milliseconds
+EVENT_STREAM_RETRY = getattr(settings, 'EVENT_STREAM_RETRY', 3000)
+
+
+def complaint_channels(student_id=None, hostel_id=None, worker_ids=()):
+    channels = ['complaints', f'student:{student_id}' if student_id else None]
+    if hostel_id:
+        channels.append(f'hostel:{hostel_id}')
+    channels.extend(f'worker:{worker_id}' for worker_id in worker_ids if worker_id)
+    return channels
+
+
+def complaint_payload(complaint, hostel_id):
+    return {
+        'source': 'accounts',
+        'id': complaint.pk,
+        'status': complaint.status,
+        'complaint_type': complaint.complaint_type_id,
+        'student': complaint.student_id,
+        'hostel': hostel_id,
+        'assigned_worker': complaint.assigned_worker_id,
+        'created_at': complaint.created_at,
+    }
+
+
+def _event_type(instance, created):
+    if created:
+        return 'complaint.created'
+    if instance.status != instance._event_status:
+        if instance.status in ('assigned', 'resolved'):
+            return f'complaint.{instance.status}'
+    elif instance.status == 'assigned' and instance.assigned_worker_id != instance._event_worker_id:
+        return 'complaint.assigned'
+    return 'complaint.updated'
+
+
+@receiver(post_init, sender=Complaint)
+def remember_complaint_state(sender, instance, **kwargs):
+    instance._event_status = instance.__dict__.get('status')
+    instance._event_worker_id = instance.__dict__.get('assigned_worker_id')
+
+
+@receiver(post_save, sender=Complaint)
+def publish_complaint_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    hostel_id = instance.student.hostel_id
+    # A reassigned complaint leaves the previous worker's list as well
+    workers = {instance.assigned_worker_id, None if created else instance._event_worker_id}
+    publish(
+        complaint_channels(instance.student_id, hostel_id, workers),
+        _event_type(instance, created),
+        complaint_payload(instance, hostel_id),
+    )
+    instance._event_status = instance.status
+    instance._event_worker_id = instance.assigned_worker_id
+
+
+@receiver(post_delete, sender=Complaint)
+def publish_complaint_deleted(sender, instance, **kwargs):
+    hostel_id = instance.student.hostel_id
+    publish(
+        complaint_channels(instance.student_id, hostel_id, [instance._event_worker_id]),
+        'complaint.deleted',
+        {'source': 'accounts', 'id': instance.pk, 'student': instance.student_id, 'hostel': hostel_id},
+    )
+
+
+def publish_bulk_change(changes, status):
+    """
+    One 'complaints.bulk_updated' event per channel for writes that bypass
+    the per-row signals. `changes` are (complaint_id, student_id, hostel_id,
+    previous_worker_id, worker_id) tuples; each channel only receives its own
+    complaints.
+    """
+    by_channel = defaultdict(list)
+    for complaint_id, student_id, hostel_id, previous_worker_id, worker_id in changes:
+        item = {'id': complaint_id, 'assigned_worker': worker_id}
+        for channel in complaint_channels(student_id, hostel_id, {worker_id, previous_worker_id}):
+            if channel:
+                by_channel[channel].append(item)
+    for channel, items in by_channel.items():
+        publish([channel], 'complaints.bulk_updated', {'source': 'accounts', 'status': status, 'complaints': items})
+
+
+def _authenticate(request):
+    """
+    Resolve the JWT from the Authorization header or, because EventSource
+    cannot send headers, the `token` query parameter.
+    """
+    authenticator = CachedJWTAuthentication()
+    header = authenticator.get_header(request)
+    raw_token = authenticator.get_raw_token(header) if header else None
+    raw_token = raw_token or request.GET.get('token')
+    if not raw_token:
+        return None
+    try:
+        return authenticator.get_user(authenticator.get_validated_token(raw_token))
+    except (InvalidToken, TokenError, AuthenticationFailed):
+        return None
+
+
+def subscription_channels(user, hostel_id=None):
+    channels = ['ssdash']
+    if user.user_type == 'student':
+        channels.append(f'student:{user.pk}')
+    elif user.user_type == 'worker':
+        channels.append(f'worker:{user.pk}')
+    elif hostel_id:
+        channels.append(f'hostel:{hostel_id}')
+    else:
+        channels.append('complaints')
+    return channels
+
+
+async def complaint_event_stream(request):
+    """
+    text/event-stream of complaint changes for the authenticated user. Run
+    under ASGI so an open stream costs a coroutine rather than a thread. On
+    reconnect or a 'resync' event clients should refetch their list once.
+    """
+    user = await sync_to_async(_authenticate)(request)
+    if user is None:
+        return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+    hostel_id = request.GET.get('hostel')
+    if hostel_id and not hostel_id.isdigit():
+        return JsonResponse({'error': 'hostel must be an integer'}, status=400)
+
+    channels = subscription_channels(user, hostel_id)
+
+    async def stream():
+        # Subscribe lazily so a response that is never consumed holds nothing
+        subscription = get_broker().subscribe(channels)
+        try:
+            yield f'retry: {EVENT_STREAM_RETRY}\n\n'
+            yield format_sse({'type': 'ready', 'data': {'channels': channels}})
+            while True:
+                event = await subscription.get(timeout=EVENT_STREAM_HEARTBEAT)
+                if event is None:
+                    yield ': keep-alive\n\n'
+                    continue
+                yield format_sse(event)
+                if event['type'] == 'resync':
+                    break
+        finally:
+            subscription.close()
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
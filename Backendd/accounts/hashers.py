@@ -0,0 +1,28 @@
+"""
+Password hashers whose cost comes from settings.
+
+The algorithm names match Django's own hashers, so existing hashes keep
+verifying. Django's check_password() rehashes on a successful login whenever
+the stored hash uses a different algorithm than the first PASSWORD_HASHERS
+entry or a different cost than configured here, so changing
+DJANGO_PASSWORD_HASHER or a cost setting migrates users as they log in.
+"""
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    iterations = getattr(settings, 'PASSWORD_PBKDF2_ITERATIONS', hashers.PBKDF2PasswordHasher.iterations)
+
+
+class ScryptPasswordHasher(hashers.ScryptPasswordHasher):
+    # Memory per hash is 128 * work_factor * block_size bytes (16 MiB by default)
+    work_factor = getattr(settings, 'PASSWORD_SCRYPT_WORK_FACTOR', hashers.ScryptPasswordHasher.work_factor)
+    block_size = getattr(settings, 'PASSWORD_SCRYPT_BLOCK_SIZE', hashers.ScryptPasswordHasher.block_size)
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    """Requires the argon2-cffi package."""
+    time_cost = getattr(settings, 'PASSWORD_ARGON2_TIME_COST', hashers.Argon2PasswordHasher.time_cost)
+    memory_cost = getattr(settings, 'PASSWORD_ARGON2_MEMORY_COST', hashers.Argon2PasswordHasher.memory_cost)
+    parallelism = getattr(settings, 'PASSWORD_ARGON2_PARALLELISM', hashers.Argon2PasswordHasher.parallelism)
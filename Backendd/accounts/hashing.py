@@ -0,0 +1,92 @@
+"""
+Password hashing helpers that run outside the request's process or thread.
+
+Kept free of model imports so process pool workers can unpickle these
+functions without setting up the app registry.
+"""
+import functools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher, make_password
+from django.db import close_old_connections
+from django.http import JsonResponse
+
+ONBOARDING_HASH_WORKERS = getattr(settings, 'ONBOARDING_HASH_WORKERS', None) or os.cpu_count() or 1
+# Below this many passwords the pool's start-up cost outweighs the parallelism
+ONBOARDING_POOL_MIN_ROWS = getattr(settings, 'ONBOARDING_POOL_MIN_ROWS', 16)
+
+LOGIN_HASH_WORKERS = getattr(settings, 'LOGIN_HASH_WORKERS', None) or os.cpu_count() or 1
+# Queue length scales with the pool so a full queue drains in a few hash times
+LOGIN_MAX_PENDING = getattr(settings, 'LOGIN_MAX_PENDING', None) or LOGIN_HASH_WORKERS * 8
+LOGIN_RETRY_AFTER = getattr(settings, 'LOGIN_RETRY_AFTER', 1)
+
+
+def _hash(job):
+    password, algorithm = job
+    return make_password(password or None, hasher=algorithm)
+
+
+def hash_passwords(passwords, workers=None):
+    """make_password() for each password, across a process pool for large batches. Blank means unusable."""
+    # Resolve the hasher here so workers use the caller's PASSWORD_HASHERS choice
+    algorithm = get_hasher('default').algorithm
+    jobs = [(password, algorithm) for password in passwords]
+    workers = workers or ONBOARDING_HASH_WORKERS
+    if workers <= 1 or sum(1 for password in passwords if password) < ONBOARDING_POOL_MIN_ROWS:
+        return [_hash(job) for job in jobs]
+    # spawn rather than fork: forking a threaded web server can deadlock
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        return list(pool.map(_hash, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+
+
+_login_executor = None
+_login_executor_lock = threading.Lock()
+# Logins running or queued; once all are taken further logins are refused
+_login_slots = threading.BoundedSemaphore(LOGIN_HASH_WORKERS + LOGIN_MAX_PENDING)
+
+
+def get_login_executor():
+    global _login_executor
+    if _login_executor is None:
+        with _login_executor_lock:
+            if _login_executor is None:
+                _login_executor = ThreadPoolExecutor(max_workers=LOGIN_HASH_WORKERS, thread_name_prefix='login')
+    return _login_executor
+
+
+def _call_with_connection(view, request, *args, **kwargs):
+    # Pool threads outlive requests, so apply CONN_MAX_AGE as the request cycle would
+    close_old_connections()
+    try:
+        return view(request, *args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+def bounded_hashing(view):
+    """
+    Run a synchronous view that verifies passwords on the login pool.
+
+    The event loop only awaits the result, hashing never runs on more than
+    LOGIN_HASH_WORKERS threads, and once LOGIN_MAX_PENDING more requests are
+    waiting, new ones get a 503 with Retry-After instead of piling up.
+    """
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if not _login_slots.acquire(blocking=False):
+            response = JsonResponse({'detail': 'Too many login attempts in progress, retry shortly.'}, status=503)
+            response['Retry-After'] = str(LOGIN_RETRY_AFTER)
+            return response
+        try:
+            run = sync_to_async(_call_with_connection, thread_sensitive=False, executor=get_login_executor())
+            return await run(view, request, *args, **kwargs)
+        finally:
+            _login_slots.release()
+
+    return wrapper
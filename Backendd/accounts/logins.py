@@ -0,0 +1,99 @@
+"""
+Deferred last_login stamps for token logins.
+
+Writing last_login on every login takes SQLite's write lock once per request
+during a login burst. record_login() stamps the user object and buffers the
+time in process instead; flush_logins() writes the buffer with one bulk
+UPDATE once LAST_LOGIN_BATCH_SIZE users are waiting, from a timer
+LAST_LOGIN_FLUSH_INTERVAL seconds after the oldest buffered stamp, and
+again at interpreter exit. A process killed outright loses at most one
+interval of stamps. Set the interval to 0 to write every login straight
+away.
+"""
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+from django.utils import timezone
+
+from .models import CustomUser
+
+logger = logging.getLogger(__name__)
+
+LAST_LOGIN_FLUSH_INTERVAL = getattr(settings, 'LAST_LOGIN_FLUSH_INTERVAL', 30)
+LAST_LOGIN_BATCH_SIZE = getattr(settings, 'LAST_LOGIN_BATCH_SIZE', 500)
+
+_pending = {}
+_pending_since = None
+_timer = None
+_lock = threading.Lock()
+
+
+def _flush_on_timer():
+    global _timer
+    with _lock:
+        _timer = None
+    try:
+        flush_logins()
+    finally:
+        # The timer thread's own connection
+        connections.close_all()
+
+
+def _schedule_flush():
+    """Start the flush timer unless one is running. Call with _lock held."""
+    global _timer
+    if _timer is None and LAST_LOGIN_FLUSH_INTERVAL > 0:
+        _timer = threading.Timer(LAST_LOGIN_FLUSH_INTERVAL, _flush_on_timer)
+        _timer.daemon = True
+        _timer.start()
+
+
+def record_login(user):
+    """Set user.last_login to now; the row is written on the next flush."""
+    global _pending_since
+    user.last_login = timezone.now()
+    with _lock:
+        _pending[user.pk] = user.last_login
+        if _pending_since is None:
+            _pending_since = time.monotonic()
+            _schedule_flush()
+        due = (len(_pending) >= LAST_LOGIN_BATCH_SIZE
+               or time.monotonic() - _pending_since >= LAST_LOGIN_FLUSH_INTERVAL)
+    if due:
+        flush_logins()
+
+
+def flush_logins():
+    """Write buffered last_login stamps. Returns the number of users written."""
+    global _pending_since, _timer
+    with _lock:
+        pending = dict(_pending)
+        _pending.clear()
+        _pending_since = None
+        if _timer is not None:
+            _timer.cancel()
+            _timer = None
+    if not pending:
+        return 0
+    # bulk_update sends no post_save, so the profile and cache receivers stay out of it
+    users = [CustomUser(pk=pk, last_login=stamp) for pk, stamp in pending.items()]
+    try:
+        CustomUser.objects.bulk_update(users, ['last_login'], batch_size=LAST_LOGIN_BATCH_SIZE)
+    except DatabaseError as exc:
+        logger.warning('Could not write %s last_login stamps: %s', len(pending), exc)
+        with _lock:
+            # Keep stamps recorded since, they are newer
+            for pk, stamp in pending.items():
+                _pending.setdefault(pk, stamp)
+            if _pending_since is None:
+                _pending_since = time.monotonic()
+            _schedule_flush()
+        return 0
+    return len(pending)
+
+
+atexit.register(flush_logins)
@@ -0,0 +1,303 @@
+import asyncio
+import io
+import json
+import math
+import platform
+import random
+import statistics
+import time
+import urllib.error
+import urllib.request
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import AsyncClient, override_settings
+from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from Backendd.ratelimit import paused
+from accounts.benchdata import BENCH_PASSWORD, BENCH_PREFIX, WORDS
+from accounts.logins import flush_logins
+from accounts.models import Complaint, CustomUser, Hostel, WorkerProfile
+from ssdash.models import Complaint as DashComplaint
+
+# Relative share of each scenario in the request mix
+SCENARIOS = {
+    'login': 1,
+    'current_user': 4,
+    'complaint_list': 4,
+    'complaint_search': 3,
+    'complaint_filter': 3,
+    'complaint_create': 1,
+    'complaint_assign': 1,
+    'complaint_resolve': 1,
+}
+IMAGES = 4
+
+
+def sample_image(rng, size=(1280, 960)):
+    """A JPEG of coloured blocks: compresses like a photo of a wall, not like noise."""
+    from PIL import Image, ImageDraw
+
+    image = Image.new('RGB', size, tuple(rng.randrange(256) for _ in range(3)))
+    draw = ImageDraw.Draw(image)
+    for _ in range(40):
+        x, y = rng.randrange(size[0]), rng.randrange(size[1])
+        draw.rectangle(
+            (x, y, x + rng.randrange(20, 400), y + rng.randrange(20, 300)),
+            fill=tuple(rng.randrange(256) for _ in range(3)),
+        )
+    buffer = io.BytesIO()
+    image.save(buffer, 'JPEG', quality=85)
+    return buffer.getvalue()
+
+
+def percentile(ordered, q):
+    """Nearest-rank percentile of an already sorted list."""
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+class Command(BaseCommand):
+    help = (
+        'Drive a seeded mix of the hot API endpoints (login, complaint list, '
+        'search and filter, create with attachment, assign and resolve, '
+        'current_user) concurrently and report throughput, p50/p99 latency and '
+        'query counts as JSON. Run seed_benchmark_data first; requests go '
+        'through the ASGI handler in-process, or to a running server with --url. '
+        'Query counts come from X-Query-Count, which the server only sends with '
+        'METRICS_DEBUG_HEADERS (on when DEBUG is). Rate limits are paused '
+        'in-process; a server behind --url needs RATE_LIMITS relaxed.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=1000)
+        parser.add_argument('--concurrency', type=int, default=10)
+        parser.add_argument('--warmup', type=int, default=20, help='Unrecorded requests sent first')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--scenarios', help=f"Comma-separated subset of: {', '.join(SCENARIOS)}")
+        parser.add_argument('--url', help='Base URL of a running server, e.g. http://127.0.0.1:8000')
+        parser.add_argument('--output', help='Write the JSON report here instead of to stdout')
+
+    def handle(self, *args, **options):
+        scenarios = SCENARIOS
+        if options['scenarios']:
+            names = [name.strip() for name in options['scenarios'].split(',') if name.strip()]
+            unknown = set(names) - set(SCENARIOS)
+            if unknown:
+                raise CommandError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+            scenarios = {name: SCENARIOS[name] for name in names}
+
+        rng = random.Random(options['seed'])
+        self.prepare(rng)
+        total = options['warmup'] + options['requests']
+        names = rng.choices(list(scenarios), list(scenarios.values()), k=total)
+        plan = [(name, *getattr(self, f'build_{name}')(rng)) for name in names]
+
+        if options['url']:
+            run = lambda requests: self.run_remote(options['url'], requests, options['concurrency'])
+        else:
+            run = lambda requests: asyncio.run(self.run_local(requests, options['concurrency']))
+        # The in-process client sends Host: testserver, from one address that
+        # the rate limits would otherwise throttle
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']), paused():
+            run(plan[:options['warmup']])
+            start = time.perf_counter()
+            results = run(plan[options['warmup']:])
+            elapsed = time.perf_counter() - start
+        flush_logins()
+
+        report = {
+            'config': {
+                'target': options['url'] or 'in-process',
+                'requests': options['requests'],
+                'concurrency': options['concurrency'],
+                'warmup': options['warmup'],
+                'seed': options['seed'],
+                'scenarios': scenarios,
+                'database': connection.vendor,
+                'password_hasher': get_hasher('default').algorithm,
+                'django': django.get_version(),
+                'python': platform.python_version(),
+                'started_at': timezone.now().isoformat(),
+            },
+            **self.summarize(results, elapsed),
+        }
+        if report['total']['queries_mean'] is None:
+            self.stderr.write('No X-Query-Count headers: enable METRICS_DEBUG_HEADERS for query counts')
+        rendered = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as out:
+                out.write(rendered + '\n')
+            for name, row in report['scenarios'].items():
+                self.stdout.write(
+                    f"{name:<20}{row['requests']:>6} req {row['throughput_rps']:>8.1f}/s "
+                    f"p50 {row['p50_ms']:>8.1f} ms  p99 {row['p99_ms']:>8.1f} ms  "
+                    f"queries {row['queries_mean'] if row['queries_mean'] is not None else '-'}"
+                )
+            self.stdout.write(f"Total {report['total']['throughput_rps']:.1f} req/s; report in {options['output']}")
+        else:
+            self.stdout.write(rendered)
+
+    def prepare(self, rng):
+        """Load the seeded rows the scenarios draw from."""
+        users = CustomUser.objects.filter(username__startswith=BENCH_PREFIX).order_by('pk')
+        self.students = list(users.filter(user_type='student')[:500])
+        self.wardens = list(users.filter(user_type='warden'))
+        if not self.students or not self.wardens:
+            raise CommandError('No benchmark data; run `manage.py seed_benchmark_data` first')
+        self.places = list(Hostel.objects.filter(name__startswith=BENCH_PREFIX).values_list('name', flat=True))
+        self.tokens = {}
+
+        handles = defaultdict(list)
+        for worker_id, type_id in WorkerProfile.complaint_types.through.objects.filter(
+            workerprofile__user__username__startswith=BENCH_PREFIX, workerprofile__is_available=True,
+        ).values_list('workerprofile__user_id', 'complainttype_id'):
+            handles[type_id].append(worker_id)
+        complaints = Complaint.objects.filter(student__username__startswith=BENCH_PREFIX).order_by('pk')
+        self.to_assign = [
+            (pk, rng.choice(handles[type_id]))
+            for pk, type_id in complaints.filter(status='pending').values_list('pk', 'complaint_type_id')[:5000]
+            if handles[type_id]
+        ]
+        self.to_resolve = list(complaints.filter(status='assigned').values_list('pk', flat=True)[:5000])
+        self.images = [sample_image(rng) for _ in range(IMAGES)]
+        self.categories = [value for value, _ in DashComplaint.CATEGORY_CHOICES]
+        self.statuses = [value for value, _ in DashComplaint.STATUS_CHOICES]
+
+    def token(self, user):
+        if user.pk not in self.tokens:
+            self.tokens[user.pk] = str(AccessToken.for_user(user))
+        return self.tokens[user.pk]
+
+    # Each build_<scenario> returns (method, path, query or body, body kind, bearer token)
+
+    def build_login(self, rng):
+        student = rng.choice(self.students)
+        body = {'username': student.roll_number, 'password': BENCH_PASSWORD}
+        return 'POST', reverse('token_obtain_pair'), body, 'json', None
+
+    def build_current_user(self, rng):
+        return 'GET', reverse('current_user'), {}, None, self.token(rng.choice(self.students))
+
+    def build_complaint_list(self, rng):
+        return 'GET', '/accounts/api/complaints/', {}, None, self.token(rng.choice(self.wardens))
+
+    def build_complaint_search(self, rng):
+        query = {'search': ' '.join(rng.sample(WORDS, k=rng.choice((1, 1, 2))))}
+        return 'GET', '/api/complaints/', query, None, self.token(rng.choice(self.wardens))
+
+    def build_complaint_filter(self, rng):
+        query = {'status': rng.choice(self.statuses), 'complaint_category': rng.choice(self.categories)}
+        return 'GET', '/api/complaints/', query, None, self.token(rng.choice(self.wardens))
+
+    def build_complaint_create(self, rng):
+        body = {
+            'complaint_name': ' '.join(rng.sample(WORDS, k=3)),
+            'description': ' '.join(rng.choices(WORDS, k=25)),
+            'room_number': str(rng.randint(101, 425)),
+            'complaint_category': rng.choice(self.categories),
+            # Keeps the row under the benchmark prefix, so clearing removes it
+            'place': rng.choice(self.places),
+            'attachment': ('photo.jpg', rng.choice(self.images)),
+        }
+        return 'POST', '/api/complaints/', body, 'multipart', self.token(rng.choice(self.students))
+
+    def build_complaint_assign(self, rng):
+        if not self.to_assign:
+            raise CommandError('No pending benchmark complaints left to assign; reseed')
+        pk, worker_id = self.to_assign.pop()
+        path = f'/accounts/api/complaints/{pk}/assign_worker/'
+        return 'POST', path, {'worker_id': worker_id}, 'json', self.token(rng.choice(self.wardens))
+
+    def build_complaint_resolve(self, rng):
+        if not self.to_resolve:
+            raise CommandError('No assigned benchmark complaints left to resolve; reseed')
+        path = f'/accounts/api/complaints/{self.to_resolve.pop()}/mark_resolved/'
+        return 'POST', path, {}, 'json', self.token(rng.choice(self.wardens))
+
+    @staticmethod
+    def files(body):
+        return {
+            key: SimpleUploadedFile(value[0], value[1], 'image/jpeg') if isinstance(value, tuple) else value
+            for key, value in body.items()
+        }
+
+    async def run_local(self, requests, concurrency):
+        client = AsyncClient()
+        gate = asyncio.Semaphore(concurrency)
+
+        async def send(name, method, path, data, kind, token):
+            headers = {'Authorization': f'Bearer {token}'} if token else {}
+            async with gate:
+                start = time.perf_counter()
+                if method == 'GET':
+                    response = await client.get(path, data, headers=headers)
+                elif kind == 'json':
+                    response = await client.post(path, data, content_type='application/json', headers=headers)
+                else:
+                    response = await client.post(path, self.files(data), headers=headers)
+                elapsed = time.perf_counter() - start
+            return name, response.status_code, elapsed, response.headers.get('X-Query-Count')
+
+        return await asyncio.gather(*(send(*request) for request in requests))
+
+    def run_remote(self, base_url, requests, concurrency):
+        base_url = base_url.rstrip('/')
+
+        def send(name, method, path, data, kind, token):
+            headers = {'Authorization': f'Bearer {token}'} if token else {}
+            url, body = base_url + path, None
+            if method == 'GET':
+                url += f'?{urlencode(data)}' if data else ''
+            elif kind == 'json':
+                body, headers['Content-Type'] = json.dumps(data).encode(), 'application/json'
+            else:
+                body, headers['Content-Type'] = encode_multipart(BOUNDARY, self.files(data)), MULTIPART_CONTENT
+            request = urllib.request.Request(url, body, headers, method=method)
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request) as response:
+                    response.read()
+                    status, queries = response.status, response.headers.get('X-Query-Count')
+            except urllib.error.HTTPError as exc:
+                status, queries = exc.code, exc.headers.get('X-Query-Count')
+            return name, status, time.perf_counter() - start, queries
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            return list(pool.map(lambda request: send(*request), requests))
+
+    @staticmethod
+    def summarize(results, elapsed):
+        def stats(rows):
+            timings = sorted(duration * 1000 for _, _, duration, _ in rows)
+            queries = [int(count) for _, _, _, count in rows if count is not None]
+            statuses = Counter(status for _, status, _, _ in rows)
+            return {
+                'requests': len(rows),
+                'errors': sum(n for status, n in statuses.items() if status >= 400),
+                'status_codes': {str(status): n for status, n in sorted(statuses.items())},
+                'throughput_rps': round(len(rows) / elapsed, 2),
+                'mean_ms': round(statistics.fmean(timings), 2),
+                'p50_ms': round(percentile(timings, 50), 2),
+                'p99_ms': round(percentile(timings, 99), 2),
+                'queries_mean': round(statistics.fmean(queries), 2) if queries else None,
+                'queries_max': max(queries) if queries else None,
+            }
+
+        by_scenario = defaultdict(list)
+        for row in results:
+            by_scenario[row[0]].append(row)
+        return {
+            'elapsed_s': round(elapsed, 3),
+            'total': stats(results),
+            'scenarios': {name: stats(rows) for name, rows in sorted(by_scenario.items())},
+        }
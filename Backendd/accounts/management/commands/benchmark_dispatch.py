@@ -0,0 +1,88 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from accounts.dispatch import WorkerIndex, dispatch_pending, reset_index
+from accounts.models import Complaint, ComplaintType, CustomUser, WorkerProfile
+
+
+class Command(BaseCommand):
+    help = (
+        'Time automatic worker dispatch on synthetic data. Rows are inserted '
+        'inside a transaction that is rolled back afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=500)
+        parser.add_argument('--complaints', type=int, default=10000)
+        parser.add_argument('--types', type=int, default=12)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+
+        with transaction.atomic():
+            start = time.perf_counter()
+            types = ComplaintType.objects.bulk_create(
+                ComplaintType(name=f'bench-type-{i}') for i in range(options['types'])
+            )
+            workers = CustomUser.objects.bulk_create((
+                CustomUser(username=f'bench-worker-{i}', email=f'bench-worker-{i}@iiitkottayam.ac.in',
+                           user_type='worker')
+                for i in range(options['workers'])
+            ), batch_size=500)
+            profiles = WorkerProfile.objects.bulk_create(
+                WorkerProfile(user=worker, worker_type='cleaning') for worker in workers
+            )
+            Through = WorkerProfile.complaint_types.through
+            Through.objects.bulk_create((
+                Through(workerprofile_id=profile.pk, complainttype_id=complaint_type.pk)
+                for profile in profiles
+                for complaint_type in rng.sample(types, k=3)
+            ), batch_size=2000)
+            student = CustomUser.objects.create(
+                username='bench-student', email='bench-student@iiitkottayam.ac.in', user_type='student'
+            )
+            Complaint.objects.bulk_create((
+                Complaint(student=student, complaint_type=rng.choice(types), description='benchmark')
+                for _ in range(options['complaints'])
+            ), batch_size=2000)
+            self.stdout.write(
+                f"Seeded {options['workers']} workers and {options['complaints']} pending complaints "
+                f"in {time.perf_counter() - start:.1f}s"
+            )
+
+            start = time.perf_counter()
+            index = WorkerIndex.from_database()
+            self.stdout.write(f'Index build: {(time.perf_counter() - start) * 1000:.1f} ms')
+
+            timings = []
+            for _ in range(options['complaints']):
+                complaint_type = rng.choice(types).pk
+                start = time.perf_counter()
+                index.pick(complaint_type)
+                timings.append((time.perf_counter() - start) * 1e6)
+            self.stdout.write(
+                f'Single pick: median {statistics.median(timings):.1f} us, '
+                f'p99 {statistics.quantiles(timings, n=100)[98]:.1f} us'
+            )
+
+            start = time.perf_counter()
+            assigned, unassigned = dispatch_pending()
+            elapsed = time.perf_counter() - start
+            self.stdout.write(
+                f'Batch dispatch: {assigned} assigned, {unassigned} unassigned in {elapsed * 1000:.0f} ms'
+            )
+
+            loads = list(
+                Complaint.objects.filter(status='assigned')
+                .values('assigned_worker').annotate(n=Count('id')).values_list('n', flat=True)
+            )
+            if loads:
+                self.stdout.write(f'Load per worker: min {min(loads)}, max {max(loads)}')
+            transaction.set_rollback(True)
+        reset_index()
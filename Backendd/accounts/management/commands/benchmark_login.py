@@ -0,0 +1,138 @@
+import asyncio
+import json
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher, make_password
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.test import AsyncClient, override_settings
+from django.urls import reverse
+
+from Backendd.ratelimit import paused
+from accounts.logins import flush_logins
+from accounts.models import CustomUser
+
+PASSWORD = 'bench-Login-2024'
+PREFIX = 'bench-login-'
+
+
+class WriteCounter:
+    """Execute wrapper counting INSERT/UPDATE/DELETE statements on every connection it is installed on."""
+
+    def __init__(self):
+        self.count = 0
+        self.active = True
+        self.lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        if self.active and sql.lstrip()[:6].upper() in ('INSERT', 'UPDATE', 'DELETE'):
+            with self.lock:
+                self.count += 1
+        return execute(sql, params, many, context)
+
+    def install(self, sender=None, connection=connection, **kwargs):
+        # The login pool opens a connection per request, each on its own thread
+        if self not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self)
+
+
+class Command(BaseCommand):
+    help = (
+        'Time concurrent logins against /accounts/api/auth/login/. Requests go '
+        'through the ASGI handler in-process, or to a running server with --url. '
+        'The seeded users are committed, since the login pool uses its own '
+        'connections, and deleted afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=20)
+        parser.add_argument('--url', help='Login URL of a running server, e.g. http://127.0.0.1:8000/accounts/api/auth/login/')
+
+    def handle(self, *args, **options):
+        hasher = get_hasher('default')
+        start = time.perf_counter()
+        password = make_password(PASSWORD)
+        self.stdout.write(f'Hasher: {hasher.algorithm}, one hash {(time.perf_counter() - start) * 1000:.0f} ms')
+
+        CustomUser.objects.filter(username__startswith=PREFIX).delete()
+        users = CustomUser.objects.bulk_create(
+            CustomUser(username=f'{PREFIX}{i}', email=f'{PREFIX}{i}@iiitkottayam.ac.in',
+                       roll_number=f'{PREFIX}{i}', user_type='student', password=password)
+            for i in range(options['users'])
+        )
+        logins = [users[i % len(users)].roll_number for i in range(options['requests'])]
+        writes = WriteCounter()
+        writes.install()
+        connection_created.connect(writes.install)
+        try:
+            start = time.perf_counter()
+            if options['url']:
+                results = self.run_remote(options['url'], logins, options['concurrency'])
+            else:
+                # The in-process client sends Host: testserver, from one address
+                # that the login rate limit would otherwise throttle
+                with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']), paused():
+                    results = asyncio.run(self.run_local(logins, options['concurrency']))
+            elapsed = time.perf_counter() - start
+            flush_logins()
+        finally:
+            writes.active = False
+            connection_created.disconnect(writes.install)
+            CustomUser.objects.filter(username__startswith=PREFIX).delete()
+
+        statuses = Counter(status for status, _ in results)
+        timings = sorted(duration for status, duration in results if status == 200)
+        self.stdout.write(
+            f"{len(results)} logins, concurrency {options['concurrency']}: {elapsed:.2f}s, "
+            f"{statuses[200] / elapsed:.1f} successful logins/s"
+        )
+        if not options['url']:
+            self.stdout.write(f'Database writes: {writes.count} ({writes.count / len(results):.2f} per login)')
+        self.stdout.write('Status codes: ' + ', '.join(f'{code} x{n}' for code, n in sorted(statuses.items())))
+        if len(timings) >= 2:
+            quantiles = statistics.quantiles(timings, n=100)
+            self.stdout.write(
+                f'Latency: p50 {quantiles[49] * 1000:.0f} ms, p95 {quantiles[94] * 1000:.0f} ms, '
+                f'p99 {quantiles[98] * 1000:.0f} ms'
+            )
+
+    async def run_local(self, logins, concurrency):
+        client = AsyncClient()
+        url = reverse('token_obtain_pair')
+        gate = asyncio.Semaphore(concurrency)
+
+        async def login(username):
+            async with gate:
+                start = time.perf_counter()
+                response = await client.post(
+                    url, {'username': username, 'password': PASSWORD},
+                    content_type='application/json',
+                )
+                return response.status_code, time.perf_counter() - start
+
+        return await asyncio.gather(*(login(username) for username in logins))
+
+    def run_remote(self, url, logins, concurrency):
+        def login(username):
+            body = json.dumps({'username': username, 'password': PASSWORD}).encode()
+            request = urllib.request.Request(url, body, {'Content-Type': 'application/json'})
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request) as response:
+                    status = response.status
+            except urllib.error.HTTPError as exc:
+                status = exc.code
+            return status, time.perf_counter() - start
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            return list(pool.map(login, logins))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from accounts.dispatch import dispatch_pending
+
+
+class Command(BaseCommand):
+    help = 'Assign every pending complaint to the least-loaded qualified worker in one transaction'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=None, help='Dispatch at most this many complaints')
+
+    def handle(self, *args, **options):
+        assigned, unassigned = dispatch_pending(options['limit'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Assigned {assigned} complaint(s); {unassigned} left pending with no qualified worker'
+        ))
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from Backendd.export import EXPORT_FORMATS, export_lines, filter_created
+from accounts.views import ComplaintViewSet
+from ssdash.views import ComplaintViewSet as SsdashComplaintViewSet
+
+SOURCES = {
+    'accounts': ComplaintViewSet,
+    'ssdash': SsdashComplaintViewSet,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Stream complaints to a CSV or JSON Lines file with the same columns as '
+        'the export endpoints, in constant memory.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source', choices=SOURCES, default='accounts')
+        parser.add_argument('--output', choices=EXPORT_FORMATS, default='csv')
+        parser.add_argument('--created-after', help='ISO 8601 date or datetime (inclusive)')
+        parser.add_argument('--created-before', help='ISO 8601 date or datetime (exclusive; dates include the day)')
+        parser.add_argument('--file', help='Write here instead of stdout')
+
+    def handle(self, *args, **options):
+        viewset = SOURCES[options['source']]
+        try:
+            queryset = filter_created(
+                viewset.queryset.model.objects.all(), options['created_after'], options['created_before']
+            )
+        except ValueError as exc:
+            raise CommandError(f'Invalid date: {exc}')
+
+        lines = export_lines(queryset, viewset.export_columns, options['output'])
+        if options['file']:
+            with open(options['file'], 'w', newline='', encoding='utf-8') as out:
+                out.writelines(lines)
+        else:
+            for chunk in lines:
+                self.stdout.write(chunk, ending='')
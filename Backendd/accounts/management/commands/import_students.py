@@ -0,0 +1,41 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.onboarding import OnboardingError, import_students, read_rows
+
+
+class Command(BaseCommand):
+    help = (
+        'Create student accounts from a CSV (with header) or JSON Lines file. '
+        'The whole file is rejected if any row is invalid unless --partial is given.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--partial', action='store_true', help='Import the valid rows even if others fail')
+        parser.add_argument('--dry-run', action='store_true', help='Validate only')
+        parser.add_argument(
+            '--allocate-rooms', action='store_true',
+            help='Fill free rooms for rows that name a hostel but no room'
+        )
+        parser.add_argument('--workers', type=int, help='Password hashing processes (default: CPU count)')
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['path'], 'rb') as stream:
+                rows = read_rows(stream, options['path'])
+        except (OSError, OnboardingError) as exc:
+            raise CommandError(str(exc))
+
+        report = import_students(
+            rows, partial=options['partial'], dry_run=options['dry_run'],
+            allocate_rooms=options['allocate_rooms'], workers=options['workers'],
+        )
+        for row, errors in report['errors'].items():
+            self.stderr.write(f'Row {row}: {json.dumps(errors)}')
+        if report['errors'] and not report['created'] and not options['dry_run']:
+            raise CommandError(f"{len(report['errors'])} invalid row(s); nothing imported")
+        self.stdout.write(self.style.SUCCESS(
+            f"Validated {len(rows)} row(s), created {report['created']}"
+        ))
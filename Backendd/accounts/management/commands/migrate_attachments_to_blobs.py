@@ -0,0 +1,60 @@
+
+from django.apps import apps
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from Backendd.storage import blob_digest, blob_storage
+from accounts.models import BLOB_FILE_FIELDS, move_blob_reference
+
+
+class Command(BaseCommand):
+    help = (
+        'Move attachments and profile photos stored under their upload names '
+        'into content-addressed blob storage, so identical files are kept once. '
+        'Run render_attachment_variants afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--delete-originals', action='store_true',
+                            help='Delete the old files once every row has moved off them')
+
+    def handle(self, *args, **options):
+        legacy = FileSystemStorage()
+        storage = blob_storage()
+        moved, before, originals = {}, 0, set()
+
+        with transaction.atomic():
+            for label, field in BLOB_FILE_FIELDS:
+                model = apps.get_model(label)
+                rows = model.objects.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True})
+                for pk, name in rows.values_list('pk', field).iterator():
+                    if blob_digest(name):
+                        continue
+                    if name not in moved:
+                        if not legacy.exists(name):
+                            self.stderr.write(f'{label} {pk}: {name} is missing, left as is')
+                            continue
+                        before += legacy.size(name)
+                        with legacy.open(name) as content:
+                            moved[name] = storage.save(name, File(content))
+                    # A queryset update: the row's file did not change, only its name
+                    changes = {field: moved[name]}
+                    if any(f.name == 'updated_at' for f in model._meta.concrete_fields):
+                        changes['updated_at'] = timezone.now()
+                    model.objects.filter(pk=pk).update(**changes)
+                    move_blob_reference(None, moved[name])
+                    originals.add(name)
+
+        after = sum(storage.size(name) for name in set(moved.values()))
+        self.stdout.write(
+            f'Moved {len(moved)} file(s) ({before / 1024:.0f} KiB) into '
+            f'{len(set(moved.values()))} blob(s) ({after / 1024:.0f} KiB)'
+        )
+        if options['delete_originals']:
+            for name in originals:
+                legacy.delete(name)
+            self.stdout.write(f'Deleted {len(originals)} original file(s)')
+        self.stdout.write(self.style.SUCCESS('Done'))
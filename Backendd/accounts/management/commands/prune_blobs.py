@@ -0,0 +1,91 @@
+import os
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from Backendd.attachments import ATTACHMENT_VARIANTS, variant_name
+from Backendd.storage import BLOB_PREFIX, blob_digest, blob_storage
+from accounts.models import StoredBlob, reconcile_blobs
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete content-addressed blobs, and their variants, that no file field '
+        'has referenced for the grace period. Files left by uploads whose '
+        'transaction rolled back are removed after the same grace period.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace-hours', type=float, default=24)
+        parser.add_argument('--no-reconcile', action='store_true', help='Trust the stored reference counts')
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        if not options['no_reconcile'] and not options['dry_run']:
+            self.stdout.write(f'Reconciled {reconcile_blobs()} reference count(s)')
+        cutoff = timezone.now() - timedelta(hours=options['grace_hours'])
+        oldest = time.time() - options['grace_hours'] * 3600
+        storage = blob_storage()
+        removed, freed = 0, 0
+
+        unused = list(StoredBlob.objects.filter(references=0, updated_at__lt=cutoff).values_list('name', flat=True))
+        # Blobs on disk with no row at all, and temporary files of failed uploads or prunes
+        known = set(StoredBlob.objects.values_list('name', flat=True))
+        orphans, leftovers = [], []
+        for directory, _, files in os.walk(storage.path(BLOB_PREFIX)):
+            for filename in files:
+                path = os.path.join(directory, filename)
+                name = os.path.relpath(path, storage.location).replace(os.sep, '/')
+                try:
+                    if os.path.getmtime(path) >= oldest:
+                        continue
+                except FileNotFoundError:
+                    continue
+                if filename.startswith(('.upload-', '.prune-')):
+                    leftovers.append(path)
+                elif blob_digest(name) and name not in known:
+                    orphans.append(name)
+
+        for name in unused + orphans:
+            # Check again and delete while holding the row (or, for SQLite,
+            # the database) so no upload can count a new reference meanwhile.
+            # delete_if_stale() covers uploads that reused the file but have
+            # not counted it yet.
+            with transaction.atomic():
+                blobs = StoredBlob.objects.select_for_update().filter(name=name)
+                if name in known:
+                    blob = blobs.filter(references=0, updated_at__lt=cutoff).first()
+                    if blob is None:
+                        continue
+                elif blobs.exists():
+                    continue
+                if options['dry_run']:
+                    size = storage.size(name) if storage.exists(name) else 0
+                else:
+                    size = storage.delete_if_stale(name, oldest)
+                    if size is None:
+                        continue
+                    if name in known:
+                        blob.delete()
+                freed += size
+                for path in [variant_name(name, variant) for variant in ATTACHMENT_VARIANTS]:
+                    if storage.exists(path):
+                        freed += storage.size(path)
+                        if not options['dry_run']:
+                            storage.delete(path)
+            removed += 1
+
+        for path in leftovers:
+            try:
+                freed += os.path.getsize(path)
+                if not options['dry_run']:
+                    os.unlink(path)
+            except FileNotFoundError:
+                pass
+        verb = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {removed} blob(s) and {len(leftovers)} failed upload(s), {freed / 1024:.0f} KiB'
+        ))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from Backendd.delta import DELTA_SYNC_RETENTION
+from accounts.models import ComplaintTombstone
+from ssdash.models import ComplaintTombstone as SsdashComplaintTombstone
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete complaint tombstones older than DELTA_SYNC_TOMBSTONE_DAYS. '
+        'Clients holding older watermarks are told to reload their full list.'
+    )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - DELTA_SYNC_RETENTION
+        for model in (ComplaintTombstone, SsdashComplaintTombstone):
+            deleted, _ = model.objects.filter(deleted_at__lt=cutoff).delete()
+            self.stdout.write(f'{model._meta.label}: pruned {deleted}')
+        self.stdout.write(self.style.SUCCESS('Done'))
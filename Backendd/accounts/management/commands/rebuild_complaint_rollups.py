@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from accounts.models import rebuild_complaint_rollups
+
+
+class Command(BaseCommand):
+    help = 'Recompute the daily and weekly complaint rollup buckets from the complaints table'
+
+    def handle(self, *args, **options):
+        rows = rebuild_complaint_rollups()
+        self.stdout.write(self.style.SUCCESS(f'Wrote {rows} rollup bucket(s)'))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from accounts.models import reconcile_occupancy
+
+
+class Command(BaseCommand):
+    help = 'Recount hostel and room occupancy and repair drifted counters'
+
+    def handle(self, *args, **options):
+        hostels, rooms = reconcile_occupancy()
+        self.stdout.write(self.style.SUCCESS(
+            f'Repaired {hostels} hostel(s) and {rooms} room(s)'
+        ))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from Backendd.replicas import REPLICA_DATABASES, refresh_sqlite_replica
+
+
+class Command(BaseCommand):
+    help = (
+        'Copy the SQLite primary into each SQLite replica in REPLICA_DATABASES, '
+        'for trying read replicas locally. Real replicas are kept up to date by '
+        'the database itself.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('aliases', nargs='*', help='Replicas to refresh; all of them by default')
+
+    def handle(self, *args, **options):
+        aliases = options['aliases'] or REPLICA_DATABASES
+        if not aliases:
+            raise CommandError('No replicas configured; set DJANGO_DB_REPLICAS')
+        for alias in aliases:
+            if alias not in REPLICA_DATABASES:
+                raise CommandError(f'{alias} is not a replica')
+            try:
+                refresh_sqlite_replica(alias)
+            except ValueError as exc:
+                raise CommandError(str(exc))
+            self.stdout.write(f'Refreshed {alias}')
@@ -0,0 +1,50 @@
+import time
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from Backendd.attachments import get_pool, is_image, render_variants, variant_name, variant_targets, ATTACHMENT_VARIANTS
+from Backendd.storage import blob_storage
+from accounts.models import BLOB_FILE_FIELDS
+
+
+class Command(BaseCommand):
+    help = (
+        'Render missing thumbnail and web variants for stored complaint '
+        'attachments and profile photos, across the attachment process pool.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Re-render variants that already exist')
+
+    def handle(self, *args, **options):
+        storage = blob_storage()
+        names = set()
+        for label, field in BLOB_FILE_FIELDS:
+            names.update(
+                apps.get_model(label).objects.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True})
+                .values_list(field, flat=True).iterator()
+            )
+        names = sorted(
+            name for name in names
+            if is_image(name) and storage.exists(name) and (options['force'] or not all(
+                storage.exists(variant_name(name, variant)) for variant in ATTACHMENT_VARIANTS
+            ))
+        )
+        self.stdout.write(f'{len(names)} images need variants')
+
+        start = time.perf_counter()
+        pool = get_pool()
+        futures = {
+            name: pool.submit(render_variants, storage.path(name), variant_targets(storage, name))
+            for name in names
+        }
+        failed = 0
+        for name, future in futures.items():
+            exc = future.exception()
+            if exc is not None:
+                failed += 1
+                self.stderr.write(f'{name}: {exc}')
+        self.stdout.write(
+            f'Rendered {len(names) - failed}, failed {failed} in {time.perf_counter() - start:.1f}s'
+        )
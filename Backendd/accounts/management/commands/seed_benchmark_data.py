@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.benchdata import BENCH_PASSWORD, clear_benchmark_data, seed_benchmark_data
+
+
+class Command(BaseCommand):
+    help = (
+        'Replace the benchmark data set (rows prefixed "bench-") with a fresh, '
+        'repeatable one for benchmark_api. Every user gets the same password. '
+        'Use a copy of the database; the rows are committed.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hostels', type=int, default=4)
+        parser.add_argument('--rooms-per-hostel', type=int, default=100)
+        parser.add_argument('--students', type=int, default=2000)
+        parser.add_argument('--workers', type=int, default=60)
+        parser.add_argument('--complaints', type=int, default=20000, help='Complaints per app (accounts and ssdash)')
+        parser.add_argument('--days', type=int, default=90, help='Spread complaints over this many days')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--clear', action='store_true', help='Only delete the benchmark rows')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        if options['clear']:
+            clear_benchmark_data()
+            self.stdout.write(f'Cleared benchmark data in {time.perf_counter() - start:.1f}s')
+            return
+        counts = seed_benchmark_data(
+            hostels=options['hostels'], rooms_per_hostel=options['rooms_per_hostel'],
+            students=options['students'], workers=options['workers'],
+            complaints=options['complaints'], days=options['days'], seed=options['seed'],
+        )
+        self.stdout.write(
+            ', '.join(f'{count} {name}' for name, count in counts.items())
+            + f' in {time.perf_counter() - start:.1f}s'
+        )
+        self.stdout.write(f'Password for every benchmark user: {BENCH_PASSWORD}')
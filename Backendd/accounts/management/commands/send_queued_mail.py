@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.mail import EMAIL_QUEUE_BATCH_SIZE, send_queued_mail
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued outbound email in batches, retrying failures with backoff'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=EMAIL_QUEUE_BATCH_SIZE)
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep polling the queue instead of exiting once it is drained'
+        )
+        parser.add_argument('--interval', type=float, default=5, help='Seconds to sleep when the queue is empty')
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+        while True:
+            sent, failed = send_queued_mail(options['batch_size'])
+            total_sent += sent
+            total_failed += failed
+            if sent or failed:
+                self.stdout.write(f'Sent {sent}, failed {failed}')
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+        self.stdout.write(self.style.SUCCESS(f'Done: sent {total_sent}, failed {total_failed}'))
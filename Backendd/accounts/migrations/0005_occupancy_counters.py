@@ -0,0 +1,43 @@
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def populate_counters(apps, schema_editor):
+    CustomUser = apps.get_model('accounts', 'CustomUser')
+    Hostel = apps.get_model('accounts', 'Hostel')
+    Room = apps.get_model('accounts', 'Room')
+    StudentProfile = apps.get_model('accounts', 'StudentProfile')
+
+    residents = (
+        CustomUser.objects.filter(hostel=OuterRef('pk'))
+        .order_by().values('hostel').annotate(n=Count('pk')).values('n')
+    )
+    Hostel.objects.update(current_occupancy=Coalesce(Subquery(residents), Value(0)))
+
+    occupants = (
+        StudentProfile.objects.filter(room=OuterRef('pk'))
+        .order_by().values('room').annotate(n=Count('pk')).values('n')
+    )
+    Room.objects.update(occupants_count=Coalesce(Subquery(occupants), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_userprofile'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='hostel',
+            name='current_occupancy',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='room',
+            name='occupants_count',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
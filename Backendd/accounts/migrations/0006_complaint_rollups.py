@@ -0,0 +1,57 @@
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate, TruncWeek
+from django.utils import timezone
+
+
+def backfill_rollups(apps, schema_editor):
+    Complaint = apps.get_model('accounts', 'Complaint')
+    ComplaintRollup = apps.get_model('accounts', 'ComplaintRollup')
+    rows = []
+    for granularity, trunc in (('day', TruncDate), ('week', TruncWeek)):
+        grouped = (
+            Complaint.objects.order_by()
+            .annotate(bucket=trunc('created_at'))
+            .values('bucket', 'student__hostel_id', 'complaint_type_id', 'status')
+            .annotate(count=Count('id'))
+        )
+        for row in grouped:
+            bucket = row['bucket']
+            if hasattr(bucket, 'date'):
+                bucket = timezone.localtime(bucket).date()
+            rows.append(ComplaintRollup(
+                granularity=granularity,
+                bucket=bucket,
+                hostel_id=row['student__hostel_id'],
+                complaint_type_id=row['complaint_type_id'],
+                status=row['status'],
+                count=row['count'],
+            ))
+    ComplaintRollup.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_occupancy_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ComplaintRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('granularity', models.CharField(choices=[('day', 'Day'), ('week', 'Week')], max_length=4)),
+                ('bucket', models.DateField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('assigned', 'Assigned'), ('resolved', 'Resolved')], max_length=20)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('complaint_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='accounts.complainttype')),
+                ('hostel', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='accounts.hostel')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('granularity', 'bucket', 'hostel', 'complaint_type', 'status'), name='unique_complaint_rollup_bucket')],
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_updated_at(apps, schema_editor):
+    Complaint = apps.get_model('accounts', 'Complaint')
+    Complaint.objects.update(updated_at=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0008_outbound_email'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='complaint',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='complaint',
+            index=models.Index(fields=['updated_at', 'id'], name='accounts_cmp_updated_idx'),
+        ),
+        migrations.CreateModel(
+            name='ComplaintTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('complaint_id', models.BigIntegerField()),
+                ('student_id', models.BigIntegerField(blank=True, null=True)),
+                ('worker_id', models.BigIntegerField(blank=True, null=True)),
+                ('deleted', models.BooleanField(default=True)),
+                ('deleted_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['deleted_at'], name='accounts_tomb_deleted_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+import Backendd.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0009_delta_sync'),
+    ]
+
+    operations = [
+        # Storage is not a column property; skip SQLite's table rebuild
+        migrations.SeparateDatabaseAndState(state_operations=[
+            migrations.AlterField(
+                model_name='customuser',
+                name='profile_photo',
+                field=models.ImageField(blank=True, null=True, storage=Backendd.storage.blob_storage, upload_to='profile_photos/'),
+            ),
+            migrations.AlterField(
+                model_name='userprofile',
+                name='profile_photo',
+                field=models.ImageField(blank=True, null=True, storage=Backendd.storage.blob_storage, upload_to='profile_photos/'),
+            ),
+        ]),
+        migrations.CreateModel(
+            name='StoredBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('size', models.PositiveBigIntegerField(default=0)),
+                ('references', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['references', 'updated_at'], name='accounts_blob_unused_idx')],
+            },
+        ),
+    ]
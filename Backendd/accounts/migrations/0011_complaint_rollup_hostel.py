@@ -0,0 +1,59 @@
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import TruncDate, TruncWeek
+from django.utils import timezone
+
+
+def backfill_rollup_hostels(apps, schema_editor):
+    """Count existing complaints under their student's hostel and recount the rollups."""
+    Complaint = apps.get_model('accounts', 'Complaint')
+    ComplaintRollup = apps.get_model('accounts', 'ComplaintRollup')
+    CustomUser = apps.get_model('accounts', 'CustomUser')
+    Complaint.objects.update(rollup_hostel_id=Subquery(
+        CustomUser.objects.filter(pk=OuterRef('student_id')).values('hostel_id')[:1]
+    ))
+    # The incremental counts may have drifted, or duplicated no-hostel
+    # buckets that the new constraint would reject
+    rows = []
+    for granularity, trunc in (('day', TruncDate), ('week', TruncWeek)):
+        grouped = (
+            Complaint.objects.order_by()
+            .annotate(bucket=trunc('created_at'))
+            .values('bucket', 'rollup_hostel_id', 'complaint_type_id', 'status')
+            .annotate(count=Count('id'))
+        )
+        for row in grouped:
+            bucket = row['bucket']
+            if hasattr(bucket, 'date'):
+                bucket = timezone.localtime(bucket).date()
+            rows.append(ComplaintRollup(
+                granularity=granularity,
+                bucket=bucket,
+                hostel_id=row['rollup_hostel_id'],
+                complaint_type_id=row['complaint_type_id'],
+                status=row['status'],
+                count=row['count'],
+            ))
+    ComplaintRollup.objects.all().delete()
+    ComplaintRollup.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0010_blob_storage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='complaint',
+            name='rollup_hostel',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='accounts.hostel'),
+        ),
+        migrations.RunPython(backfill_rollup_hostels, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='complaintrollup',
+            constraint=models.UniqueConstraint(condition=models.Q(('hostel__isnull', True)), fields=('granularity', 'bucket', 'complaint_type', 'status'), name='unique_complaint_rollup_bucket_no_hostel'),
+        ),
+    ]
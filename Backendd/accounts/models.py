@@ -1,11 +1,24 @@
+from collections import Counter
+from datetime import timedelta
+
 from django.db import models
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import AbstractUser, UserManager
 from django.core.validators import RegexValidator, EmailValidator
 # models.py
 from django.db import models
 from django.conf import settings
 from django.dispatch import receiver
-from django.db.models.signals import post_save
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q
+from django.db.models.functions import TruncDate, TruncWeek
+from django.utils import timezone
+from django.db.models.signals import post_delete, post_init, post_save, pre_delete, pre_save
+
+from Backendd.attachments import file_name, queue_variants
+from Backendd.storage import blob_digest, blob_storage
+
+from .auth_cache import invalidate_user, invalidate_users
+from .profile_cache import invalidate_profile
 
 class UserProfile(models.Model):
     USER_TYPES = (
@@ -17,20 +30,76 @@ class UserProfile(models.Model):
     user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     roll_number = models.CharField(max_length=20, blank=True)
     phone_number = models.CharField(max_length=15, blank=True)
-    profile_photo = models.ImageField(upload_to='profile_photos/', blank=True, null=True)
+    profile_photo = models.ImageField(upload_to='profile_photos/', storage=blob_storage, blank=True, null=True)
     user_type = models.CharField(max_length=10, choices=USER_TYPES, default='student')
 
+# CustomUser fields copied onto UserProfile. Only a save that changes one of
+# them writes the profile, so last_login and password updates cost nothing here.
+PROFILE_SYNC_FIELDS = ('roll_number', 'phone_number')
+
+@receiver(post_init, sender=settings.AUTH_USER_MODEL)
+def remember_profile_fields(sender, instance, **kwargs):
+    # Deferred fields are left out rather than fetched
+    instance._loaded_profile_fields = {
+        name: instance.__dict__[name] for name in PROFILE_SYNC_FIELDS if name in instance.__dict__
+    }
+
+def _profile_values(instance, names):
+    return {name: getattr(instance, name) or '' for name in names}
+
 @receiver(post_save, sender=settings.AUTH_USER_MODEL)
-def create_user_profile(sender, instance, created, **kwargs):
+def sync_user_profile(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
     if created:
-        UserProfile.objects.get_or_create(user=instance)
+        UserProfile.objects.get_or_create(user=instance, defaults=_profile_values(instance, PROFILE_SYNC_FIELDS))
+    else:
+        loaded = instance._loaded_profile_fields
+        # A field that was deferred at load time counts as changed once set
+        changed = [
+            name for name in PROFILE_SYNC_FIELDS
+            if name in instance.__dict__ and (name not in loaded or instance.__dict__[name] != loaded[name])
+        ]
+        if changed:
+            values = _profile_values(instance, changed)
+            if not UserProfile.objects.filter(user=instance).update(**values):
+                UserProfile.objects.get_or_create(user=instance, defaults=_profile_values(instance, PROFILE_SYNC_FIELDS))
+            elif sender.userprofile.is_cached(instance):
+                for name, value in values.items():
+                    setattr(instance.userprofile, name, value)
+    remember_profile_fields(sender, instance)
+    invalidate_profile(instance.pk)
+
+@receiver(post_init, sender=settings.AUTH_USER_MODEL)
+@receiver(post_init, sender=UserProfile)
+def remember_profile_photo(sender, instance, **kwargs):
+    instance._loaded_profile_photo = file_name(instance.__dict__.get('profile_photo'))
 
 @receiver(post_save, sender=settings.AUTH_USER_MODEL)
-def save_user_profile(sender, instance, **kwargs):
-    if hasattr(instance, 'userprofile'):
-        instance.userprofile.save()
-    else:
-        UserProfile.objects.get_or_create(user=instance)
+@receiver(post_save, sender=UserProfile)
+def profile_photo_changed(sender, instance, raw=False, **kwargs):
+    if raw or 'profile_photo' not in instance.__dict__:
+        return
+    if instance.profile_photo.name != instance._loaded_profile_photo:
+        move_blob_reference(instance._loaded_profile_photo, instance.profile_photo.name)
+        user_id = instance.pk if sender is not UserProfile else instance.user_id
+        queue_variants(instance.profile_photo, on_done=lambda: invalidate_profile(user_id))
+        instance._loaded_profile_photo = instance.profile_photo.name
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=UserProfile)
+def release_profile_photo(sender, instance, **kwargs):
+    move_blob_reference(instance._loaded_profile_photo, None)
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def invalidate_cached_user(sender, instance, **kwargs):
+    invalidate_user(instance.pk)
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def invalidate_cached_profile(sender, instance, **kwargs):
+    invalidate_profile(instance.user_id)
 class ComplaintType(models.Model):
     name = models.CharField(max_length=50)  # e.g., "Plumbing", "Electrical"
     description = models.TextField(blank=True)
@@ -42,6 +111,8 @@ class Hostel(models.Model):
     name = models.CharField(max_length=100)
     location = models.CharField(max_length=100)
     capacity = models.PositiveIntegerField(default=0)
+    # Denormalized count of residents, maintained by the signal handlers below
+    current_occupancy = models.PositiveIntegerField(default=0, editable=False)
     warden = models.ForeignKey(
         'CustomUser',
         on_delete=models.SET_NULL,
@@ -54,14 +125,27 @@ class Hostel(models.Model):
     def __str__(self):
         return str(self.name)
     
-    @property
-    def current_occupancy(self):
-        return self.residents.count()
-    
     @property
     def available_space(self):
         return self.capacity - self.current_occupancy
 
+class CustomUserQuerySet(models.QuerySet):
+
+    def update(self, **kwargs):
+        # update() sends no post_save, so drop the users from the auth user
+        # cache here; otherwise e.g. a bulk deactivation keeps authenticating
+        # until the entries time out. Buffered last_login stamps are not
+        # worth evicting every logged-in user for.
+        if set(kwargs) <= {'last_login'}:
+            return super().update(**kwargs)
+        user_ids = list(self.values_list('pk', flat=True))
+        rows = super().update(**kwargs)
+        invalidate_users(user_ids)
+        return rows
+
+class CustomUserManager(UserManager.from_queryset(CustomUserQuerySet)):
+    pass
+
 class CustomUser(AbstractUser):
     USER_TYPE_CHOICES = (
         ('student', 'Student'),
@@ -94,7 +178,7 @@ class CustomUser(AbstractUser):
         ]
     )
     phone_number = models.CharField(max_length=15, blank=True, null=True)
-    profile_photo = models.ImageField(upload_to='profile_photos/', blank=True, null=True)
+    profile_photo = models.ImageField(upload_to='profile_photos/', storage=blob_storage, blank=True, null=True)
     hostel = models.ForeignKey(
         Hostel, 
         on_delete=models.SET_NULL, 
@@ -103,6 +187,16 @@ class CustomUser(AbstractUser):
         related_name='residents'
     )
 
+    objects = CustomUserManager()
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # UserViewSet filters on user_type and hostel together
+            models.Index(fields=['user_type', 'hostel'], name='accounts_user_type_hostel_idx'),
+            # Keyset pagination order for UserViewSet
+            models.Index(fields=['-date_joined', '-id'], name='accounts_user_joined_idx'),
+        ]
+
     def __str__(self):
         full_name = self.get_full_name().strip()
         
@@ -119,6 +213,8 @@ class Room(models.Model):
     room_number = models.CharField(max_length=10)
     hostel = models.ForeignKey(Hostel, on_delete=models.CASCADE, related_name='rooms')
     capacity = models.PositiveSmallIntegerField(default=2)
+    # Denormalized count of student profiles, maintained by the signal handlers below
+    occupants_count = models.PositiveSmallIntegerField(default=0, editable=False)
     
     def __str__(self):
         return f"{self.hostel.name} - Room {self.room_number}"
@@ -129,7 +225,7 @@ class Room(models.Model):
     
     @property
     def is_full(self):
-        return self.occupants.count() >= self.capacity
+        return self.occupants_count >= self.capacity
 
 class StudentProfile(models.Model):
     user = models.OneToOneField(
@@ -191,4 +287,410 @@ class Complaint(models.Model):
         limit_choices_to={'user_type': 'worker', 'worker_profile__complaint_types': models.F('complaint_type')},
         related_name='assigned_complaints'  # Add this line
     )
-    created_at = models.DateTimeField(auto_now_add=True)
\ No newline at end of file
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Delta sync watermark. Bulk .update() calls must set it explicitly
+    updated_at = models.DateTimeField(auto_now=True)
+    # The hostel the complaint is counted under in ComplaintRollup: the
+    # student's when it was filed, so later moves do not strand the count
+    rollup_hostel = models.ForeignKey(
+        Hostel, on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name='+'
+    )
+    
+    class Meta:
+        indexes = [
+            # Warden list order and keyset pagination
+            models.Index(fields=['-created_at', '-id'], name='accounts_cmp_created_idx'),
+            # Delta sync scans (updated_at, id) > watermark
+            models.Index(fields=['updated_at', 'id'], name='accounts_cmp_updated_idx'),
+            models.Index(fields=['status', '-created_at', '-id'], name='accounts_cmp_status_idx'),
+            # Students and workers only see their own complaints
+            models.Index(fields=['student', '-created_at', '-id'], name='accounts_cmp_student_idx'),
+            models.Index(fields=['assigned_worker', '-created_at', '-id'], name='accounts_cmp_worker_idx'),
+            models.Index(fields=['assigned_worker', 'status'], name='accounts_cmp_worker_status_idx'),
+            # Open complaints, the working set for wardens and worker assignment.
+            # SQLite only uses these for literal status lists; Postgres plans them
+            # for parameterised queries too.
+            models.Index(
+                fields=['complaint_type', '-created_at'],
+                condition=models.Q(status__in=['pending', 'assigned']),
+                name='accounts_cmp_open_type_idx'
+            ),
+            models.Index(
+                fields=['-created_at'],
+                condition=models.Q(status__in=['pending', 'assigned']),
+                name='accounts_cmp_open_idx'
+            ),
+        ]
+
+class ComplaintTombstone(models.Model):
+    """
+    Marks a complaint that left someone's delta sync view: deleted outright
+    (`deleted`), or reassigned away from `worker`. Pruned by
+    `manage.py prune_complaint_tombstones`.
+    """
+    complaint_id = models.BigIntegerField()
+    student_id = models.BigIntegerField(null=True, blank=True)
+    worker_id = models.BigIntegerField(null=True, blank=True)
+    deleted = models.BooleanField(default=True)
+    deleted_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['deleted_at'], name='accounts_tomb_deleted_idx'),
+        ]
+    
+    def __str__(self):
+        return f"Complaint {self.complaint_id} removed at {self.deleted_at}"
+
+class OutboundEmail(models.Model):
+    """
+    Durable outbox row. Request handlers enqueue with accounts.mail.queue_mail;
+    `manage.py send_queued_mail` delivers them in batches.
+    """
+    STATUS_CHOICES = (
+        ('queued', 'Queued'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    )
+    
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=254)
+    recipients = models.JSONField(default=list)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    # Set while a worker holds the row so concurrent workers skip it
+    claimed_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='accounts_email_due_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.recipients)} ({self.status})"
+
+class ComplaintRollup(models.Model):
+    """
+    Complaint counts bucketed by creation day or week, hostel, type and
+    current status. Maintained incrementally by the Complaint signal handlers
+    below; `manage.py rebuild_complaint_rollups` recomputes it from scratch.
+    """
+    GRANULARITY_CHOICES = (
+        ('day', 'Day'),
+        ('week', 'Week'),
+    )
+    
+    granularity = models.CharField(max_length=4, choices=GRANULARITY_CHOICES)
+    bucket = models.DateField()  # The day, or the Monday the week starts on
+    hostel = models.ForeignKey(Hostel, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    complaint_type = models.ForeignKey(ComplaintType, on_delete=models.CASCADE, related_name='+')
+    status = models.CharField(max_length=20, choices=Complaint.STATUS_CHOICES)
+    count = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['granularity', 'bucket', 'hostel', 'complaint_type', 'status'],
+                name='unique_complaint_rollup_bucket'
+            ),
+            # NULLs are distinct above, so complaints without a hostel need their own
+            models.UniqueConstraint(
+                fields=['granularity', 'bucket', 'complaint_type', 'status'],
+                condition=Q(hostel__isnull=True),
+                name='unique_complaint_rollup_bucket_no_hostel'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.granularity} {self.bucket} {self.status}: {self.count}"
+
+
+# Occupancy counters
+#
+# Hostel.current_occupancy and Room.occupants_count are kept in sync by
+# remembering the foreign key each instance was loaded with and moving one
+# unit between the old and new rows when it changes. Queryset updates and
+# raw SQL bypass these signals; `manage.py reconcile_occupancy` repairs drift.
+
+def _shift_counter(model, field, old_id, new_id):
+    if old_id == new_id:
+        return
+    if old_id is not None:
+        model.objects.filter(pk=old_id, **{f'{field}__gt': 0}).update(**{field: F(field) - 1})
+    if new_id is not None:
+        model.objects.filter(pk=new_id).update(**{field: F(field) + 1})
+
+@receiver(post_init, sender=CustomUser)
+def remember_user_hostel(sender, instance, **kwargs):
+    # Read from __dict__ so deferred fields are not fetched
+    instance._loaded_hostel_id = instance.__dict__.get('hostel_id')
+
+@receiver(post_save, sender=CustomUser)
+def update_hostel_occupancy(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old_id = None if created else instance._loaded_hostel_id
+    _shift_counter(Hostel, 'current_occupancy', old_id, instance.hostel_id)
+    instance._loaded_hostel_id = instance.hostel_id
+
+@receiver(post_delete, sender=CustomUser)
+def release_hostel_occupancy(sender, instance, **kwargs):
+    _shift_counter(Hostel, 'current_occupancy', instance._loaded_hostel_id, None)
+
+@receiver(post_init, sender=StudentProfile)
+def remember_profile_room(sender, instance, **kwargs):
+    instance._loaded_room_id = instance.__dict__.get('room_id')
+
+@receiver(post_save, sender=StudentProfile)
+def update_room_occupancy(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old_id = None if created else instance._loaded_room_id
+    _shift_counter(Room, 'occupants_count', old_id, instance.room_id)
+    instance._loaded_room_id = instance.room_id
+
+@receiver(post_delete, sender=StudentProfile)
+def release_room_occupancy(sender, instance, **kwargs):
+    _shift_counter(Room, 'occupants_count', instance._loaded_room_id, None)
+
+def reconcile_occupancy():
+    """Recount occupancy and fix drifted rows. Returns (hostels_fixed, rooms_fixed)."""
+    hostels = (
+        Hostel.objects.annotate(actual=Count('residents'))
+        .exclude(current_occupancy=F('actual'))
+        .values_list('pk', 'actual')
+    )
+    rooms = (
+        Room.objects.annotate(actual=Count('student_profiles'))
+        .exclude(occupants_count=F('actual'))
+        .values_list('pk', 'actual')
+    )
+    hostels, rooms = list(hostels), list(rooms)
+    for pk, actual in hostels:
+        Hostel.objects.filter(pk=pk).update(current_occupancy=actual)
+    for pk, actual in rooms:
+        Room.objects.filter(pk=pk).update(occupants_count=actual)
+    return len(hostels), len(rooms)
+
+
+# Complaint rollups
+#
+# Each complaint is counted once in its day bucket and once in its week
+# bucket, under its current status. A status change moves it between
+# buckets of the same day/week.
+
+def _complaint_buckets(created_at):
+    day = timezone.localdate(created_at)
+    week = day - timedelta(days=day.weekday())
+    return [('day', day), ('week', week)]
+
+def _bump_rollup(key, delta):
+    if delta < 0:
+        ComplaintRollup.objects.filter(count__gte=-delta, **key).update(count=F('count') + delta)
+        return
+    if ComplaintRollup.objects.filter(**key).update(count=F('count') + delta):
+        return
+    try:
+        with transaction.atomic():
+            ComplaintRollup.objects.create(count=delta, **key)
+    except IntegrityError:
+        # Another request created the bucket first
+        ComplaintRollup.objects.filter(**key).update(count=F('count') + delta)
+
+def _move_complaint(instance, old_status, new_status):
+    move_complaints_in_rollups(
+        [(instance.created_at, instance.rollup_hostel_id, instance.complaint_type_id)],
+        old_status, new_status
+    )
+
+def move_complaints_in_rollups(rows, old_status, new_status):
+    """
+    Move complaints between status buckets in one pass, for set-based updates
+    that bypass the per-row signals. `rows` are (created_at, rollup_hostel_id,
+    complaint_type_id) tuples; either status may be None for inserts/deletes.
+    """
+    deltas = Counter()
+    for created_at, hostel_id, complaint_type_id in rows:
+        for granularity, bucket in _complaint_buckets(created_at):
+            deltas[(granularity, bucket, hostel_id, complaint_type_id)] += 1
+    for (granularity, bucket, hostel_id, complaint_type_id), count in deltas.items():
+        key = {
+            'granularity': granularity,
+            'bucket': bucket,
+            'hostel_id': hostel_id,
+            'complaint_type_id': complaint_type_id,
+        }
+        if old_status is not None:
+            _bump_rollup({**key, 'status': old_status}, -count)
+        if new_status is not None:
+            _bump_rollup({**key, 'status': new_status}, count)
+
+@receiver(post_init, sender=Complaint)
+def remember_complaint_status(sender, instance, **kwargs):
+    instance._loaded_status = instance.__dict__.get('status')
+    instance._loaded_complaint_type_id = instance.__dict__.get('complaint_type_id')
+    instance._loaded_worker_id = instance.__dict__.get('assigned_worker_id')
+
+@receiver(pre_save, sender=Complaint)
+def set_rollup_hostel(sender, instance, raw=False, **kwargs):
+    if instance._state.adding and not raw and instance.rollup_hostel_id is None:
+        instance.rollup_hostel_id = instance.student.hostel_id
+
+@receiver(pre_delete, sender=Hostel)
+def merge_hostel_rollups(sender, instance, **kwargs):
+    # SET_NULL moves the hostel's complaints to the no-hostel buckets; merge
+    # its counts into those first rather than leave two rows per bucket
+    rollups = ComplaintRollup.objects.filter(hostel=instance)
+    for row in rollups.values('granularity', 'bucket', 'complaint_type_id', 'status', 'count'):
+        count = row.pop('count')
+        if count:
+            _bump_rollup({**row, 'hostel_id': None}, count)
+    rollups.delete()
+
+@receiver(post_save, sender=Complaint)
+def update_complaint_rollups(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        _move_complaint(instance, None, instance.status)
+    elif instance.complaint_type_id != instance._loaded_complaint_type_id:
+        # Recategorised: take it out of the old type's bucket entirely
+        new_type_id = instance.complaint_type_id
+        instance.complaint_type_id = instance._loaded_complaint_type_id
+        _move_complaint(instance, instance._loaded_status, None)
+        instance.complaint_type_id = new_type_id
+        _move_complaint(instance, None, instance.status)
+    elif instance.status != instance._loaded_status:
+        _move_complaint(instance, instance._loaded_status, instance.status)
+    instance._loaded_status = instance.status
+    instance._loaded_complaint_type_id = instance.complaint_type_id
+
+@receiver(post_delete, sender=Complaint)
+def release_complaint_rollups(sender, instance, **kwargs):
+    _move_complaint(instance, instance._loaded_status, None)
+
+@receiver(post_save, sender=Complaint)
+def record_worker_tombstone(sender, instance, created, raw=False, **kwargs):
+    old_worker_id = instance._loaded_worker_id
+    if not (raw or created) and old_worker_id and old_worker_id != instance.assigned_worker_id:
+        ComplaintTombstone.objects.create(complaint_id=instance.pk, worker_id=old_worker_id, deleted=False)
+    instance._loaded_worker_id = instance.assigned_worker_id
+
+@receiver(post_delete, sender=Complaint)
+def record_complaint_tombstone(sender, instance, **kwargs):
+    ComplaintTombstone.objects.create(
+        complaint_id=instance.pk, student_id=instance.student_id, worker_id=instance._loaded_worker_id
+    )
+
+class StoredBlob(models.Model):
+    """
+    A file in the content-addressed blob storage (Backendd.storage) and the
+    number of file fields pointing at it, kept by the file field receivers.
+    `manage.py prune_blobs` deletes blobs left at zero.
+    """
+    name = models.CharField(max_length=255, unique=True)
+    size = models.PositiveBigIntegerField(default=0)
+    references = models.PositiveIntegerField(default=0)
+    # When the count last changed; pruning waits out a grace period from here
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['references', 'updated_at'], name='accounts_blob_unused_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.references} references)"
+
+# File fields stored as blobs, as (app_label.Model, field) pairs
+BLOB_FILE_FIELDS = (
+    ('ssdash.Complaint', 'attachment'),
+    ('accounts.CustomUser', 'profile_photo'),
+    ('accounts.UserProfile', 'profile_photo'),
+)
+
+def move_blob_reference(old_name, new_name):
+    """Count a file field moving from blob `old_name` to `new_name`; other names are ignored."""
+    if old_name == new_name:
+        return
+    now = timezone.now()
+    if blob_digest(old_name):
+        StoredBlob.objects.filter(name=old_name, references__gt=0).update(
+            references=F('references') - 1, updated_at=now
+        )
+    if not blob_digest(new_name):
+        return
+    if StoredBlob.objects.filter(name=new_name).update(references=F('references') + 1, updated_at=now):
+        return
+    try:
+        size = blob_storage().size(new_name)
+    except OSError:
+        size = 0
+    try:
+        with transaction.atomic():
+            StoredBlob.objects.create(name=new_name, size=size, references=1)
+    except IntegrityError:
+        # Another request stored the same content first
+        StoredBlob.objects.filter(name=new_name).update(references=F('references') + 1, updated_at=now)
+
+def count_blob_references():
+    """{blob name: number of file fields pointing at it}, counted from the tables."""
+    from django.apps import apps
+
+    counts = Counter()
+    for label, field in BLOB_FILE_FIELDS:
+        rows = (
+            apps.get_model(label).objects.filter(**{f'{field}__startswith': 'blobs/'})
+            .order_by().values(field).annotate(n=Count('pk')).values_list(field, 'n')
+        )
+        for name, n in rows.iterator():
+            counts[name] += n
+    return counts
+
+def reconcile_blobs():
+    """Recount blob references and fix drifted rows. Returns the number of rows fixed."""
+    counts = count_blob_references()
+    fixed = 0
+    with transaction.atomic():
+        for blob in StoredBlob.objects.select_for_update().iterator():
+            actual = counts.pop(blob.name, 0)
+            if blob.references != actual:
+                StoredBlob.objects.filter(pk=blob.pk).update(references=actual, updated_at=timezone.now())
+                fixed += 1
+        storage = blob_storage()
+        for name, actual in counts.items():
+            StoredBlob.objects.create(name=name, size=storage.size(name) if storage.exists(name) else 0, references=actual)
+            fixed += 1
+    return fixed
+
+def rebuild_complaint_rollups():
+    """Recompute every rollup bucket from the complaints table. Returns the number of rows written."""
+    rows = []
+    for granularity, trunc in (('day', TruncDate), ('week', TruncWeek)):
+        grouped = (
+            Complaint.objects.order_by()
+            .annotate(bucket=trunc('created_at'))
+            .values('bucket', 'rollup_hostel_id', 'complaint_type_id', 'status')
+            .annotate(count=Count('id'))
+        )
+        for row in grouped.iterator():
+            bucket = row['bucket']
+            if hasattr(bucket, 'date'):
+                bucket = timezone.localtime(bucket).date()
+            rows.append(ComplaintRollup(
+                granularity=granularity,
+                bucket=bucket,
+                hostel_id=row['rollup_hostel_id'],
+                complaint_type_id=row['complaint_type_id'],
+                status=row['status'],
+                count=row['count'],
+            ))
+    with transaction.atomic():
+        ComplaintRollup.objects.all().delete()
+        ComplaintRollup.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
@@ -0,0 +1,225 @@
+"""
+Bulk student onboarding.
+
+import_students() validates a whole file of students against the database
+with a handful of set-based queries, hashes passwords across a process pool,
+inserts users and profiles with bulk_create and fills rooms against their
+capacity in one pass. Hashing happens before the transaction opens, so the
+database write lock is only held for a re-check and the inserts. The per-row
+post_save receivers do not run, so the UserProfile rows and occupancy
+counters they would maintain are written here in bulk as well.
+"""
+import csv
+import io
+import json
+from collections import Counter, defaultdict
+
+from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import F
+
+from .hashing import hash_passwords
+from .models import CustomUser, Hostel, Room, StudentProfile, UserProfile
+
+# Keep `IN (...)` lookups under SQLite's bound parameter limit
+LOOKUP_CHUNK_SIZE = 500
+
+FIELDS = (
+    'username', 'email', 'roll_number', 'first_name', 'last_name', 'phone_number', 'password',
+    'hostel', 'room', 'year_of_study', 'department', 'emergency_contact',
+)
+REQUIRED = ('username', 'email', 'roll_number', 'year_of_study', 'department')
+
+
+class OnboardingError(ValueError):
+    """The file could not be read at all."""
+
+
+def read_rows(stream, name=''):
+    """Rows from a CSV (with a header line) or JSON Lines byte or text stream."""
+    if isinstance(stream, (bytes, str)):
+        stream = io.BytesIO(stream) if isinstance(stream, bytes) else io.StringIO(stream)
+    if not isinstance(stream, io.TextIOBase):
+        stream = io.TextIOWrapper(stream, encoding='utf-8-sig')
+    try:
+        if name.endswith('.jsonl') or name.endswith('.ndjson'):
+            rows = [json.loads(line) for line in stream if line.strip()]
+        else:
+            rows = list(csv.DictReader(stream))
+    except (ValueError, csv.Error) as exc:
+        raise OnboardingError(f'Could not parse {name or "upload"}: {exc}')
+    if not all(isinstance(row, dict) for row in rows):
+        raise OnboardingError('Each row must be an object')
+    return rows
+
+
+def _clean(row):
+    return {field: str(row.get(field) or '').strip() for field in FIELDS}
+
+
+def _chunked_values(queryset, field, values):
+    values = list(values)
+    found = set()
+    for start in range(0, len(values), LOOKUP_CHUNK_SIZE):
+        found.update(queryset.filter(**{f'{field}__in': values[start:start + LOOKUP_CHUNK_SIZE]})
+                     .values_list(field, flat=True))
+    return found
+
+
+def validate_rows(rows, allocate_rooms=False, lock=True):
+    """
+    Validate every row, returning (cleaned rows, {row index: {field: [errors]}}).
+    Cleaned rows gain `hostel_id` and `room_id`; rooms are reserved in file
+    order so later rows see earlier rows' beds as taken. With `lock`, the
+    rooms are locked for the rest of the caller's transaction.
+    """
+    cleaned = [_clean(row) for row in rows]
+    errors = defaultdict(lambda: defaultdict(list))
+    model_fields = {name: CustomUser._meta.get_field(name) for name in ('username', 'email', 'roll_number')}
+
+    for index, row in enumerate(cleaned):
+        for field in REQUIRED:
+            if not row[field]:
+                errors[index][field].append('This field is required.')
+        for name, field in model_fields.items():
+            if row[name]:
+                try:
+                    field.run_validators(row[name])
+                except ValidationError as exc:
+                    errors[index][name].extend(exc.messages)
+        if row['year_of_study'] and not row['year_of_study'].isdigit():
+            errors[index]['year_of_study'].append('A valid integer is required.')
+        if row['password']:
+            try:
+                validate_password(row['password'], CustomUser(username=row['username'], email=row['email']))
+            except ValidationError as exc:
+                errors[index]['password'].extend(exc.messages)
+
+    # Uniqueness within the file and against existing users
+    for name in model_fields:
+        values = [row[name] for row in cleaned]
+        seen = Counter(value for value in values if value)
+        existing = _chunked_values(CustomUser.objects.all(), name, seen)
+        for index, value in enumerate(values):
+            if seen[value] > 1:
+                errors[index][name].append('Duplicated in this file.')
+            if value in existing:
+                errors[index][name].append(f'A user with this {name.replace("_", " ")} already exists.')
+
+    _resolve_rooms(cleaned, errors, allocate_rooms, lock)
+    return cleaned, {index: dict(fields) for index, fields in errors.items() if fields}
+
+
+def _resolve_rooms(cleaned, errors, allocate_rooms, lock):
+    hostels = {}
+    for hostel in Hostel.objects.all().only('id', 'name'):
+        hostels[str(hostel.pk)] = hostel.pk
+        hostels.setdefault(hostel.name.lower(), hostel.pk)
+
+    # Lock the rooms being filled so a concurrent import cannot overfill them
+    hostel_ids = {hostels.get(row['hostel'].lower()) for row in cleaned if row['hostel']}
+    rooms = Room.objects.filter(hostel_id__in=hostel_ids - {None})
+    if lock:
+        rooms = rooms.select_for_update()
+    rooms = list(
+        rooms.order_by('hostel_id', 'room_number', 'id')
+        .values_list('id', 'hostel_id', 'room_number', 'capacity', 'occupants_count')
+    )
+    by_number = {(hostel_id, number): room_id for room_id, hostel_id, number, _, _ in rooms}
+    free = {room_id: capacity - occupants for room_id, _, _, capacity, occupants in rooms}
+    rooms_by_hostel = defaultdict(list)
+    for room_id, hostel_id, *_ in rooms:
+        rooms_by_hostel[hostel_id].append(room_id)
+
+    for index, row in enumerate(cleaned):
+        row['hostel_id'] = row['room_id'] = None
+        if not row['hostel']:
+            if row['room']:
+                errors[index]['room'].append('A room needs a hostel.')
+            continue
+        hostel_id = hostels.get(row['hostel'].lower())
+        if hostel_id is None:
+            errors[index]['hostel'].append('Unknown hostel.')
+            continue
+        row['hostel_id'] = hostel_id
+        if index in errors:
+            # Do not hold a bed for a row that will not be imported
+            continue
+        if row['room']:
+            room_id = by_number.get((hostel_id, row['room']))
+            if room_id is None:
+                errors[index]['room'].append('Unknown room in this hostel.')
+            elif free[room_id] <= 0:
+                errors[index]['room'].append('Room is already full.')
+            else:
+                free[room_id] -= 1
+                row['room_id'] = room_id
+        elif allocate_rooms:
+            room_id = next((room for room in rooms_by_hostel[hostel_id] if free[room] > 0), None)
+            if room_id is None:
+                errors[index]['room'].append('No free room in this hostel.')
+            else:
+                free[room_id] -= 1
+                row['room_id'] = room_id
+
+
+def import_students(rows, partial=False, dry_run=False, allocate_rooms=False, workers=None):
+    """
+    Create student accounts for `rows`. Unless `partial`, any invalid row
+    aborts the whole import. Returns {'created': n, 'errors': {row: {...}}}
+    with row numbers counted from 1.
+    """
+    # Hashing takes seconds for a large file, so validate and hash first,
+    # without a transaction: SQLite transactions begin IMMEDIATE and would
+    # hold the write lock for all of it.
+    cleaned, errors = validate_rows(rows, allocate_rooms, lock=False)
+    report = {'created': 0, 'errors': {index + 1: fields for index, fields in sorted(errors.items())}}
+    indexes = [index for index in range(len(cleaned)) if index not in errors]
+    if dry_run or not indexes or (errors and not partial):
+        return report
+    hashes = hash_passwords([cleaned[index]['password'] for index in indexes], workers)
+
+    with transaction.atomic():
+        # Users or beds may have been taken while hashing; check again, this
+        # time holding the room locks
+        rechecked, late_errors = validate_rows([rows[index] for index in indexes], allocate_rooms)
+        for position, fields in late_errors.items():
+            errors[indexes[position]] = fields
+        report['errors'] = {index + 1: fields for index, fields in sorted(errors.items())}
+        if late_errors and not partial:
+            return report
+        kept = [position for position in range(len(rechecked)) if position not in late_errors]
+        valid = [rechecked[position] for position in kept]
+        hashes = [hashes[position] for position in kept]
+        if not valid:
+            return report
+
+        users = CustomUser.objects.bulk_create([
+            CustomUser(
+                username=row['username'], email=row['email'], roll_number=row['roll_number'],
+                first_name=row['first_name'], last_name=row['last_name'],
+                phone_number=row['phone_number'] or None, user_type='student',
+                hostel_id=row['hostel_id'], password=password,
+            )
+            for row, password in zip(valid, hashes)
+        ])
+        UserProfile.objects.bulk_create([
+            UserProfile(user=user, roll_number=row['roll_number'], phone_number=row['phone_number'])
+            for user, row in zip(users, valid)
+        ])
+        StudentProfile.objects.bulk_create([
+            StudentProfile(
+                user=user, room_id=row['room_id'], year_of_study=int(row['year_of_study']),
+                department=row['department'], emergency_contact=row['emergency_contact'] or None,
+            )
+            for user, row in zip(users, valid)
+        ])
+        for model, field, counts in (
+            (Hostel, 'current_occupancy', Counter(row['hostel_id'] for row in valid if row['hostel_id'])),
+            (Room, 'occupants_count', Counter(row['room_id'] for row in valid if row['room_id'])),
+        ):
+            for pk, count in counts.items():
+                model.objects.filter(pk=pk).update(**{field: F(field) + count})
+        report['created'] = len(users)
+    return report
@@ -0,0 +1,44 @@
+"""
+Per-user cache of the serialized current-user payload.
+
+Entries are written by CurrentUserView and deleted by the post_save receivers
+in accounts.models whenever the user or their UserProfile changes. The cache
+alias is configurable so multi-process deployments can point it at a shared
+backend (file, Redis); with the default locmem cache each process only sees
+its own invalidations.
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import caches
+
+PROFILE_CACHE_ALIAS = getattr(settings, 'PROFILE_CACHE_ALIAS', 'default')
+PROFILE_CACHE_TIMEOUT = getattr(settings, 'PROFILE_CACHE_TIMEOUT', 300)
+
+
+def profile_cache_key(user_id):
+    return f'accounts:profile:{user_id}'
+
+
+def get_profile(user_id, host):
+    """The cached entry for `user_id`, or None. Photo URLs are absolute, so entries are per host."""
+    entry = caches[PROFILE_CACHE_ALIAS].get(profile_cache_key(user_id))
+    if entry and entry['host'] == host:
+        return entry
+    return None
+
+
+def set_profile(user_id, host, data):
+    body = json.dumps(data, sort_keys=True, default=str).encode()
+    entry = {
+        'host': host,
+        'data': data,
+        'etag': '"{}"'.format(hashlib.md5(body).hexdigest()),
+    }
+    caches[PROFILE_CACHE_ALIAS].set(profile_cache_key(user_id), entry, PROFILE_CACHE_TIMEOUT)
+    return entry
+
+
+def invalidate_profile(user_id):
+    caches[PROFILE_CACHE_ALIAS].delete(profile_cache_key(user_id))
@@ -3,8 +3,11 @@ from rest_framework import serializers
 from django.contrib.auth.models import User
 from django.contrib.auth import get_user_model
 from .models import Hostel, Room, StudentProfile, WorkerProfile, Complaint, ComplaintType
+from .logins import record_login
+from Backendd.attachments import variant_urls
 from django.contrib.auth import authenticate
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
 from django.contrib.auth.password_validation import validate_password
 
 User = get_user_model()
@@ -21,7 +24,13 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
             if not user.is_active:
                 raise serializers.ValidationError("User account is disabled.")
             
-            data = super().validate(attrs)
+            # Issue the tokens directly; super().validate() would authenticate,
+            # and so hash the password, a second time
+            refresh = self.get_token(user)
+            data = {'refresh': str(refresh), 'access': str(refresh.access_token)}
+            if jwt_settings.UPDATE_LAST_LOGIN:
+                record_login(user)
+            self.user = user
             data['user_type'] = user.user_type
             data['email'] = user.email
             data['roll_number'] = user.roll_number
@@ -39,12 +48,13 @@ class UserSerializer(serializers.ModelSerializer):
     Roll_number = serializers.SerializerMethodField()
     Phone_number = serializers.SerializerMethodField()
     profile_photo = serializers.SerializerMethodField()
+    profile_photo_variants = serializers.SerializerMethodField()
     user_type = serializers.SerializerMethodField()
 
     class Meta:
         model = User
         fields = ['id', 'first_name', 'last_name', 'email', 
-                'Roll_number', 'Phone_number', 'profile_photo', 'user_type']
+                'Roll_number', 'Phone_number', 'profile_photo', 'profile_photo_variants', 'user_type']
 
     def get_Roll_number(self, obj):
         return getattr(obj.userprofile, 'roll_number', None)
@@ -57,7 +67,14 @@ class UserSerializer(serializers.ModelSerializer):
 
     def get_profile_photo(self, obj):
         if hasattr(obj, 'userprofile') and obj.userprofile.profile_photo:
-            return self.context['request'].build_absolute_uri(obj.userprofile.profile_photo.url)
+            request = self.context.get('request')
+            url = obj.userprofile.profile_photo.url
+            return request.build_absolute_uri(url) if request is not None else url
+        return None
+
+    def get_profile_photo_variants(self, obj):
+        if hasattr(obj, 'userprofile'):
+            return variant_urls(obj.userprofile.profile_photo, self.context.get('request'))
         return None
 class UserRegistrationSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, validators=[validate_password])
@@ -81,7 +98,8 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         validated_data.pop('confirm_password')
         password = validated_data.pop('password')
         
-        user = User.objects.create(**validated_data)
+        # One INSERT, so the post_save receivers run once
+        user = User(**validated_data)
         user.set_password(password)
         user.save()
         
@@ -104,15 +122,12 @@ class HostelSerializer(serializers.ModelSerializer):
         }
 
 class RoomSerializer(serializers.ModelSerializer):
-    occupants_count = serializers.SerializerMethodField()
+    occupants_count = serializers.ReadOnlyField()
     is_full = serializers.ReadOnlyField()
     
     class Meta:
         model = Room
         fields = ['id', 'room_number', 'hostel', 'capacity', 'occupants_count', 'is_full']
-    
-    def get_occupants_count(self, obj):
-        return obj.occupants.count()
 
 class StudentProfileSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
@@ -152,13 +167,20 @@ class ComplaintSerializer(serializers.ModelSerializer):
     complaint_type_name = serializers.SerializerMethodField()
     assigned_worker_name = serializers.SerializerMethodField()
     hostel_name = serializers.SerializerMethodField()
+    # Declared explicitly: the model's limit_choices_to uses F('complaint_type'),
+    # which can only be resolved inside a Complaint query, not on the user queryset
+    assigned_worker = serializers.PrimaryKeyRelatedField(
+        queryset=User.objects.filter(user_type='worker'),
+        allow_null=True,
+        required=False
+    )
     
     class Meta:
         model = Complaint
         fields = ['id', 'student', 'student_name', 'complaint_type', 'complaint_type_name', 
                  'description', 'status', 'assigned_worker', 'assigned_worker_name', 
-                 'created_at', 'hostel_name']
-        read_only_fields = ['student', 'created_at']
+                 'created_at', 'updated_at', 'hostel_name']
+        read_only_fields = ['student', 'created_at', 'updated_at']
     
     def get_student_name(self, obj):
         return f"{obj.student.first_name} {obj.student.last_name}" if obj.student else ""
@@ -0,0 +1,92 @@
+from datetime import timedelta
+
+from django.db.models import Q, Sum
+from django.utils import timezone
+
+from .models import Complaint, ComplaintRollup
+
+STATUSES = [value for value, label in Complaint.STATUS_CHOICES]
+
+
+def rollups(granularity='week', hostel_id=None):
+    """
+    Rollup buckets to aggregate over. Weekly buckets are the default since
+    every complaint is counted in both, and there are fewer week rows.
+    """
+    queryset = ComplaintRollup.objects.filter(granularity=granularity)
+    if hostel_id is not None:
+        queryset = queryset.filter(hostel_id=hostel_id)
+    return queryset.order_by()
+
+
+def status_counts(hostel_id=None):
+    """Counts per status in a single aggregate query, zero-filled."""
+    counts = rollups(hostel_id=hostel_id).aggregate(**{
+        value: Sum('count', filter=Q(status=value)) for value in STATUSES
+    })
+    return {value: counts[value] or 0 for value in STATUSES}
+
+
+def complaint_type_counts(hostel_id=None):
+    rows = (
+        rollups(hostel_id=hostel_id)
+        .values('complaint_type_id', 'complaint_type__name')
+        .annotate(total=Sum('count'))
+        .filter(total__gt=0)
+        .order_by('complaint_type__name')
+    )
+    return [
+        {'id': row['complaint_type_id'], 'name': row['complaint_type__name'], 'count': row['total']}
+        for row in rows
+    ]
+
+
+def hostel_counts(hostel_id=None):
+    rows = (
+        rollups(hostel_id=hostel_id)
+        .values('hostel_id', 'hostel__name')
+        .annotate(total=Sum('count'))
+        .filter(total__gt=0)
+        .order_by('hostel__name')
+    )
+    return [
+        {'id': row['hostel_id'], 'name': row['hostel__name'] or '', 'count': row['total']}
+        for row in rows
+    ]
+
+
+def weekly_timeline(hostel_id=None, weeks=8):
+    """
+    Complaints created per week and status for the last `weeks` weeks, shaped
+    as chart datasets (one per status, in STATUS_CHOICES order).
+    """
+    today = timezone.localdate()
+    first_week = today - timedelta(days=today.weekday(), weeks=weeks - 1)
+    rows = (
+        rollups(hostel_id=hostel_id)
+        .filter(bucket__gte=first_week)
+        .values('bucket', 'status')
+        .annotate(total=Sum('count'))
+    )
+    labels = [first_week + timedelta(weeks=i) for i in range(weeks)]
+    index = {label: i for i, label in enumerate(labels)}
+    data = {value: [0] * weeks for value in STATUSES}
+    for row in rows:
+        if row['bucket'] in index and row['status'] in data:
+            data[row['status']][index[row['bucket']]] = row['total']
+    return {
+        'labels': [label.isoformat() for label in labels],
+        'datasets': [
+            {'label': label, 'data': data[value]}
+            for value, label in Complaint.STATUS_CHOICES
+        ],
+    }
+
+
+def complaint_statistics(hostel_id=None, weeks=8):
+    return {
+        'status': status_counts(hostel_id),
+        'complaint_types': complaint_type_counts(hostel_id),
+        'hostels': hostel_counts(hostel_id),
+        'timeline': weekly_timeline(hostel_id, weeks),
+    }
@@ -10,8 +10,13 @@ from .views import (
     PasswordResetConfirmView,
     ComplaintViewSet,
     CurrentUserView,
-    
+    ComplaintStatisticsView,
+    HostelStatisticsView,
+    DashboardStatsView,
 )
+from .events import complaint_event_stream
+from .hashing import bounded_hashing
+from Backendd.ratelimit import rate_limited
 
 router = DefaultRouter()
 router.register(r'users', UserViewSet)
@@ -20,10 +25,14 @@ router.register(r'rooms', RoomViewSet)
 router.register(r'complaints', ComplaintViewSet)
 
 urlpatterns = [
-    path('api/auth/login/', CustomTokenObtainPairView.as_view(), name='token_obtain_pair'),
+    path('api/auth/login/', rate_limited('login')(bounded_hashing(CustomTokenObtainPairView.as_view())), name='token_obtain_pair'),
     path('api/auth/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('api/auth/password_reset/', PasswordResetRequestView.as_view(), name='password_reset'),
     path('api/auth/password_reset/confirm/', PasswordResetConfirmView.as_view(), name='password_reset_confirm'),
     path('api/', include(router.urls)),
     path('api/current_user/', CurrentUserView.as_view(), name='current_user'),
+    path('api/statistics/complaints/', ComplaintStatisticsView.as_view(), name='complaint_statistics'),
+    path('api/statistics/hostel/', HostelStatisticsView.as_view(), name='hostel_statistics'),
+    path('api/statistics/dashboard/', DashboardStatsView.as_view(), name='dashboard_stats'),
+    path('api/events/', complaint_event_stream, name='complaint_events'),
 ]
\ No newline at end of file
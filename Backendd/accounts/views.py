@@ -1,12 +1,19 @@
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
+from rest_framework.parsers import JSONParser, MultiPartParser
 from rest_framework.response import Response
 from django.contrib.auth import get_user_model
-from .models import Hostel, Room, StudentProfile, WorkerProfile, Complaint, ComplaintType
+from django.db import transaction
+from .models import Hostel, Room, StudentProfile, WorkerProfile, Complaint, ComplaintType, ComplaintTombstone
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from .serializers import UserSerializer
+from .stats import complaint_statistics, status_counts
+from . import profile_cache
+from .bulk import BulkError, bulk_update_complaints, parse_ids
+from .onboarding import OnboardingError, import_students, read_rows
+from .dispatch import dispatch_complaint, dispatch_pending, record_load_change
 
 
 from .serializers import (
@@ -23,12 +30,16 @@ from .serializers import (
 from django.urls import reverse
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework.views import APIView
-from django.core.mail import send_mail
+from .mail import queue_mail
 from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
-from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
+from django.utils.http import parse_etags, urlsafe_base64_encode, urlsafe_base64_decode
 from django.utils.encoding import force_bytes
 from django.template.loader import render_to_string
+from Backendd.delta import DeltaSyncMixin
+from Backendd.export import ExportMixin
+from Backendd.pagination import KeysetPagination
+from Backendd.replicas import ReplicaReadMixin
 
 # Get the custom user model
 User = get_user_model()
@@ -36,8 +47,22 @@ class CurrentUserView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        serializer = UserSerializer(request.user)
-        return Response(serializer.data)
+        host = request.get_host()
+        entry = profile_cache.get_profile(request.user.pk, host)
+        if entry is None:
+            serializer = UserSerializer(request.user, context={'request': request})
+            entry = profile_cache.set_profile(request.user.pk, host, serializer.data)
+        
+        etag = entry['etag']
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match and (if_none_match.strip() == '*' or etag in parse_etags(if_none_match)):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(entry['data'])
+        response['ETag'] = etag
+        # Let browsers keep the body but revalidate with If-None-Match each time
+        response['Cache-Control'] = 'private, no-cache'
+        return response
 
 class IsWardenOrAdmin(permissions.BasePermission):
     def has_permission(self, request, view):
@@ -46,9 +71,12 @@ class IsWardenOrAdmin(permissions.BasePermission):
             request.user.user_type == 'warden'
         )
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
+    pagination_class = KeysetPagination
+    keyset_fields = ('-date_joined', '-id')
+    rate_limits = {'create': 'signup'}
     
     def get_serializer_class(self):
         if self.action == 'create':
@@ -58,14 +86,15 @@ class UserViewSet(viewsets.ModelViewSet):
     def get_permissions(self):
         if self.action in ['create']:
             permission_classes = [permissions.AllowAny]
-        elif self.action in ['update', 'partial_update', 'destroy']:
+        elif self.action in ['update', 'partial_update', 'destroy', 'import_students']:
             permission_classes = [permissions.IsAuthenticated, IsWardenOrAdmin]
         else:
             permission_classes = [permissions.IsAuthenticated]
         return [permission() for permission in permission_classes]
     
     def get_queryset(self):
-        queryset = User.objects.all()
+        # UserSerializer reads the profile for every row
+        queryset = User.objects.select_related('userprofile')
         user_type = self.request.query_params.get('user_type')
         hostel_id = self.request.query_params.get('hostel')
         
@@ -76,6 +105,38 @@ class UserViewSet(viewsets.ModelViewSet):
             
         return queryset
     
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser, JSONParser])
+    def import_students(self, request):
+        """
+        Create students from an uploaded CSV/JSONL `file` or a JSON `students`
+        list. Pass partial=true to import the valid rows when others fail,
+        dry_run=true to only validate, allocate_rooms=true to fill free rooms
+        for rows that name a hostel but no room.
+        """
+        upload = request.FILES.get('file')
+        try:
+            if upload is not None:
+                rows = read_rows(upload.file, upload.name)
+            else:
+                rows = request.data.get('students')
+                if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+                    raise OnboardingError('Upload a file or send a list of students')
+        except OnboardingError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        flags = {
+            name: str(request.data.get(name, '')).lower() in ('1', 'true')
+            for name in ('partial', 'dry_run', 'allocate_rooms')
+        }
+        report = import_students(rows, **flags)
+        if report['created']:
+            response_status = status.HTTP_201_CREATED
+        elif report['errors']:
+            response_status = status.HTTP_400_BAD_REQUEST
+        else:
+            response_status = status.HTTP_200_OK
+        return Response(report, status=response_status)
+    
     @action(detail=False, methods=['get'])
     def students(self, request):
         students = User.objects.filter(user_type='student')
@@ -94,7 +155,7 @@ class UserViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(workers, many=True)
         return Response(serializer.data)
 
-class HostelViewSet(viewsets.ModelViewSet):
+class HostelViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = Hostel.objects.all()
     serializer_class = HostelSerializer
     
@@ -109,7 +170,7 @@ class HostelViewSet(viewsets.ModelViewSet):
     def students(self, request, pk=None):
         hostel = self.get_object()
         students = hostel.residents.filter(user_type='student')
-        serializer = UserSerializer(students, many=True)
+        serializer = UserSerializer(students, many=True, context={'request': request})
         return Response(serializer.data)
     
     @action(detail=True, methods=['get'])
@@ -119,7 +180,7 @@ class HostelViewSet(viewsets.ModelViewSet):
         serializer = RoomSerializer(rooms, many=True)
         return Response(serializer.data)
 
-class RoomViewSet(viewsets.ModelViewSet):
+class RoomViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = Room.objects.all()
     serializer_class = RoomSerializer
     
@@ -134,7 +195,7 @@ class RoomViewSet(viewsets.ModelViewSet):
     def occupants(self, request, pk=None):
         room = self.get_object()
         occupants = User.objects.filter(student_profile__room=room)
-        serializer = UserSerializer(occupants, many=True)
+        serializer = UserSerializer(occupants, many=True, context={'request': request})
         return Response(serializer.data)
     
     @action(detail=True, methods=['post'])
@@ -150,15 +211,18 @@ class RoomViewSet(viewsets.ModelViewSet):
         except User.DoesNotExist:
             return Response({"error": "Student not found"}, status=status.HTTP_404_NOT_FOUND)
         
-        if room.is_full:
-            return Response({"error": "Room is already full"}, status=status.HTTP_400_BAD_REQUEST)
-        
-        profile, created = StudentProfile.objects.get_or_create(user=student)
-        profile.room = room
-        profile.save()
-        
-        student.hostel = room.hostel
-        student.save()
+        with transaction.atomic():
+            # Re-read the counter under a row lock so concurrent assignments cannot overfill
+            room = Room.objects.select_for_update().get(pk=room.pk)
+            if room.is_full:
+                return Response({"error": "Room is already full"}, status=status.HTTP_400_BAD_REQUEST)
+            
+            profile, created = StudentProfile.objects.get_or_create(user=student)
+            profile.room = room
+            profile.save()
+            
+            student.hostel_id = room.hostel_id
+            student.save()
         
         return Response({"success": "Student assigned to room successfully"})
 
@@ -166,6 +230,9 @@ class CustomTokenObtainPairView(TokenObtainPairView):
     serializer_class = CustomTokenObtainPairSerializer
 
 class PasswordResetRequestView(APIView):
+    permission_classes = [permissions.AllowAny]
+    rate_limits = {'post': 'password_reset'}
+
     def post(self, request):
         email_or_roll = request.data.get('email_or_roll')
         
@@ -189,19 +256,18 @@ class PasswordResetRequestView(APIView):
             reverse('password_reset_confirm') + f'?uid={uid}&token={token}'
         )
         
-        # Send email
+        # Queue the email; send_queued_mail delivers it off the request path
         subject = 'Password Reset Request'
-        message = render_to_string('password_reset_email.html', {
+        message = render_to_string('accounts/password_reset_email.txt', {
             'user': user,
             'reset_url': reset_url,
         })
         
-        send_mail(
+        queue_mail(
             subject,
             message,
             settings.DEFAULT_FROM_EMAIL,
             [user.email],
-            fail_silently=False,
         )
         
         return Response(
@@ -210,6 +276,9 @@ class PasswordResetRequestView(APIView):
         )
 
 class PasswordResetConfirmView(APIView):
+    permission_classes = [permissions.AllowAny]
+    rate_limits = {'post': 'password_reset_confirm'}
+
     def post(self, request):
         uid = request.data.get('uid')
         token = request.data.get('token')
@@ -241,19 +310,48 @@ class PasswordResetConfirmView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-class ComplaintViewSet(viewsets.ModelViewSet):
-    queryset = Complaint.objects.all()
+class ComplaintViewSet(ReplicaReadMixin, DeltaSyncMixin, ExportMixin, viewsets.ModelViewSet):
+    queryset = Complaint.objects.all().order_by('-created_at')
     serializer_class = ComplaintSerializer
+    pagination_class = KeysetPagination
+    tombstone_model = ComplaintTombstone
+    export_filename = 'complaints'
+    export_columns = (
+        ('id', 'id'),
+        ('created_at', 'created_at'),
+        ('updated_at', 'updated_at'),
+        ('status', 'status'),
+        ('complaint_type', 'complaint_type__name'),
+        ('description', 'description'),
+        ('student', 'student__username'),
+        ('roll_number', 'student__roll_number'),
+        ('hostel', 'student__hostel__name'),
+        ('assigned_worker', 'assigned_worker__username'),
+    )
+    rate_limits = {'create': 'complaint_create'}
     
     def get_permissions(self):
         if self.action in ['create', 'update', 'partial_update', 'destroy']:
             permission_classes = [permissions.IsAuthenticated]
+        elif self.action in ['auto_assign', 'dispatch_pending', 'export', 'bulk_assign', 'bulk_resolve', 'bulk_status']:
+            permission_classes = [permissions.IsAuthenticated, IsWardenOrAdmin]
         else:
             permission_classes = [permissions.IsAuthenticated]
         return [permission() for permission in permission_classes]
     
+    def perform_create(self, serializer):
+        complaint = serializer.save(student=self.request.user)
+        if settings.AUTO_DISPATCH_COMPLAINTS:
+            dispatch_complaint(complaint)
+    
     def get_queryset(self):
-        queryset = super().get_queryset()
+        # Pull every relation the serializer reads in the same query so list
+        # responses stay at a constant number of queries regardless of page size
+        queryset = super().get_queryset().select_related(
+            'student__hostel',
+            'complaint_type',
+            'assigned_worker',
+        )
         user = self.request.user
         
         if user.user_type == 'student':
@@ -263,6 +361,15 @@ class ComplaintViewSet(viewsets.ModelViewSet):
         
         return queryset
     
+    def get_tombstones(self, tombstones):
+        user = self.request.user
+        if user.user_type == 'student':
+            return tombstones.filter(student_id=user.pk)
+        elif user.user_type == 'worker':
+            # Includes complaints reassigned to someone else
+            return tombstones.filter(worker_id=user.pk)
+        return tombstones.filter(deleted=True)
+    
     @action(detail=True, methods=['post'])
     def assign_worker(self, request, pk=None):
         complaint = self.get_object()
@@ -284,9 +391,12 @@ class ComplaintViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
         
+        previous_worker_id = complaint.assigned_worker_id if complaint.status == 'assigned' else None
         complaint.assigned_worker = worker
         complaint.status = 'assigned'
         complaint.save()
+        record_load_change(previous_worker_id, -1)
+        record_load_change(worker.id, 1)
         
         return Response({"success": "Worker assigned to complaint successfully"})
     
@@ -298,17 +408,139 @@ class ComplaintViewSet(viewsets.ModelViewSet):
             worker_profile__complaint_types=complaint.complaint_type,
             worker_profile__is_available=True
         )
-        serializer = UserSerializer(available_workers, many=True)
+        serializer = UserSerializer(available_workers, many=True, context={'request': request})
         return Response(serializer.data)
     
+    @action(detail=True, methods=['post'])
+    def auto_assign(self, request, pk=None):
+        complaint = self.get_object()
+        if complaint.status != 'pending':
+            return Response({"error": "Only pending complaints can be assigned"}, status=status.HTTP_400_BAD_REQUEST)
+        
+        worker_id = dispatch_complaint(complaint)
+        if worker_id is None:
+            complaint.refresh_from_db(fields=['status'])
+            if complaint.status != 'pending':
+                return Response({"error": "Only pending complaints can be assigned"}, status=status.HTTP_400_BAD_REQUEST)
+            return Response(
+                {"error": "No available worker can handle this complaint type"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return Response({"success": "Worker assigned to complaint successfully", "worker_id": worker_id})
+    
+    @action(detail=False, methods=['post'])
+    def dispatch_pending(self, request):
+        limit = request.data.get('limit')
+        try:
+            limit = int(limit) if limit else None
+        except (TypeError, ValueError):
+            return Response({"error": "limit must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+        assigned, unassigned = dispatch_pending(limit)
+        return Response({"assigned": assigned, "unassigned": unassigned})
+    
+    @action(detail=False, methods=['post'])
+    def bulk_assign(self, request):
+        try:
+            worker = User.objects.select_related('worker_profile').get(
+                id=request.data.get('worker_id'),
+                user_type='worker',
+                worker_profile__is_available=True
+            )
+        except (User.DoesNotExist, TypeError, ValueError):
+            return Response({"error": "No available worker found with this ID"}, status=status.HTTP_404_NOT_FOUND)
+        return self._bulk_update(request, 'assigned', worker)
+    
+    @action(detail=False, methods=['post'])
+    def bulk_resolve(self, request):
+        return self._bulk_update(request, 'resolved')
+    
+    @action(detail=False, methods=['post'])
+    def bulk_status(self, request):
+        new_status = request.data.get('status')
+        if new_status not in ('pending', 'resolved'):
+            return Response(
+                {"error": "status must be 'pending' or 'resolved'; use bulk_assign to assign"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return self._bulk_update(request, new_status)
+    
+    def _bulk_update(self, request, new_status, worker=None):
+        try:
+            ids = parse_ids(request.data.get('ids'))
+        except BulkError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        results = bulk_update_complaints(ids, new_status, worker)
+        return Response({
+            "updated": sum(1 for item in results if item['result'] == 'updated'),
+            "results": results,
+        })
+    
     @action(detail=True, methods=['post'])
     def mark_resolved(self, request, pk=None):
         complaint = self.get_object()
+        was_assigned = complaint.status == 'assigned'
         complaint.status = 'resolved'
         complaint.save()
+        if was_assigned:
+            record_load_change(complaint.assigned_worker_id, -1)
         return Response({"success": "Complaint marked as resolved"})
 
-class ComplaintTypeViewSet(viewsets.ModelViewSet):
+class ComplaintTypeViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = ComplaintType.objects.all()
     serializer_class = ComplaintTypeSerializer
-    permission_classes = [permissions.IsAuthenticated, IsWardenOrAdmin]
\ No newline at end of file
+    permission_classes = [permissions.IsAuthenticated, IsWardenOrAdmin]
+
+class ComplaintStatisticsView(ReplicaReadMixin, APIView):
+    """Status, complaint type, hostel and weekly timeline counts for the warden dashboard."""
+    permission_classes = [IsAuthenticated, IsWardenOrAdmin]
+
+    def get(self, request):
+        try:
+            hostel_id = request.query_params.get('hostel')
+            hostel_id = int(hostel_id) if hostel_id else None
+            weeks = min(max(int(request.query_params.get('weeks', 8)), 1), 52)
+        except ValueError:
+            return Response({"error": "hostel and weeks must be integers"}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response(complaint_statistics(hostel_id, weeks))
+
+class HostelStatisticsView(ReplicaReadMixin, APIView):
+    """Occupancy and complaint status counts for the requesting warden's hostel."""
+    permission_classes = [IsAuthenticated, IsWardenOrAdmin]
+
+    def get(self, request):
+        try:
+            hostel_id = request.query_params.get('hostel')
+            hostel_id = int(hostel_id) if hostel_id else None
+        except ValueError:
+            return Response({"error": "hostel must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+        if hostel_id is not None:
+            hostel = Hostel.objects.filter(pk=hostel_id).first()
+        else:
+            hostel = Hostel.objects.filter(warden=request.user).first() or request.user.hostel
+        
+        if hostel is None:
+            return Response({"error": "Hostel not found"}, status=status.HTTP_404_NOT_FOUND)
+        
+        return Response({
+            'hostel_id': hostel.id,
+            'hostel_name': hostel.name,
+            'capacity': hostel.capacity,
+            'current_occupancy': hostel.current_occupancy,
+            'available_space': hostel.available_space,
+            'complaints': status_counts(hostel.id),
+        })
+
+class DashboardStatsView(ReplicaReadMixin, APIView):
+    """Headline totals for the hostel staff dashboard."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        counts = status_counts()
+        total = sum(counts.values())
+        resolved_rate = round(100 * counts['resolved'] / total, 1) if total else 0
+        return Response({
+            'totalComplaints': total,
+            'activeComplaints': counts['pending'] + counts['assigned'],
+            'resolvedRate': resolved_rate,
+        })
\ No newline at end of file
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class SsdashConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'ssdash'
+
+    def ready(self):
+        # Registers the receivers that publish complaint events
+        from . import events  # noqa: F401
@@ -0,0 +1,42 @@
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from Backendd.events import publish
+
+from .models import Complaint
+
+# ssdash complaints are visible to every authenticated user, so one channel
+CHANNEL = 'ssdash'
+
+
+@receiver(post_init, sender=Complaint)
+def remember_complaint_status(sender, instance, **kwargs):
+    instance._event_status = instance.__dict__.get('status')
+
+
+@receiver(post_save, sender=Complaint)
+def publish_complaint_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        event_type = 'complaint.created'
+    elif instance.status == 'Resolved' and instance._event_status != 'Resolved':
+        event_type = 'complaint.resolved'
+    else:
+        event_type = 'complaint.updated'
+    publish([CHANNEL], event_type, {
+        'source': 'ssdash',
+        'id': instance.pk,
+        'status': instance.status,
+        'complaint_name': instance.complaint_name,
+        'complaint_category': instance.complaint_category,
+        'room_number': instance.room_number,
+        'place': instance.place,
+        'updated_at': instance.updated_at,
+    })
+    instance._event_status = instance.status
+
+
+@receiver(post_delete, sender=Complaint)
+def publish_complaint_deleted(sender, instance, **kwargs):
+    publish([CHANNEL], 'complaint.deleted', {'source': 'ssdash', 'id': instance.pk})
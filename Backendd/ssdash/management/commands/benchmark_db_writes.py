@@ -0,0 +1,114 @@
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+from contextlib import closing
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections, transaction
+from django.utils import timezone
+
+from Backendd.database import sqlite_database
+from ssdash.models import Complaint
+
+# Stock Django SQLite settings: rollback journal, DEFERRED transactions and
+# the sqlite3 module's 5 second busy timeout
+BEFORE = {
+    'ENGINE': 'django.db.backends.sqlite3',
+    'OPTIONS': {'init_command': 'PRAGMA journal_mode=DELETE'},
+}
+CATEGORIES = [value for value, _ in Complaint.CATEGORY_CHOICES]
+
+
+def register_alias(alias, config):
+    """Make `alias` usable with .using() for the rest of the process."""
+    databases = {DEFAULT_DB_ALIAS: settings.DATABASES[DEFAULT_DB_ALIAS], alias: config}
+    connections.settings[alias] = connections.configure_settings(databases)[alias]
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure concurrent complaint submissions against a scratch copy of the '
+        'SQLite database, with stock settings ("before") and with the tuned '
+        'settings from Backendd.database ("after"). Each thread repeatedly runs '
+        'a read-then-write transaction: count the open complaints for a room, '
+        'file a new one and update another one.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--seconds', type=float, default=5)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        source = settings.DATABASES[DEFAULT_DB_ALIAS]
+        if source['ENGINE'] != 'django.db.backends.sqlite3':
+            raise CommandError('The default database is not SQLite; this compares SQLite settings only')
+
+        self.stdout.write(
+            f"{'settings':<10}{'committed':>11}{'failed':>8}{'tx/s':>9}{'p50 ms':>9}{'p99 ms':>9}"
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            for profile, config in (('before', BEFORE), ('after', sqlite_database(None))):
+                path = os.path.join(directory, f'{profile}.sqlite3')
+                with closing(sqlite3.connect(source['NAME'])) as src, closing(sqlite3.connect(path)) as dst:
+                    src.backup(dst)
+                alias = f'bench_{profile}'
+                register_alias(alias, {**config, 'NAME': path, 'CONN_MAX_AGE': 0})
+                try:
+                    committed, failed, elapsed = self.run(alias, options)
+                finally:
+                    connections[alias].close()
+                    del connections.settings[alias]
+                p50, p99 = statistics.quantiles(committed, n=100)[49::49] if len(committed) > 1 else (0, 0)
+                self.stdout.write(
+                    f"{profile:<10}{len(committed):>11}{failed:>8}{len(committed) / elapsed:>9.1f}"
+                    f"{p50:>9.1f}{p99:>9.1f}"
+                )
+
+    def run(self, alias, options):
+        complaints = Complaint.objects.using(alias)
+        existing = list(complaints.values_list('pk', flat=True)[:1000])
+        committed, failed = [], [0]
+        lock = threading.Lock()
+        start = time.perf_counter()
+        deadline = start + options['seconds']
+
+        def work(seed):
+            rng = random.Random(seed)
+            try:
+                while time.perf_counter() < deadline:
+                    room = str(rng.randint(101, 425))
+                    began = time.perf_counter()
+                    try:
+                        with transaction.atomic(using=alias):
+                            complaints.filter(room_number=room, status='Pending').count()
+                            created = complaints.create(
+                                complaint_name='benchmark write', description='contention benchmark',
+                                room_number=room, complaint_category=rng.choice(CATEGORIES), place='Block A',
+                            )
+                            complaints.filter(pk=rng.choice(existing) if existing else created.pk).update(
+                                status='In Progress', updated_at=timezone.now()
+                            )
+                    except OperationalError:
+                        # "database is locked"
+                        with lock:
+                            failed[0] += 1
+                        continue
+                    with lock:
+                        committed.append((time.perf_counter() - began) * 1000)
+            finally:
+                connections[alias].close()
+
+        threads = [
+            threading.Thread(target=work, args=(options['seed'] * 1000 + i,)) for i in range(options['threads'])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return committed, failed[0], time.perf_counter() - start
@@ -0,0 +1,84 @@
+import random
+import statistics
+import time
+from functools import reduce
+from operator import and_, or_
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from ssdash.models import Complaint
+from ssdash.search import SEARCH_COLUMNS, search_complaints
+
+WORDS = (
+    'leak tap shower flush drain pipe basin geyser fan light switch socket bulb tube '
+    'door hinge lock window cupboard bed table chair filter cooler purifier clog '
+    'smell water broken loose noisy dripping sparking flickering jammed cracked'
+).split()
+PLACES = ['Block A', 'Block B', 'Block C', 'Mess', 'Library', 'Common Room']
+
+
+def icontains_search(queryset, terms):
+    """The query DRF's SearchFilter builds for the same terms."""
+    return queryset.filter(reduce(and_, (
+        reduce(or_, (Q(**{f'{column}__icontains': term}) for column in SEARCH_COLUMNS))
+        for term in terms
+    )))
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare full-text and icontains complaint search latency on synthetic data. '
+        'Rows are inserted inside a transaction that is rolled back afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100000)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        categories = [value for value, label in Complaint.CATEGORY_CHOICES]
+
+        with transaction.atomic():
+            start = time.perf_counter()
+            Complaint.objects.bulk_create((
+                Complaint(
+                    complaint_name=' '.join(rng.choices(WORDS, k=3)),
+                    description=' '.join(rng.choices(WORDS, k=25)),
+                    room_number=str(rng.randint(100, 499)),
+                    complaint_category=rng.choice(categories),
+                    place=rng.choice(PLACES),
+                )
+                for _ in range(options['rows'])
+            ), batch_size=2000)
+            self.stdout.write(f"Seeded {options['rows']} complaints in {time.perf_counter() - start:.1f}s")
+
+            base = Complaint.objects.all().order_by('-created_at')
+            self.stdout.write(f"{'query':<24}{'icontains ms':>14}{'full-text ms':>14}{'rows':>8}")
+            for terms in (['leak'], ['drip'], ['broken', 'door'], ['geyser', 'water', 'block'], ['417']):
+                fts = search_complaints(base, terms)
+                if fts is None:
+                    self.stderr.write('No full-text backend for this database')
+                    break
+                fts = fts.order_by('-search_rank', '-created_at')
+                results = [
+                    self.time_page(icontains_search(base, terms), options['repeat']),
+                    self.time_page(fts, options['repeat']),
+                ]
+                self.stdout.write(
+                    f"{' '.join(terms):<24}{results[0][0]:>14.1f}{results[1][0]:>14.1f}{results[1][1]:>8}"
+                )
+            transaction.set_rollback(True)
+
+    def time_page(self, queryset, repeat):
+        """Median time of what a list request does: COUNT(*) plus the first page."""
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            count = queryset.count()
+            list(queryset[:20])
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings), count
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from ssdash.search import install_search_index, uninstall_search_index
+
+
+class Command(BaseCommand):
+    help = 'Drop and recreate the complaint full-text index, reindexing every complaint'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        uninstall_search_index(connection)
+        install_search_index(connection)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt search index on {connection.vendor}'))
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ssdash', '0002_complaint_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='complaint',
+            index=models.Index(fields=['-created_at', '-id'], name='ssdash_cmp_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='complaint',
+            index=models.Index(fields=['status', '-created_at', '-id'], name='ssdash_cmp_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='complaint',
+            index=models.Index(fields=['complaint_category', '-created_at', '-id'], name='ssdash_cmp_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='complaint',
+            index=models.Index(fields=['room_number', '-created_at', '-id'], name='ssdash_cmp_room_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='complaint',
+            index=models.Index(fields=['place', '-created_at', '-id'], name='ssdash_cmp_place_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='complaint',
+            index=models.Index(condition=models.Q(('status__in', ['Pending', 'In Progress'])), fields=['-created_at'], name='ssdash_cmp_open_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+import Backendd.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ssdash', '0004_delta_sync'),
+    ]
+
+    operations = [
+        # Storage is not a column property; altering the column would make
+        # SQLite rebuild the table and drop the search index triggers
+        migrations.SeparateDatabaseAndState(state_operations=[
+            migrations.AlterField(
+                model_name='complaint',
+                name='attachment',
+                field=models.FileField(blank=True, null=True, storage=Backendd.storage.blob_storage, upload_to='complaints/'),
+            ),
+        ]),
+    ]
@@ -1,4 +1,11 @@
 from django.db import models
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from Backendd.attachments import file_name, queue_variants
+from Backendd.storage import blob_storage
+from accounts.models import move_blob_reference
 
 class Complaint(models.Model):
     # Status choices for the complaint
@@ -25,9 +32,67 @@ class Complaint(models.Model):
     complaint_category = models.CharField(max_length=50, choices=CATEGORY_CHOICES)  # Category of the complaint
     status = models.CharField(max_length=50, choices=STATUS_CHOICES, default='Pending')  # Status of the complaint
     place = models.CharField(max_length=255)  # Place or location of the complaint
-    attachment = models.FileField(upload_to='complaints/', null=True, blank=True)  # File attachment for complaint evidence
+    attachment = models.FileField(upload_to='complaints/', storage=blob_storage, null=True, blank=True)  # File attachment for complaint evidence
     created_at = models.DateTimeField(auto_now_add=True)  # Timestamp when the complaint was created
     updated_at = models.DateTimeField(auto_now=True)  # Timestamp when the complaint was last updated
 
+    class Meta:
+        # Match the viewset's filterset_fields, each in keyset order (newest first), plus
+        # a partial index for the open complaints dashboards poll (used by
+        # Postgres; SQLite falls back to the status index)
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='ssdash_cmp_created_idx'),
+            # Delta sync scans (updated_at, id) > watermark
+            models.Index(fields=['updated_at', 'id'], name='ssdash_cmp_updated_idx'),
+            models.Index(fields=['status', '-created_at', '-id'], name='ssdash_cmp_status_idx'),
+            models.Index(fields=['complaint_category', '-created_at', '-id'], name='ssdash_cmp_category_idx'),
+            models.Index(fields=['room_number', '-created_at', '-id'], name='ssdash_cmp_room_idx'),
+            models.Index(fields=['place', '-created_at', '-id'], name='ssdash_cmp_place_idx'),
+            models.Index(
+                fields=['-created_at'],
+                condition=models.Q(status__in=['Pending', 'In Progress']),
+                name='ssdash_cmp_open_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.complaint_name} - {self.status}"  # String representation of the complaint
+
+
+class ComplaintTombstone(models.Model):
+    """Records a deleted complaint so delta sync clients can drop it."""
+    complaint_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['deleted_at'], name='ssdash_tomb_deleted_idx'),
+        ]
+
     def __str__(self):
-        return f"{self.complaint_name} - {self.status}"  # String representation of the complaint
\ No newline at end of file
+        return f"Complaint {self.complaint_id} deleted at {self.deleted_at}"
+
+
+@receiver(post_delete, sender=Complaint)
+def record_complaint_tombstone(sender, instance, **kwargs):
+    ComplaintTombstone.objects.create(complaint_id=instance.pk)
+
+
+@receiver(post_init, sender=Complaint)
+def remember_attachment(sender, instance, **kwargs):
+    instance._loaded_attachment = file_name(instance.__dict__.get('attachment'))
+
+
+@receiver(post_save, sender=Complaint)
+def attachment_changed(sender, instance, raw=False, **kwargs):
+    if raw or 'attachment' not in instance.__dict__:
+        return
+    if instance.attachment.name != instance._loaded_attachment:
+        move_blob_reference(instance._loaded_attachment, instance.attachment.name)
+        queue_variants(instance.attachment)
+        instance._loaded_attachment = instance.attachment.name
+
+
+@receiver(post_delete, sender=Complaint)
+def release_attachment(sender, instance, **kwargs):
+    move_blob_reference(instance._loaded_attachment, None)
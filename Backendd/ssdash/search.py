@@ -0,0 +1,124 @@
+import re
+
+from django.db import connections
+from django.db.models import BooleanField, FloatField
+from django.db.models.expressions import RawSQL
+from rest_framework import filters
+
+# Columns indexed for full-text search, matching ComplaintViewSet.search_fields
+SEARCH_COLUMNS = ['complaint_name', 'description', 'room_number', 'place']
+
+FTS_TABLE = 'ssdash_complaint_fts'
+
+# SQLite: an external-content FTS5 table over ssdash_complaint, kept in sync by
+# triggers so every write path (ORM saves, bulk_create, raw SQL) is covered.
+_columns = ', '.join(SEARCH_COLUMNS)
+_new = ', '.join(f'new.{c}' for c in SEARCH_COLUMNS)
+_old = ', '.join(f'old.{c}' for c in SEARCH_COLUMNS)
+
+SQLITE_INSTALL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    f"{_columns}, content='ssdash_complaint', content_rowid='id', tokenize='unicode61')",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON ssdash_complaint BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, {_columns}) VALUES (new.id, {_new}); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON ssdash_complaint BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_columns}) VALUES ('delete', old.id, {_old}); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF {_columns} ON ssdash_complaint BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_columns}) VALUES ('delete', old.id, {_old}); "
+    f"INSERT INTO {FTS_TABLE}(rowid, {_columns}) VALUES (new.id, {_new}); END",
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+SQLITE_UNINSTALL = [
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ai",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_au",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+# PostgreSQL: a GIN expression index. Queries must use exactly this expression
+# for the planner to pick the index.
+PG_DOCUMENT = "to_tsvector('english', {})".format(
+    " || ' ' || ".join(f"coalesce({c}, '')" for c in SEARCH_COLUMNS)
+)
+
+POSTGRES_INSTALL = [
+    f"CREATE INDEX IF NOT EXISTS ssdash_complaint_search_idx ON ssdash_complaint USING GIN ({PG_DOCUMENT})",
+]
+
+POSTGRES_UNINSTALL = [
+    "DROP INDEX IF EXISTS ssdash_complaint_search_idx",
+]
+
+
+def install_search_index(connection):
+    statements = {'sqlite': SQLITE_INSTALL, 'postgresql': POSTGRES_INSTALL}.get(connection.vendor, [])
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+
+def uninstall_search_index(connection):
+    statements = {'sqlite': SQLITE_UNINSTALL, 'postgresql': POSTGRES_UNINSTALL}.get(connection.vendor, [])
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+
+def _tokens(terms):
+    return [token for term in terms for token in re.findall(r'\w+', term)]
+
+
+def search_complaints(queryset, terms):
+    """
+    Filter `queryset` to complaints matching every term as a word prefix, with
+    a `search_rank` annotation (higher is better). Returns None when the
+    database has no full-text backend so callers can fall back.
+    """
+    tokens = _tokens(terms)
+    vendor = connections[queryset.db].vendor
+    if not tokens:
+        return queryset.none()
+
+    if vendor == 'sqlite':
+        match = ' '.join('"{}"*'.format(token) for token in tokens)
+        # Join the FTS table so MATCH runs once per query. bm25() is lower for
+        # better matches; negate it so ordering matches Postgres.
+        return queryset.extra(
+            tables=[FTS_TABLE],
+            where=[f"{FTS_TABLE}.rowid = ssdash_complaint.id", f"{FTS_TABLE} MATCH %s"],
+            params=[match],
+            select={'search_rank': f"-bm25({FTS_TABLE})"},
+        )
+
+    if vendor == 'postgresql':
+        tsquery = ' & '.join(f'{token}:*' for token in tokens)
+        queryset = queryset.filter(RawSQL(
+            f"{PG_DOCUMENT} @@ to_tsquery('english', %s)", [tsquery], output_field=BooleanField()
+        ))
+        return queryset.annotate(search_rank=RawSQL(
+            f"ts_rank({PG_DOCUMENT}, to_tsquery('english', %s))", [tsquery], output_field=FloatField()
+        ))
+
+    return None
+
+
+class ComplaintSearchFilter(filters.SearchFilter):
+    """
+    SearchFilter backed by the full-text index. Results are ranked by relevance
+    unless the client asks for an explicit ordering. Falls back to the default
+    icontains search on databases without a full-text backend.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+
+        results = search_complaints(queryset, terms)
+        if results is None:
+            return super().filter_queryset(request, queryset, view)
+
+        if filters.OrderingFilter.ordering_param not in request.query_params:
+            results = results.order_by('-search_rank', '-created_at')
+        return results
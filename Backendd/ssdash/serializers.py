@@ -1,12 +1,19 @@
 from rest_framework import serializers
+from Backendd.attachments import variant_urls
 from .models import Complaint
 
 class ComplaintSerializer(serializers.ModelSerializer):
+    # {'thumb': url, 'web': url} once rendered, else null
+    attachment_variants = serializers.SerializerMethodField()
+
     class Meta:
         model = Complaint
         fields = [
             'id', 'complaint_name', 'description', 'room_number', 
-            'complaint_category', 'status', 'place', 'attachment',
+            'complaint_category', 'status', 'place', 'attachment', 'attachment_variants',
             'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at', 'status']
\ No newline at end of file
+        read_only_fields = ['id', 'created_at', 'updated_at', 'status']
+
+    def get_attachment_variants(self, obj):
+        return variant_urls(obj.attachment, self.context.get('request'))
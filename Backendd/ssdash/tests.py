@@ -1,3 +1,388 @@
-from django.test import TestCase
+import io
+import os
+import shutil
+import tempfile
+import time
+from datetime import timedelta
+from unittest import mock, skipUnless
+from urllib.parse import parse_qs, urlparse
 
-# Create your tests here.
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Q
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from Backendd.attachments import get_pool, render_variants, variant_name
+from Backendd.events import InProcessBroker
+from Backendd.storage import blob_digest, blob_storage
+from accounts.models import CustomUser, StoredBlob
+from .models import Complaint
+
+
+def make_complaint(**fields):
+    defaults = {
+        'complaint_name': 'Complaint',
+        'description': '',
+        'room_number': '101',
+        'complaint_category': 'Plumbing',
+        'place': 'Block A',
+    }
+    defaults.update(fields)
+    return Complaint.objects.create(**defaults)
+
+
+class ComplaintSearchTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create(
+            username='student', email='student@iiitkottayam.ac.in', user_type='student'
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def search(self, query, **params):
+        response = self.client.get('/api/complaints/', {'search': query, **params})
+        self.assertEqual(response.status_code, 200)
+        return [row['complaint_name'] for row in response.data['results']]
+
+    def test_matches_word_prefixes_across_fields(self):
+        make_complaint(complaint_name='Tap', description='Dripping tap in the washroom')
+        make_complaint(complaint_name='Fan', description='Ceiling fan broken', place='Library')
+        make_complaint(complaint_name='Light', description='Tube light', room_number='204')
+
+        self.assertEqual(self.search('drip'), ['Tap'])
+        self.assertEqual(self.search('libr'), ['Fan'])
+        self.assertEqual(self.search('204'), ['Light'])
+        self.assertEqual(self.search('fan broken'), ['Fan'])
+        self.assertEqual(self.search('fan dripping'), [])
+
+    def test_ranks_better_matches_first(self):
+        make_complaint(complaint_name='Other', description='leak near the door and a broken chair')
+        make_complaint(complaint_name='Leak', description='leak leak, water leak everywhere')
+        self.assertEqual(self.search('leak'), ['Leak', 'Other'])
+        self.assertEqual(self.search('leak', ordering='created_at'), ['Other', 'Leak'])
+
+    def test_index_follows_updates_and_deletes(self):
+        complaint = make_complaint(complaint_name='Geyser', description='No hot water')
+        complaint.description = 'Sparking switch'
+        complaint.save()
+        self.assertEqual(self.search('water'), [])
+        self.assertEqual(self.search('sparking'), ['Geyser'])
+
+        complaint.delete()
+        self.assertEqual(self.search('sparking'), [])
+
+    def test_search_combines_with_filters(self):
+        make_complaint(complaint_name='A', description='leak', complaint_category='Plumbing')
+        make_complaint(complaint_name='B', description='leak', complaint_category='Electrical')
+        self.assertEqual(self.search('leak', complaint_category='Electrical'), ['B'])
+
+
+class KeysetPaginationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create(
+            username='student', email='student@iiitkottayam.ac.in', user_type='student'
+        )
+        for i in range(45):
+            make_complaint(complaint_name=f'C{i}')
+        # Force ties on created_at so the id tie-breaker is exercised
+        first = Complaint.objects.order_by('id').first()
+        Complaint.objects.filter(id__lte=first.id + 10).update(created_at=first.created_at)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_walks_every_row_once_in_keyset_order(self):
+        expected = list(Complaint.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        seen = []
+        url, params = '/api/complaints/', {'pagination': 'cursor'}
+        while url:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('count', response.data)
+            seen += [row['id'] for row in response.data['results']]
+            url, params = response.data['next'], {}
+        self.assertEqual(seen, expected)
+
+    def test_deep_page_skips_count(self):
+        response = self.client.get('/api/complaints/', {'pagination': 'cursor'})
+        cursor = parse_qs(urlparse(response.data['next']).query)['cursor'][0]
+        # One SELECT for the page; no COUNT(*) and no OFFSET
+        with self.assertNumQueries(1) as ctx:
+            self.client.get('/api/complaints/', {'cursor': cursor})
+        self.assertNotIn('OFFSET', ctx.captured_queries[0]['sql'])
+
+    def test_count_on_request(self):
+        response = self.client.get('/api/complaints/', {'pagination': 'cursor', 'count': 'true'})
+        self.assertEqual(response.data['count'], 45)
+
+    def test_page_number_mode_unchanged(self):
+        response = self.client.get('/api/complaints/', {'page': 3})
+        self.assertEqual(response.data['count'], 45)
+        self.assertEqual(len(response.data['results']), 5)
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/complaints/', {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Plan assertions are written against SQLite EXPLAIN output')
+class QueryPlanTests(TestCase):
+    """Filtered, newest-first listings must be served by an index rather than a full scan."""
+
+    def assertUsesIndex(self, queryset, ordered=True):
+        plan = queryset.explain()
+        steps = [line for line in plan.splitlines() if 'ssdash_complaint' in line]
+        self.assertTrue(steps, plan)
+        for line in steps:
+            self.assertIn('USING', line, f'Full scan of ssdash_complaint:\n{plan}')
+        if ordered:
+            self.assertNotIn('TEMP B-TREE', plan, f'Sort not served by the index:\n{plan}')
+
+    def test_list_and_filters(self):
+        complaints = Complaint.objects.order_by('-created_at', '-id')
+        self.assertUsesIndex(complaints[:20])
+        for field in ('status', 'complaint_category', 'room_number', 'place'):
+            with self.subTest(field=field):
+                self.assertUsesIndex(complaints.filter(**{field: 'x'})[:20])
+        self.assertUsesIndex(complaints.filter(status__in=['Pending', 'In Progress'])[:20], ordered=False)
+
+
+class ComplaintEventTests(TestCase):
+
+    def test_saves_publish_to_the_ssdash_channel(self):
+        broker = InProcessBroker()
+        with mock.patch('Backendd.events._broker', broker), mock.patch.object(broker, 'publish') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                complaint = make_complaint(complaint_name='Leaking tap')
+            with self.captureOnCommitCallbacks(execute=True):
+                complaint.status = 'Resolved'
+                complaint.save()
+
+        events = [call.args for call in publish.call_args_list]
+        self.assertEqual([(channels, event['type']) for channels, event in events], [
+            (['ssdash'], 'complaint.created'),
+            (['ssdash'], 'complaint.resolved'),
+        ])
+        self.assertEqual(events[1][1]['data']['id'], complaint.pk)
+
+
+class DeltaSyncTests(TestCase):
+
+    def test_changes_and_deletions_since_watermark(self):
+        client = APIClient()
+        client.force_authenticate(CustomUser.objects.create(
+            username='student', email='student@iiitkottayam.ac.in', user_type='student'
+        ))
+        kept, dropped = make_complaint(complaint_name='kept'), make_complaint(complaint_name='dropped')
+        Complaint.objects.update(updated_at=timezone.now() - timedelta(hours=1))
+        since = timezone.now().isoformat()
+        kept.status = 'Resolved'
+        kept.save()
+        dropped_id = dropped.pk
+        dropped.delete()
+
+        response = client.get('/api/complaints/changes/', {'updated_since': since})
+        self.assertEqual([row['id'] for row in response.data['changed']], [kept.pk])
+        self.assertEqual(response.data['deleted'], [dropped_id])
+
+    def test_query_uses_updated_index(self):
+        since = timezone.now()
+        plan = (
+            Complaint.objects.filter(Q(updated_at__gt=since) | Q(updated_at=since, pk__gt=1))
+            .order_by('updated_at', 'pk')[:500].explain()
+        )
+        self.assertIn('ssdash_cmp_updated_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+
+class ComplaintExportTests(TestCase):
+
+    def test_export_applies_list_filters_and_requires_warden(self):
+        make_complaint(complaint_name='Open tap', status='Pending')
+        make_complaint(complaint_name='Fixed fan', status='Resolved')
+        client = APIClient()
+        client.force_authenticate(CustomUser.objects.create(
+            username='student', email='student@iiitkottayam.ac.in', user_type='student'
+        ))
+        self.assertEqual(client.get('/api/complaints/export/').status_code, 403)
+
+        client.force_authenticate(CustomUser.objects.create(
+            username='warden', email='warden@iiitkottayam.ac.in', user_type='warden'
+        ))
+        response = client.get('/api/complaints/export/', {'status': 'Resolved'})
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertIn('Fixed fan', lines[1])
+
+
+def photo_bytes(size=(1200, 800)):
+    """A JPEG carrying GPS and a 90 degree orientation tag, like a phone photo."""
+    from PIL import Image
+
+    exif = Image.Exif()
+    exif[0x0112] = 6  # Orientation: rotate 90 CW to display
+    exif[0x8825] = {1: 'N', 2: (9.0, 31.0, 0.0)}  # GPSInfo
+    out = io.BytesIO()
+    Image.new('RGB', size, 'orange').save(out, 'JPEG', exif=exif)
+    return out.getvalue()
+
+
+class AttachmentVariantTests(TestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.client = APIClient()
+        self.client.force_authenticate(CustomUser.objects.create(
+            username='student', email='student@iiitkottayam.ac.in', user_type='student'
+        ))
+
+    def upload(self, name, content, content_type):
+        return self.client.post('/api/complaints/', {
+            'complaint_name': 'Leak', 'description': 'Tap', 'room_number': '101',
+            'complaint_category': 'Plumbing', 'place': 'Block A',
+            'attachment': SimpleUploadedFile(name, content, content_type),
+        }, format='multipart')
+
+    def test_upload_renders_stripped_variants_after_commit(self):
+        from PIL import Image
+
+        with mock.patch('Backendd.attachments.ATTACHMENT_WORKERS', 0):
+            with self.captureOnCommitCallbacks(execute=False) as callbacks:
+                response = self.upload('tap.jpg', photo_bytes(), 'image/jpeg')
+            self.assertEqual(response.status_code, 201)
+            # Nothing is rendered on the request itself
+            self.assertIsNone(response.data['attachment_variants'])
+            for callback in callbacks:
+                callback()
+
+        name = Complaint.objects.get().attachment.name
+        with Image.open(os.path.join(self.media_root, variant_name(name, 'thumb'))) as thumb:
+            self.assertEqual(thumb.format, 'WEBP')
+            # Rotated upright, then fitted into 320px
+            self.assertEqual(thumb.size, (213, 320))
+            self.assertEqual(len(thumb.getexif()), 0)
+
+        detail = self.client.get(f"/api/complaints/{response.data['id']}/").data
+        self.assertEqual(set(detail['attachment_variants']), {'thumb', 'web'})
+        self.assertTrue(detail['attachment_variants']['thumb'].endswith('.thumb.webp'))
+
+    def test_non_images_get_no_variants(self):
+        with mock.patch('Backendd.attachments.ATTACHMENT_WORKERS', 0):
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.upload('notes.txt', b'not an image', 'text/plain')
+        self.assertIsNone(response.data['attachment_variants'])
+        self.assertFalse(os.path.exists(os.path.join(self.media_root, 'variants')))
+
+    def test_pool_renders_largest_first(self):
+        source = os.path.join(self.media_root, 'photo.jpg')
+        with open(source, 'wb') as out:
+            out.write(photo_bytes((3000, 2000)))
+        targets = [(os.path.join(self.media_root, f'{edge}.webp'), edge) for edge in (320, 1600)]
+        written = get_pool().submit(render_variants, source, targets).result(timeout=60)
+        self.assertEqual(written, [targets[1][0], targets[0][0]])
+        self.assertTrue(all(os.path.getsize(path) < 100_000 for path in written))
+
+
+class BlobStorageTests(TestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def attach(self, complaint, content, name='Worker.jpg'):
+        complaint.attachment = SimpleUploadedFile(name, content, 'image/jpeg')
+        complaint.save()
+        return complaint.attachment.name
+
+    def references(self, name):
+        return StoredBlob.objects.get(name=name).references
+
+    def test_identical_uploads_share_one_counted_blob(self):
+        first, second = make_complaint(), make_complaint()
+        name = self.attach(first, b'same bytes')
+        self.assertEqual(self.attach(second, b'same bytes', 'Worker_HWwSFxS.jpg'), name)
+        self.assertIsNotNone(blob_digest(name))
+        self.assertEqual(len(os.listdir(os.path.dirname(os.path.join(self.media_root, name)))), 1)
+        self.assertEqual(self.references(name), 2)
+
+        second.delete()
+        self.assertEqual(self.references(name), 1)
+        other = self.attach(Complaint.objects.get(pk=first.pk), b'other bytes')
+        self.assertEqual((self.references(name), self.references(other)), (0, 1))
+
+    def test_prune_deletes_only_unreferenced_blobs(self):
+        kept = self.attach(make_complaint(), b'kept')
+        dropped_complaint = make_complaint()
+        dropped = self.attach(dropped_complaint, b'dropped')
+        dropped_complaint.delete()
+        call_command('prune_blobs', grace_hours=0, stdout=io.StringIO())
+        self.assertTrue(os.path.exists(os.path.join(self.media_root, kept)))
+        self.assertFalse(os.path.exists(os.path.join(self.media_root, dropped)))
+        self.assertFalse(StoredBlob.objects.filter(name=dropped).exists())
+
+    def age(self, name, hours=2):
+        StoredBlob.objects.filter(name=name).update(updated_at=timezone.now() - timedelta(hours=hours))
+        then = time.time() - hours * 3600
+        os.utime(os.path.join(self.media_root, name), (then, then))
+
+    def test_prune_keeps_a_blob_reused_before_its_reference_is_counted(self):
+        complaint = make_complaint()
+        name = self.attach(complaint, b'reused')
+        complaint.delete()
+        self.age(name)
+        # An upload of the same bytes has stored its file but not yet
+        # committed the row that counts it
+        self.assertEqual(blob_storage().save('again.jpg', ContentFile(b'reused')), name)
+        call_command('prune_blobs', grace_hours=1, no_reconcile=True, stdout=io.StringIO())
+        self.assertTrue(os.path.exists(os.path.join(self.media_root, name)))
+        self.assertTrue(StoredBlob.objects.filter(name=name).exists())
+
+        self.age(name)
+        call_command('prune_blobs', grace_hours=1, no_reconcile=True, stdout=io.StringIO())
+        self.assertFalse(os.path.exists(os.path.join(self.media_root, name)))
+        self.assertFalse(StoredBlob.objects.filter(name=name).exists())
+
+    def test_delete_if_stale_restores_a_blob_touched_while_deleting(self):
+        name = self.attach(make_complaint(), b'touched')
+        self.age(name)
+        path = os.path.join(self.media_root, name)
+        replace = os.replace
+
+        def touch_then_replace(source, target):
+            # An upload reuses the blob just before prune moves it away
+            os.utime(source)
+            replace(source, target)
+
+        with mock.patch('Backendd.storage.os.replace', touch_then_replace):
+            self.assertIsNone(blob_storage().delete_if_stale(name, time.time() - 3600))
+        self.assertTrue(os.path.exists(path))
+        self.assertEqual(os.listdir(os.path.dirname(path)), [os.path.basename(path)])
+
+    def test_blobs_are_served_immutable_with_etags(self):
+        name = self.attach(make_complaint(), b'jpeg bytes')
+        response = self.client.get(f'/media/{name}')
+        self.assertEqual(b''.join(response.streaming_content), b'jpeg bytes')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+        self.assertEqual(response['ETag'], f'"{blob_digest(name)}"')
+
+        cached = self.client.get(f'/media/{name}', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(self.client.get('/media/blobs/../db.sqlite3').status_code, 404)
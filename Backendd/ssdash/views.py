@@ -1,23 +1,50 @@
-from rest_framework import viewsets, filters, status
+from rest_framework import viewsets, filters, permissions, status
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import Complaint
+from accounts.views import IsWardenOrAdmin
+from .models import Complaint, ComplaintTombstone
 from .serializers import ComplaintSerializer
+from .search import ComplaintSearchFilter
+from Backendd.delta import DeltaSyncMixin
+from Backendd.export import ExportMixin
+from Backendd.pagination import KeysetPagination
+from Backendd.replicas import ReplicaReadMixin
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 import json
 
 
-class ComplaintViewSet(viewsets.ModelViewSet):
+class ComplaintViewSet(ReplicaReadMixin, DeltaSyncMixin, ExportMixin, viewsets.ModelViewSet):
     queryset = Complaint.objects.all().order_by('-created_at')
     serializer_class = ComplaintSerializer
+    tombstone_model = ComplaintTombstone
+    export_filename = 'ssdash-complaints'
+    export_columns = (
+        ('id', 'id'),
+        ('created_at', 'created_at'),
+        ('updated_at', 'updated_at'),
+        ('status', 'status'),
+        ('complaint_category', 'complaint_category'),
+        ('complaint_name', 'complaint_name'),
+        ('description', 'description'),
+        ('room_number', 'room_number'),
+        ('place', 'place'),
+        ('attachment', 'attachment'),
+    )
+    rate_limits = {'create': 'complaint_create'}
     parser_classes = [MultiPartParser, FormParser, JSONParser]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    pagination_class = KeysetPagination
+    filter_backends = [DjangoFilterBackend, ComplaintSearchFilter, filters.OrderingFilter]
     filterset_fields = ['status', 'complaint_category', 'room_number', 'place']
     search_fields = ['complaint_name', 'description', 'room_number', 'place']
     ordering_fields = ['created_at', 'updated_at', 'status']
 
+    def get_permissions(self):
+        if self.action == 'export':
+            return [permissions.IsAuthenticated(), IsWardenOrAdmin()]
+        return super().get_permissions()
+
 # API view for getting complaint categories
 @csrf_exempt
 def get_complaint_categories(request):
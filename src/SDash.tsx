@@ -12,6 +12,7 @@ interface Complaint {
   description: string;
   place: string;
   attachment?: string;
+  attachment_variants?: { thumb?: string; web?: string } | null;
   created_at?: string;
 }
 
@@ -327,11 +328,17 @@ function SDash() {
                   <p className="text-sm text-gray-400">Attachment</p>
                   <div className="bg-[#2a2f35] p-4 rounded-lg mt-1">
                     {selectedComplaint.attachment.match(/\.(jpg|jpeg|png)$/) ? (
-                      <img 
-                        src={`http://127.0.0.1:8000/${selectedComplaint.attachment}`} 
-                        alt="Attachment" 
-                        className="max-w-full h-auto rounded"
-                      />
+                      <a
+                        href={`http://localhost:8000/${selectedComplaint.attachment}`}
+                        target="_blank"
+                        rel="noopener noreferrer"
+                      >
+                        <img 
+                          src={selectedComplaint.attachment_variants?.web ?? `http://127.0.0.1:8000/${selectedComplaint.attachment}`} 
+                          alt="Attachment" 
+                          className="max-w-full h-auto rounded"
+                        />
+                      </a>
                     ) : (
                       <a 
                         href={`http://localhost:8000/${selectedComplaint.attachment}`} 